@@ -0,0 +1,103 @@
+"""
+Batch scheduling benchmark with latency skew: lockstep waves vs. worker pool.
+
+The local stub answers most requests quickly and a few (the 4K renders)
+slowly. The same prompts run through GeminiClient twice: in lockstep waves
+of batch_size (the scheduler before the worker pool: gather each chunk,
+then start the next) and through BatchPipeline, which refills each slot as
+soon as it frees. Reports wall time, throughput and slot utilization.
+
+    python -m benchmarks.batch_skew [--prompts 96] [--batch-size 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any
+
+from benchmarks.stub_server import GeminiStub, image_size
+from src.services.concurrency import AdaptiveLimiter
+from src.services.gemini_client import GeminiClient
+from src.tools.batch_generate import BatchPipeline
+
+# Stub latency per requested image size
+LATENCY = {"1K": 0.2, "2K": 0.4, "4K": 2.0}
+
+
+def make_workload(prompts: int, slow_fraction: float, seed: int) -> list[str]:
+    """Image size per prompt: mostly 1K/2K, slow_fraction of them 4K."""
+    rng = random.Random(seed)
+    return [
+        "4K" if rng.random() < slow_fraction else rng.choice(("1K", "2K")) for _ in range(prompts)
+    ]
+
+
+async def lockstep(client: GeminiClient, sizes: list[str], batch_size: int) -> dict[str, Any]:
+    busy = 0.0
+
+    async def one(index: int, size: str) -> None:
+        nonlocal busy
+        start = time.perf_counter()
+        await client.generate_image(f"prompt {index}", image_size=size)
+        busy += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(sizes), batch_size):
+        chunk = sizes[offset : offset + batch_size]
+        await asyncio.gather(*(one(offset + i, size) for i, size in enumerate(chunk)))
+    wall = time.perf_counter() - start
+    return {"wall": wall, "utilization": busy / (batch_size * wall)}
+
+
+async def worker_pool(client: GeminiClient, sizes: list[str], batch_size: int) -> dict[str, Any]:
+    async def handler(item: tuple[int, str], _: Any) -> None:
+        index, size = item
+        await client.generate_image(f"prompt {index}", image_size=size)
+
+    pipeline = BatchPipeline(batch_size)
+    await pipeline.run(list(enumerate(sizes)), handler)
+    stats = pipeline.stats()
+    return {
+        "wall": stats["wall_time_seconds"],
+        "utilization": stats["stages"]["generation"]["mean_utilization"],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=96)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--slow-fraction", type=float, default=0.1, help="Share of 4K renders")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    sizes = make_workload(args.prompts, args.slow_fraction, args.seed)
+    async with GeminiStub(latency=lambda request: LATENCY[image_size(request)]) as stub:
+        # The SDK picks the base URL up from the environment
+        os.environ["GOOGLE_GEMINI_BASE_URL"] = stub.base_url
+        client = GeminiClient(
+            "stub",
+            max_in_flight=args.batch_size,
+            limiter=AdaptiveLimiter(initial_limit=args.batch_size, max_limit=args.batch_size),
+        )
+        ideal = sum(LATENCY[size] for size in sizes) / args.batch_size
+        print(
+            f"{args.prompts} prompts ({sizes.count('4K')} x 4K), batch_size {args.batch_size}, "
+            f"latency {LATENCY}; ideal wall {ideal:.2f}s"
+        )
+        print(f"{'scheduler':<13}{'wall s':>8}{'img/s':>8}{'utilization':>13}")
+        for name, run in (("lockstep", lockstep), ("worker pool", worker_pool)):
+            result = await run(client, sizes, args.batch_size)
+            print(
+                f"{name:<13}{result['wall']:>8.2f}{args.prompts / result['wall']:>8.1f}"
+                f"{result['utilization']:>13.2f}"
+            )
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
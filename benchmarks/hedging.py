@@ -0,0 +1,115 @@
+"""
+Hedged requests benchmark: tail latency with and without hedging.
+
+The local stub answers most requests in about 0.2s and a small share of
+them (--slow-fraction) in 2s, independently per request, so a hedge sent
+for a slow request usually comes back fast. The same workload runs through
+GeminiClient with hedge=False and hedge=True and reports latency
+percentiles, the hedge rate, the hedge win rate and the extra requests the
+server saw.
+
+    python -m benchmarks.hedging [--requests 400] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+from typing import Any
+
+from benchmarks.stub_server import GeminiStub
+from src.services.concurrency import AdaptiveLimiter
+from src.services.gemini_client import GeminiClient
+from src.services.hedging import HedgePolicy
+
+SLOW_LATENCY = 2.0
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def measure(
+    stub: GeminiStub, requests: int, concurrency: int, hedge: bool, warmup: int
+) -> dict[str, Any]:
+    client = GeminiClient(
+        "stub",
+        max_in_flight=2 * concurrency,
+        limiter=AdaptiveLimiter(initial_limit=concurrency, max_limit=concurrency),
+        hedge_policy=HedgePolicy(),
+    )
+    # Seed the latency window so hedging is active from the first measured request
+    for index in range(warmup):
+        await client.generate_image(f"warmup {index}", image_size="1K")
+
+    served_before = stub.requests
+    latencies: list[float] = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await client.generate_image(f"prompt {index}", image_size="1K", hedge=hedge)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    stats = client.hedge_policy.stats()
+    await client.close()
+
+    ordered = sorted(latencies)
+    return {
+        "wall": wall,
+        "p50": statistics.median(ordered),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+        "hedge_rate": stats["hedges"] / requests,
+        "hedge_win_rate": stats["hedge_win_rate"],
+        "extra_requests": stub.requests - served_before - requests,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Typical latency in seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Share of slow answers")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(args.seed)
+
+    def latency(_: dict[str, Any]) -> float:
+        if rng.random() < args.slow_fraction:
+            return SLOW_LATENCY
+        return float(args.latency) * rng.uniform(0.75, 1.25)
+
+    async with GeminiStub(latency=latency) as stub:
+        # The SDK picks the base URL up from the environment
+        os.environ["GOOGLE_GEMINI_BASE_URL"] = stub.base_url
+        print(
+            f"{args.requests} requests, concurrency {args.concurrency}, latency "
+            f"~{args.latency}s with {args.slow_fraction:.0%} at {SLOW_LATENCY}s"
+        )
+        print(
+            f"{'hedge':<7}{'wall s':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'max s':>8}"
+            f"{'hedged':>8}{'won':>7}{'extra':>7}"
+        )
+        for hedge in (False, True):
+            r = await measure(stub, args.requests, args.concurrency, hedge, warmup=40)
+            print(
+                f"{str(hedge).lower():<7}{r['wall']:>8.2f}{r['p50']:>8.2f}{r['p95']:>8.2f}"
+                f"{r['p99']:>8.2f}{r['max']:>8.2f}{r['hedge_rate']:>8.1%}"
+                f"{r['hedge_win_rate']:>7.0%}{r['extra_requests']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
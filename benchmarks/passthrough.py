@@ -0,0 +1,96 @@
+"""
+Microbenchmark: extracting returned images with and without a PIL round-trip.
+
+Compares the previous extraction (decode with PIL, re-encode to PNG, base64)
+against the passthrough path in GeminiClient._extract_content_from_response
+(header sniff only) on synthetic 1K, 2K and 4K PNG responses. Reports time
+and peak Python allocations per image.
+
+    python -m benchmarks.passthrough [--repeat 3]
+"""
+
+import argparse
+import base64
+import io
+import logging
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from google.genai import types
+from PIL import Image
+
+from src.services.gemini_client import GeminiClient
+
+SIZES = {"1K": 1024, "2K": 2048, "4K": 4096}
+
+
+def make_image(edge: int) -> bytes:
+    """Photo-like PNG: a colour gradient with grain, so it compresses realistically."""
+    gradient = Image.linear_gradient("L").resize((edge, edge))
+    noise = Image.effect_noise((edge, edge), 24)
+    image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.ROTATE_90)))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def make_response(data: bytes) -> types.GenerateContentResponse:
+    part = types.Part.from_bytes(data=data, mime_type="image/png")
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))]
+    )
+
+
+def legacy_extract(response: types.GenerateContentResponse) -> list[str]:
+    """The extraction before passthrough: full decode, PNG re-encode, base64."""
+    images = []
+    for part in response.parts or []:
+        if part.inline_data and part.inline_data.data:
+            pil_image = Image.open(io.BytesIO(part.inline_data.data))
+            buffer = io.BytesIO()
+            pil_image.save(buffer, format="PNG")
+            images.append(base64.b64encode(buffer.getvalue()).decode())
+    return images
+
+
+def measure(extract: Callable[[Any], Any], response: Any, repeat: int) -> tuple[float, float]:
+    """Median seconds over repeat runs, and peak Python allocations (MiB) of one traced run."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(response)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    extract(response)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size and path")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    client = GeminiClient("stub")
+    print(f"{'size':<6}{'PNG MiB':>9}{'legacy ms':>11}{'pass ms':>10}{'speedup':>9}", end="")
+    print(f"{'legacy MiB':>12}{'pass MiB':>10}")
+    for name, edge in SIZES.items():
+        data = make_image(edge)
+        response = make_response(data)
+        legacy_time, legacy_peak = measure(legacy_extract, response, args.repeat)
+        pass_time, pass_peak = measure(client._extract_content_from_response, response, args.repeat)
+        print(
+            f"{name:<6}{len(data) / 2**20:>9.1f}{legacy_time * 1000:>11.1f}"
+            f"{pass_time * 1000:>10.2f}{legacy_time / pass_time:>8.0f}x"
+            f"{legacy_peak:>12.1f}{pass_peak:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Gemini API, used by the benchmarks and tests.
+
+Serves generateContent over plain HTTP on 127.0.0.1, so the real genai SDK
+and its httpx transport can be pointed at it with
+HttpOptions(base_url=stub.base_url). Latency and faults are injectable per
+request.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import socket
+import struct
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from PIL import Image
+
+# Faults served instead of a normal response, one per request, in queue order
+FAULT_UNAVAILABLE = "503"  # 503 UNAVAILABLE (model overloaded)
+FAULT_RATE_LIMITED = "429"  # 429 RESOURCE_EXHAUSTED with a google.rpc.RetryInfo delay
+FAULT_AUTH = "auth"  # 400 INVALID_ARGUMENT "API key not valid"
+FAULT_HANG = "hang"  # Accept the request and never answer
+FAULT_RESET = "reset"  # Drop the connection with a TCP reset
+
+_REASONS = {200: "OK", 400: "Bad Request", 429: "Too Many Requests", 503: "Service Unavailable"}
+
+# Latency in seconds, fixed or computed from the parsed request body
+Latency = float | Callable[[dict[str, Any]], float]
+
+
+def make_png(width: int = 64, height: int = 64) -> bytes:
+    """Small solid PNG to serve as the generated image."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (40, 90, 160)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def image_size(request: dict[str, Any]) -> str:
+    """Requested image size (1K, 2K, 4K) of a generateContent body."""
+    config = request.get("generationConfig") or {}
+    return str((config.get("imageConfig") or {}).get("imageSize") or "")
+
+
+class GeminiStub:
+    """Minimal HTTP/1.1 server answering generateContent like the Gemini API."""
+
+    def __init__(
+        self,
+        *,
+        latency: Latency = 0.0,
+        image: bytes | None = None,
+        retry_delay: str = "1s",
+    ):
+        """
+        Initialize stub.
+
+        Args:
+            latency: Seconds before each response, or a function of the request body
+            image: Image bytes returned for image models (default: a small PNG)
+            retry_delay: RetryInfo delay sent with 429 faults (e.g. "0.2s")
+        """
+        self.latency = latency
+        self.image = image or make_png()
+        self.retry_delay = retry_delay
+        self.faults: deque[str] = deque()
+
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self._server: asyncio.Server | None = None
+        self._handlers: set[asyncio.Task[None]] = set()
+        self.base_url = ""
+
+    async def start(self) -> str:
+        """Listen on a free local port and return the base URL."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop listening and drop open connections (including hung requests)."""
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "GeminiStub":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._handlers.add(task)
+        try:
+            # Keep-alive: serve requests until the client closes the connection
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                response = await self._respond(request_line.split()[1].decode(), body)
+                if response is None:
+                    # SO_LINGER 0 turns close into a TCP reset
+                    sock = writer.get_extra_info("socket")
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    writer.transport.abort()
+                    return
+                status, payload = response
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(task)
+
+    async def _respond(self, path: str, body: bytes) -> tuple[int, dict[str, Any]] | None:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            request = json.loads(body or b"{}")
+            fault = self.faults.popleft() if self.faults else None
+            if fault == FAULT_HANG:
+                await asyncio.Event().wait()
+            if fault == FAULT_RESET:
+                return None
+
+            latency = self.latency(request) if callable(self.latency) else self.latency
+            if latency:
+                await asyncio.sleep(latency)
+
+            if fault == FAULT_UNAVAILABLE:
+                return 503, _error(503, "UNAVAILABLE", "The model is overloaded.")
+            if fault == FAULT_RATE_LIMITED:
+                details = [
+                    {
+                        "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                        "retryDelay": self.retry_delay,
+                    }
+                ]
+                return 429, _error(
+                    429, "RESOURCE_EXHAUSTED", "You exceeded your current quota.", details
+                )
+            if fault == FAULT_AUTH:
+                return 400, _error(
+                    400, "INVALID_ARGUMENT", "API key not valid. Please pass a valid API key."
+                )
+
+            if "image" in path:
+                part: dict[str, Any] = {
+                    "inlineData": {
+                        "mimeType": "image/png",
+                        "data": base64.b64encode(self.image).decode(),
+                    }
+                }
+            else:
+                part = {"text": "An enhanced prompt."}
+            return 200, {
+                "candidates": [
+                    {"content": {"role": "model", "parts": [part]}, "finishReason": "STOP"}
+                ]
+            }
+        finally:
+            self.in_flight -= 1
+
+
+def _error(
+    code: int, status: str, message: str, details: list[dict[str, Any]] | None = None
+) -> dict[str, Any]:
+    error: dict[str, Any] = {"code": code, "message": message, "status": status}
+    if details:
+        error["details"] = details
+    return {"error": error}
+
+
+async def _serve(latency: float) -> None:
+    async with GeminiStub(latency=latency) as stub:
+        print(stub.base_url, flush=True)
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a local Gemini API stub")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response latency in seconds")
+    try:
+        asyncio.run(_serve(parser.parse_args().latency))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,119 @@
+"""
+Transport benchmark: native async client vs. sync SDK calls on the executor.
+
+Fires 8, 32 and 128 concurrent image requests at the local stub (fixed
+server latency, run in its own process) through GeminiClient with each
+transport and reports wall time, per-request latency and the peak number of
+threads in the benchmark process. Each measurement runs in a fresh event
+loop, so it starts with a fresh default executor.
+
+    python -m benchmarks.transport [--latency 0.5] [--rounds 2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+
+from src.services.concurrency import AdaptiveLimiter
+from src.services.gemini_client import TRANSPORT_ASYNC, TRANSPORT_EXECUTOR, GeminiClient
+
+CONCURRENCY_LEVELS = (8, 32, 128)
+
+
+async def _peak_threads(stop: asyncio.Event) -> int:
+    peak = threading.active_count()
+    while not stop.is_set():
+        peak = max(peak, threading.active_count())
+        await asyncio.sleep(0.01)
+    return peak
+
+
+async def measure(transport: str, concurrency: int, rounds: int) -> dict[str, Any]:
+    """Run rounds x concurrency requests with concurrency in flight."""
+    # Counted before the warm-up so executor worker threads show up as growth
+    threads_before = threading.active_count()
+    client = GeminiClient(
+        "stub",
+        transport=transport,
+        max_in_flight=concurrency,
+        limiter=AdaptiveLimiter(initial_limit=concurrency, max_limit=concurrency),
+    )
+    latencies: list[float] = []
+
+    async def one(index: int) -> None:
+        start = time.perf_counter()
+        await client.generate_image(f"benchmark prompt {index}", image_size="2K")
+        latencies.append(time.perf_counter() - start)
+
+    # Warm up the connection pool (and the executor's threads)
+    await asyncio.gather(*(one(-i) for i in range(1, min(concurrency, 8) + 1)))
+    latencies.clear()
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_peak_threads(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(rounds * concurrency)))
+    wall = time.perf_counter() - start
+    stop.set()
+    peak = await sampler
+    await client.close()
+
+    ordered = sorted(latencies)
+    return {
+        "transport": transport,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "wall_seconds": wall,
+        "throughput_rps": len(latencies) / wall,
+        "p50_seconds": statistics.median(ordered),
+        "p95_seconds": ordered[int(0.95 * (len(ordered) - 1))],
+        "threads_before": threads_before,
+        "peak_threads": peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub latency in seconds")
+    parser.add_argument("--rounds", type=int, default=2, help="Requests per slot")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_server", "--latency", str(args.latency)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert stub.stdout is not None
+        # The SDK picks the base URL up from the environment
+        os.environ["GOOGLE_GEMINI_BASE_URL"] = stub.stdout.readline().strip()
+        print(
+            f"Stub latency {args.latency}s, {args.rounds} request(s) per slot, cpus={os.cpu_count()}"
+        )
+        print(
+            f"{'transport':<10}{'conc':>6}{'wall s':>9}{'req/s':>9}{'p50 s':>8}{'p95 s':>8}"
+            f"{'threads':>10}"
+        )
+        for concurrency in CONCURRENCY_LEVELS:
+            for transport in (TRANSPORT_EXECUTOR, TRANSPORT_ASYNC):
+                r = asyncio.run(measure(transport, concurrency, args.rounds))
+                print(
+                    f"{r['transport']:<10}{r['concurrency']:>6}{r['wall_seconds']:>9.2f}"
+                    f"{r['throughput_rps']:>9.1f}{r['p50_seconds']:>8.2f}{r['p95_seconds']:>8.2f}"
+                    f"{r['threads_before']:>5}->{r['peak_threads']:<4}"
+                )
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
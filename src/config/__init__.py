@@ -9,9 +9,9 @@ from .constants import (
     DEFAULT_OUTPUT_DIR,
     DEFAULT_TIMEOUT,
     GEMINI_MODELS,
+    IMAGE_EXTENSIONS,
     IMAGE_FORMATS,
     IMAGE_SIZES,
-    MAX_BATCH_SIZE,
     MAX_HUMAN_IMAGES,
     MAX_OBJECT_IMAGES,
     MAX_PROMPT_LENGTH,
@@ -29,9 +29,9 @@ __all__ = [
     "DEFAULT_OUTPUT_DIR",
     "DEFAULT_TIMEOUT",
     "GEMINI_MODELS",
+    "IMAGE_EXTENSIONS",
     "IMAGE_FORMATS",
     "IMAGE_SIZES",
-    "MAX_BATCH_SIZE",
     "MAX_HUMAN_IMAGES",
     "MAX_OBJECT_IMAGES",
     "MAX_PROMPT_LENGTH",
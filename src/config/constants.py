@@ -39,6 +39,19 @@ IMAGE_FORMATS = {
     "webp": "image/webp",
 }
 
+# File extensions for each image mime type
+IMAGE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+}
+
+# Encoding defaults
+DEFAULT_JPEG_QUALITY = 90
+DEFAULT_WEBP_QUALITY = 85
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+DEFAULT_ENCODE_WORKERS = 2
+
 # Image sizes (Gemini 3 Pro Image)
 IMAGE_SIZES = ["1K", "2K", "4K"]
 DEFAULT_IMAGE_SIZE = "2K"
@@ -52,17 +65,103 @@ MAX_HUMAN_IMAGES = 5
 RESPONSE_MODALITIES = ["TEXT", "IMAGE"]
 
 # Generation limits
-MAX_BATCH_SIZE = 8
 MAX_PROMPT_LENGTH = 8192
 
 # File size limits
 MAX_IMAGE_SIZE_MB = 20
 MAX_IMAGE_SIZE_BYTES = MAX_IMAGE_SIZE_MB * 1024 * 1024
 
+# Reference image preprocessing and cache
+DEFAULT_REFERENCE_MAX_EDGE = 2048
+DEFAULT_REFERENCE_MAX_MB = 3.0
+DEFAULT_REFERENCE_MAX_BYTES = int(DEFAULT_REFERENCE_MAX_MB * 1024 * 1024)
+DEFAULT_REFERENCE_CACHE_MB = 256
+DEFAULT_REFERENCE_CACHE_BYTES = DEFAULT_REFERENCE_CACHE_MB * 1024 * 1024
+
+# Concurrency settings
+DEFAULT_MAX_IN_FLIGHT = 32  # Concurrent API requests per client (API key)
+DEFAULT_INITIAL_CONCURRENCY = 4  # Starting adaptive limit for image requests
+DEFAULT_MIN_CONCURRENCY = 1
+
+# Client-side rate limiting is opt-in: quotas differ per project and tier, so
+# none are assumed until the model_quotas setting is configured
+REFERENCE_IMAGE_TOKENS = 258  # Approximate input tokens per reference image (tpm quotas)
+
+# Retry settings
+DEFAULT_RETRY_BASE_DELAY = 1.0  # seconds
+DEFAULT_RETRY_MAX_DELAY = 30.0  # seconds
+DEFAULT_RETRY_DEADLINE = 300.0  # Total budget per request across attempts (seconds)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Hedged request settings
+DEFAULT_HEDGE_PERCENTILE = 95.0  # Hedge requests still running past this latency percentile
+DEFAULT_HEDGE_BUDGET = 0.05  # At most 5% extra requests
+DEFAULT_HEDGE_MIN_SAMPLES = 20  # Latency samples needed before hedging starts
+
+# Prompt enhancement cache
+DEFAULT_PROMPT_CACHE_SIZE = 1024  # Entries kept in memory
+DEFAULT_PROMPT_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Prompts packed into one batched enhancement request
+ENHANCEMENT_BATCH_SIZE = 16
+DEFAULT_ENHANCEMENT_CONCURRENCY = 2  # Batched enhancement requests in flight per batch
+
+# Parameters a batch item may set for itself, overriding the batch-wide ones
+BATCH_ITEM_OVERRIDES = (
+    "model",
+    "aspect_ratio",
+    "image_size",
+    "output_format",
+    "quality",
+    "reference_image_paths",
+    "response_modalities",
+    "enable_google_search",
+    "seed",
+    "tags",  # Free-form metadata echoed in the item's result
+)
+
+# Relative render cost used to start expensive batch items first
+IMAGE_SIZE_COST = {"1K": 1.0, "2K": 1.5, "4K": 3.0}
+REFERENCE_IMAGE_COST = 0.25  # Per reference image
+GOOGLE_SEARCH_COST = 0.5
+TEXT_ONLY_COST = 0.25  # Items not requesting an IMAGE modality
+BATCH_COST_WINDOW = 256  # Items ordered by cost at a time when streaming a prompt file
+
+# Generated image result cache (opt-in)
+DEFAULT_RESULT_CACHE_DIR = str(Path.home() / ".cache" / "ultimate-gemini-mcp" / "results")
+DEFAULT_RESULT_CACHE_MB = 1024
+DEFAULT_RESULT_CACHE_BYTES = DEFAULT_RESULT_CACHE_MB * 1024 * 1024
+DEFAULT_RESULT_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds
+
+# Background batch jobs
+DEFAULT_JOB_DB_PATH = str(Path.home() / ".cache" / "ultimate-gemini-mcp" / "jobs.db")
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+DEFAULT_JOB_RETENTION = 7 * 24 * 3600  # seconds finished jobs are kept
+DEFAULT_JOB_RESULTS_PAGE = 50
+DEFAULT_BATCH_JOURNAL_PATH = str(Path.home() / ".cache" / "ultimate-gemini-mcp" / "batches.db")
+
 # Timeout settings (in seconds)
-DEFAULT_TIMEOUT = 60
+DEFAULT_TIMEOUT = 120  # Per API request attempt; 4K renders can take over a minute
 ENHANCEMENT_TIMEOUT = 30
 BATCH_TIMEOUT = 120
 
+# Image writes (dedicated I/O threads)
+DEFAULT_WRITE_WORKERS = 4
+DEFAULT_FSYNC_POLICY = "none"  # none, file or dir
+
+# Output layout: flat, date (YYYY/MM/DD) or hash (content hash prefixes). Flat
+# keeps images where existing installs expect them; sharding is opt-in
+DEFAULT_STORAGE_LAYOUT = "flat"
+DEFAULT_STORAGE_INDEX = False  # SQLite index of saved images in the output dir (opt-in)
+
+# Storage backends: local, memory or s3 (S3-compatible object store)
+DEFAULT_STORAGE_BACKEND = "local"
+DEFAULT_MEMORY_STORAGE_MB = 256
+DEFAULT_MEMORY_STORAGE_BYTES = DEFAULT_MEMORY_STORAGE_MB * 1024 * 1024
+DEFAULT_S3_MAX_CONNECTIONS = 10
+DEFAULT_S3_MULTIPART_MB = 8  # Threshold and part size for multipart uploads
+DEFAULT_S3_MULTIPART_THRESHOLD_BYTES = DEFAULT_S3_MULTIPART_MB * 1024 * 1024
+DEFAULT_S3_MULTIPART_CHUNK_BYTES = DEFAULT_S3_MULTIPART_MB * 1024 * 1024
+
 # Output settings
 DEFAULT_OUTPUT_DIR = str(Path.home() / "gemini_images")
@@ -10,12 +10,45 @@ from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .constants import (
+    DEFAULT_BATCH_JOURNAL_PATH,
+    DEFAULT_ENCODE_WORKERS,
+    DEFAULT_ENHANCEMENT_CONCURRENCY,
     DEFAULT_ENHANCEMENT_MODEL,
+    DEFAULT_FSYNC_POLICY,
+    DEFAULT_HEDGE_BUDGET,
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
     DEFAULT_IMAGE_SIZE,
+    DEFAULT_INITIAL_CONCURRENCY,
+    DEFAULT_JOB_DB_PATH,
+    DEFAULT_JOB_RETENTION,
+    DEFAULT_JPEG_QUALITY,
+    DEFAULT_MAX_CONCURRENT_JOBS,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MEMORY_STORAGE_MB,
+    DEFAULT_MIN_CONCURRENCY,
     DEFAULT_MODEL,
     DEFAULT_OUTPUT_DIR,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    DEFAULT_PROMPT_CACHE_SIZE,
+    DEFAULT_PROMPT_CACHE_TTL,
+    DEFAULT_REFERENCE_CACHE_MB,
+    DEFAULT_REFERENCE_MAX_EDGE,
+    DEFAULT_REFERENCE_MAX_MB,
+    DEFAULT_RESULT_CACHE_DIR,
+    DEFAULT_RESULT_CACHE_MAX_AGE,
+    DEFAULT_RESULT_CACHE_MB,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_DELAY,
+    DEFAULT_S3_MAX_CONNECTIONS,
+    DEFAULT_S3_MULTIPART_MB,
+    DEFAULT_STORAGE_BACKEND,
+    DEFAULT_STORAGE_INDEX,
+    DEFAULT_STORAGE_LAYOUT,
     DEFAULT_TIMEOUT,
-    MAX_BATCH_SIZE,
+    DEFAULT_WEBP_QUALITY,
+    DEFAULT_WRITE_WORKERS,
 )
 
 
@@ -42,6 +75,45 @@ class ServerConfig(BaseSettings):
     output_dir: str = Field(
         default=DEFAULT_OUTPUT_DIR, description="Directory for generated images"
     )
+    storage_layout: str = Field(
+        default=DEFAULT_STORAGE_LAYOUT,
+        description="Output layout: flat, date (YYYY/MM/DD) or hash (content hash shards)",
+    )
+    storage_index: bool = Field(
+        default=DEFAULT_STORAGE_INDEX,
+        description="Record saved images in an SQLite index in the output dir",
+    )
+    write_workers: int = Field(
+        default=DEFAULT_WRITE_WORKERS, description="I/O threads used to save images"
+    )
+    fsync_policy: str = Field(
+        default=DEFAULT_FSYNC_POLICY,
+        description="fsync after saving images: none, file, or dir (file and directory)",
+    )
+
+    # Storage backend settings
+    storage_backend: str = Field(
+        default=DEFAULT_STORAGE_BACKEND,
+        description="Where images are saved: local (output dir), memory, or s3",
+    )
+    memory_storage_mb: int = Field(
+        default=DEFAULT_MEMORY_STORAGE_MB, description="Size budget of the memory backend in MB"
+    )
+    s3_bucket: str = Field(default="", description="Bucket for the s3 backend")
+    s3_prefix: str = Field(default="", description="Key prefix for images in the bucket")
+    s3_endpoint_url: str = Field(
+        default="", description="Endpoint for S3-compatible stores (MinIO, R2, ...)"
+    )
+    s3_region: str = Field(default="", description="Bucket region")
+    s3_max_connections: int = Field(
+        default=DEFAULT_S3_MAX_CONNECTIONS, description="Pooled S3 connections (upload threads)"
+    )
+    s3_multipart_threshold_mb: int = Field(
+        default=DEFAULT_S3_MULTIPART_MB, description="Images larger than this use multipart uploads"
+    )
+    s3_multipart_chunk_mb: int = Field(
+        default=DEFAULT_S3_MULTIPART_MB, description="Part size of multipart uploads in MB"
+    )
 
     @classmethod
     def from_env(cls) -> "ServerConfig":
@@ -65,6 +137,11 @@ class APIConfig(BaseSettings):
         alias="GEMINI_API_KEY",
         description="Gemini API key (also accepts GOOGLE_API_KEY)",
     )
+    additional_api_keys: str = Field(
+        default="",
+        alias="GEMINI_API_KEYS",
+        description="Comma-separated extra Gemini API keys to spread requests across",
+    )
 
     # Model settings
     default_model: str = Field(
@@ -80,12 +157,118 @@ class APIConfig(BaseSettings):
     )
     enable_batch_processing: bool = Field(default=True, description="Enable batch processing")
 
+    # Prompt enhancement cache
+    enable_prompt_cache: bool = Field(default=True, description="Cache prompt enhancement results")
+    prompt_cache_size: int = Field(
+        default=DEFAULT_PROMPT_CACHE_SIZE, description="Enhanced prompts kept in memory"
+    )
+    prompt_cache_ttl: int = Field(
+        default=DEFAULT_PROMPT_CACHE_TTL,
+        description="Seconds an enhanced prompt stays cached (0 = forever)",
+    )
+    prompt_cache_path: str = Field(
+        default="",
+        description="SQLite file persisting enhanced prompts across restarts (empty = memory only)",
+    )
+
+    # Share one API call between identical concurrent requests
+    coalesce_requests: bool = Field(
+        default=True,
+        description="Coalesce identical in-flight enhancement and seeded generation requests",
+    )
+
+    # Generated image result cache (opt-in)
+    enable_result_cache: bool = Field(
+        default=False, description="Serve identical generation requests from a disk cache"
+    )
+    result_cache_dir: str = Field(
+        default=DEFAULT_RESULT_CACHE_DIR, description="Directory for cached generated images"
+    )
+    result_cache_mb: int = Field(
+        default=DEFAULT_RESULT_CACHE_MB, description="Disk budget for cached generated images"
+    )
+    result_cache_max_age: int = Field(
+        default=DEFAULT_RESULT_CACHE_MAX_AGE,
+        description="Seconds a cached generation stays valid (0 = no age limit)",
+    )
+
+    # Background batch jobs
+    job_db_path: str = Field(
+        default=DEFAULT_JOB_DB_PATH, description="SQLite file tracking submitted batch jobs"
+    )
+    max_concurrent_jobs: int = Field(
+        default=DEFAULT_MAX_CONCURRENT_JOBS, description="Batch jobs running at once"
+    )
+    job_retention: int = Field(
+        default=DEFAULT_JOB_RETENTION,
+        description="Seconds finished jobs, their results and batch checkpoints are kept (0 = forever)",
+    )
+    batch_journal_path: str = Field(
+        default=DEFAULT_BATCH_JOURNAL_PATH,
+        description="SQLite file checkpointing completed batch items for resuming",
+    )
+
     # Request settings
     request_timeout: int = Field(default=DEFAULT_TIMEOUT, description="API request timeout")
     max_batch_size: int = Field(
-        default=MAX_BATCH_SIZE, description="Maximum batch size for parallel requests"
+        default=0,
+        description="Default batch worker slots (0 = as many as the client pool can run at once)",
+    )
+    enhancement_concurrency: int = Field(
+        default=DEFAULT_ENHANCEMENT_CONCURRENCY,
+        description="Batched prompt enhancement requests in flight per batch",
     )
     max_retries: int = Field(default=3, description="Maximum number of retries for failed requests")
+    retry_base_delay: float = Field(
+        default=DEFAULT_RETRY_BASE_DELAY, description="Minimum retry backoff delay (seconds)"
+    )
+    retry_max_delay: float = Field(
+        default=DEFAULT_RETRY_MAX_DELAY, description="Maximum retry backoff delay (seconds)"
+    )
+    retry_deadline: float = Field(
+        default=DEFAULT_RETRY_DEADLINE,
+        description="Total time budget per request across all retries (seconds)",
+    )
+    hedge_percentile: float = Field(
+        default=DEFAULT_HEDGE_PERCENTILE,
+        description="Hedged requests duplicate after this percentile of recent latency",
+    )
+    hedge_budget: float = Field(
+        default=DEFAULT_HEDGE_BUDGET,
+        description="Maximum hedged requests as a fraction of all requests",
+    )
+    hedge_min_samples: int = Field(
+        default=DEFAULT_HEDGE_MIN_SAMPLES,
+        description="Latency samples required before hedging starts",
+    )
+    api_transport: str = Field(
+        default="async",
+        description="SDK transport: async (native asyncio) or executor (thread pool fallback)",
+    )
+    max_concurrent_requests: int = Field(
+        default=DEFAULT_MAX_IN_FLIGHT,
+        description="Maximum in-flight API requests per API key",
+    )
+    enable_rate_limiting: bool = Field(
+        default=True,
+        description="Pace requests locally against model_quotas (no pacing until quotas are set)",
+    )
+    model_quotas: dict[str, dict[str, int]] = Field(
+        default_factory=dict,
+        description="Per-model rpm/tpm/ipm quotas per API key (JSON); empty = no local pacing",
+    )
+    adaptive_concurrency: bool = Field(
+        default=True,
+        description="Adapt image request concurrency to latency and rate limiting (AIMD)",
+    )
+    initial_concurrency: int = Field(
+        default=DEFAULT_INITIAL_CONCURRENCY,
+        description="Starting adaptive concurrency limit per API key",
+    )
+    min_concurrency: int = Field(
+        default=DEFAULT_MIN_CONCURRENCY,
+        description="Lowest adaptive concurrency limit per API key",
+    )
 
     # Image settings
     default_aspect_ratio: str = Field(default="1:1", description="Default aspect ratio")
@@ -93,6 +276,28 @@ class APIConfig(BaseSettings):
         default=DEFAULT_IMAGE_SIZE, description="Default image size (1K, 2K, 4K)"
     )
     default_output_format: str = Field(default="png", description="Default output format")
+    jpeg_quality: int = Field(default=DEFAULT_JPEG_QUALITY, description="JPEG quality (1-100)")
+    webp_quality: int = Field(default=DEFAULT_WEBP_QUALITY, description="WebP quality (1-100)")
+    png_compress_level: int = Field(
+        default=DEFAULT_PNG_COMPRESS_LEVEL, description="PNG compression level (0-9)"
+    )
+    optimize_images: bool = Field(
+        default=False, description="Spend extra CPU when encoding for smaller files"
+    )
+    encode_workers: int = Field(
+        default=DEFAULT_ENCODE_WORKERS, description="Worker processes for image encoding"
+    )
+    reference_max_edge: int = Field(
+        default=DEFAULT_REFERENCE_MAX_EDGE,
+        description="Reference images are downscaled to this maximum edge (pixels)",
+    )
+    reference_max_mb: float = Field(
+        default=DEFAULT_REFERENCE_MAX_MB,
+        description="Reference images are recompressed to fit this size (MB)",
+    )
+    reference_cache_mb: int = Field(
+        default=DEFAULT_REFERENCE_CACHE_MB, description="Memory budget for cached reference images"
+    )
     enable_google_search: bool = Field(default=False, description="Enable Google Search grounding")
     response_modalities: list[str] = Field(
         default=["TEXT", "IMAGE"], description="Response modalities"
@@ -108,6 +313,13 @@ class APIConfig(BaseSettings):
         if not self.gemini_api_key:
             raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY environment variable is required")
 
+    @property
+    def api_keys(self) -> list[str]:
+        """Get all configured API keys, primary key first."""
+        keys = [self.gemini_api_key]
+        keys.extend(key.strip() for key in self.additional_api_keys.split(",") if key.strip())
+        return list(dict.fromkeys(keys))
+
     @classmethod
     def from_env(cls) -> "APIConfig":
         """Load API configuration from environment variables."""
@@ -11,13 +11,17 @@ from .exceptions import (
     UltimateGeminiError,
     ValidationError,
 )
+from .prompt_files import count_prompts, iter_prompts
 from .validation import (
     sanitize_filename,
     validate_aspect_ratio,
     validate_base64_image,
+    validate_batch_item,
     validate_batch_size,
     validate_file_path,
     validate_image_format,
+    validate_image_quality,
+    validate_image_size,
     validate_model,
     validate_prompt,
     validate_prompts_list,
@@ -39,9 +43,15 @@ __all__ = [
     "validate_model",
     "validate_aspect_ratio",
     "validate_image_format",
+    "validate_image_quality",
+    "validate_image_size",
     "validate_file_path",
     "validate_base64_image",
     "validate_prompts_list",
+    "validate_batch_item",
     "validate_batch_size",
     "sanitize_filename",
+    # Prompt files
+    "iter_prompts",
+    "count_prompts",
 ]
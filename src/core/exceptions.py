@@ -25,11 +25,16 @@ class APIError(UltimateGeminiError):
     """Raised when an API request fails."""
 
     def __init__(
-        self, message: str, status_code: int | None = None, response_data: dict | None = None
+        self,
+        message: str,
+        status_code: int | None = None,
+        response_data: dict | None = None,
+        retry_after: float | None = None,
     ):
         super().__init__(message)
         self.status_code = status_code
         self.response_data = response_data
+        self.retry_after = retry_after  # Server-requested delay before retrying (seconds)
 
 
 class AuthenticationError(APIError):
@@ -0,0 +1,135 @@
+"""
+Streaming readers for prompt files used by large batches.
+
+Supported formats:
+- JSONL (.jsonl, .ndjson): one JSON string or object with a "prompt" key per line;
+  objects may carry per-item parameter overrides
+- CSV (.csv): a "prompt" column if the first row is a header, else the first
+  column; header columns named after a per-item parameter (e.g. aspect_ratio,
+  image_size, seed) override it for that row, list values are ';'-separated
+
+Prompts are yielded one at a time, so files with many thousands of prompts
+are never loaded into memory. A malformed line does not stop the batch: it
+is yielded as a ValidationError in place of its prompt.
+"""
+
+import csv
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from ..config.constants import BATCH_ITEM_OVERRIDES
+from .exceptions import ValidationError
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+CSV_EXTENSIONS = (".csv",)
+
+# How CSV cells of per-item parameter columns are converted
+_CSV_INT_COLUMNS = ("quality", "seed")
+_CSV_BOOL_COLUMNS = ("enable_google_search",)
+_CSV_LIST_COLUMNS = ("reference_image_paths", "response_modalities")
+
+PromptItem = str | dict[str, Any]
+
+
+def _prompt_file_path(path: str | Path) -> Path:
+    file_path = Path(path).expanduser()
+    if file_path.suffix.lower() not in JSONL_EXTENSIONS + CSV_EXTENSIONS:
+        raise ValidationError(
+            f"Unsupported prompt file '{file_path.name}': expected "
+            f"{', '.join(JSONL_EXTENSIONS + CSV_EXTENSIONS)}"
+        )
+    if not file_path.is_file():
+        raise ValidationError(f"Prompt file not found: {file_path}")
+    return file_path
+
+
+def _iter_jsonl(file_path: Path) -> Iterator[PromptItem | ValidationError]:
+    with open(file_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield ValidationError(f"Invalid JSON at line {line_number}: {e}")
+                continue
+            prompt = value.get("prompt") if isinstance(value, dict) else value
+            if not isinstance(prompt, str):
+                yield ValidationError(f"No prompt string at line {line_number}")
+                continue
+            yield value
+
+
+def _csv_value(column: str, cell: str) -> Any:
+    if column in _CSV_INT_COLUMNS:
+        return int(cell)
+    if column in _CSV_BOOL_COLUMNS:
+        return cell.lower() in ("1", "true", "yes")
+    if column in _CSV_LIST_COLUMNS:
+        return [part.strip() for part in cell.split(";") if part.strip()]
+    return cell
+
+
+def _iter_csv(file_path: Path) -> Iterator[PromptItem | ValidationError]:
+    with open(file_path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        column = 0
+        # (position, name) of per-item parameter columns
+        override_columns: list[tuple[int, str]] = []
+        first_row = True
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            if first_row:
+                first_row = False
+                header = [cell.strip().lower() for cell in row]
+                if "prompt" in header:
+                    column = header.index("prompt")
+                    override_columns = [
+                        (position, name)
+                        for position, name in enumerate(header)
+                        if name in BATCH_ITEM_OVERRIDES
+                    ]
+                    continue
+            if column >= len(row):
+                yield ValidationError(f"Missing prompt column at line {reader.line_num}")
+                continue
+            overrides: dict[str, Any] = {}
+            try:
+                for position, name in override_columns:
+                    if position < len(row) and row[position].strip():
+                        overrides[name] = _csv_value(name, row[position].strip())
+            except ValueError as e:
+                yield ValidationError(f"Invalid value at line {reader.line_num}: {e}")
+                continue
+            yield {"prompt": row[column], **overrides} if overrides else row[column]
+
+
+def iter_prompts(path: str | Path) -> Iterator[tuple[int, PromptItem | ValidationError]]:
+    """
+    Stream prompts from a JSONL or CSV file.
+
+    Overrides are not validated here; see validate_batch_item.
+
+    Args:
+        path: Prompt file
+
+    Yields:
+        Tuples of (prompt index, prompt string or item object with overrides,
+        or ValidationError for a malformed line)
+
+    Raises:
+        ValidationError: If the file is missing or of an unsupported type
+    """
+    file_path = _prompt_file_path(path)
+    if file_path.suffix.lower() in JSONL_EXTENSIONS:
+        yield from enumerate(_iter_jsonl(file_path))
+    else:
+        yield from enumerate(_iter_csv(file_path))
+
+
+def count_prompts(path: str | Path) -> int:
+    """Count the prompts in a JSONL or CSV file (streaming)."""
+    return sum(1 for _ in iter_prompts(path))
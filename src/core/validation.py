@@ -5,12 +5,16 @@ Input validation utilities.
 import base64
 import re
 from pathlib import Path
+from typing import Any
 
 from ..config.constants import (
     ALL_MODELS,
     ASPECT_RATIOS,
+    BATCH_ITEM_OVERRIDES,
     IMAGE_FORMATS,
+    IMAGE_SIZES,
     MAX_PROMPT_LENGTH,
+    RESPONSE_MODALITIES,
 )
 from .exceptions import ValidationError
 
@@ -47,6 +51,12 @@ def validate_image_format(format_str: str) -> None:
         raise ValidationError(f"Invalid image format '{format_str}'. Available: {available}")
 
 
+def validate_image_quality(quality: int) -> None:
+    """Validate JPEG/WebP encoding quality."""
+    if not isinstance(quality, int) or not 1 <= quality <= 100:
+        raise ValidationError(f"Image quality must be between 1 and 100, got {quality}")
+
+
 def validate_file_path(path: str) -> Path:
     """Validate and return file path."""
     try:
@@ -77,8 +87,74 @@ def validate_base64_image(data: str) -> None:
         raise ValidationError(f"Invalid base64 image data: {e}") from e
 
 
-def validate_prompts_list(prompts: list[str]) -> None:
-    """Validate list of prompts for batch processing."""
+def validate_image_size(image_size: str) -> None:
+    """Validate image resolution."""
+    if image_size not in IMAGE_SIZES:
+        available = ", ".join(IMAGE_SIZES)
+        raise ValidationError(f"Invalid image size '{image_size}'. Available: {available}")
+
+
+def validate_batch_item(item: str | dict[str, Any]) -> tuple[str, dict[str, Any]]:
+    """
+    Validate one batch item: a prompt string or an object with a "prompt" key
+    and per-item parameter overrides (see BATCH_ITEM_OVERRIDES).
+
+    Returns:
+        Tuple of (prompt, overrides)
+    """
+    if isinstance(item, str):
+        validate_prompt(item)
+        return item, {}
+    if not isinstance(item, dict):
+        raise ValidationError("Batch item must be a string or an object with a 'prompt' key")
+
+    overrides = dict(item)
+    prompt = overrides.pop("prompt", None)
+    if not isinstance(prompt, str):
+        raise ValidationError("Batch item has no 'prompt' string")
+    validate_prompt(prompt)
+
+    unknown = sorted(set(overrides) - set(BATCH_ITEM_OVERRIDES))
+    if unknown:
+        available = ", ".join(BATCH_ITEM_OVERRIDES)
+        raise ValidationError(
+            f"Unknown batch item parameter(s): {', '.join(unknown)}. Available: {available}"
+        )
+
+    if overrides.get("model") is not None:
+        validate_model(overrides["model"])
+    if "aspect_ratio" in overrides:
+        validate_aspect_ratio(overrides["aspect_ratio"])
+    if "image_size" in overrides:
+        validate_image_size(overrides["image_size"])
+    if "output_format" in overrides:
+        validate_image_format(overrides["output_format"])
+    if overrides.get("quality") is not None:
+        validate_image_quality(overrides["quality"])
+    paths = overrides.get("reference_image_paths")
+    if paths is not None and (
+        not isinstance(paths, list) or not all(isinstance(path, str) for path in paths)
+    ):
+        raise ValidationError("reference_image_paths must be a list of paths")
+    modalities = overrides.get("response_modalities")
+    if modalities is not None and (
+        not isinstance(modalities, list)
+        or not modalities
+        or not all(modality in RESPONSE_MODALITIES for modality in modalities)
+    ):
+        available = ", ".join(RESPONSE_MODALITIES)
+        raise ValidationError(f"response_modalities must be a list of: {available}")
+    if not isinstance(overrides.get("enable_google_search", False), bool):
+        raise ValidationError("enable_google_search must be true or false")
+    seed = overrides.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValidationError(f"Seed must be an integer, got {seed!r}")
+
+    return prompt, overrides
+
+
+def validate_prompts_list(prompts: list[str | dict[str, Any]]) -> None:
+    """Validate list of prompts (strings or per-item objects) for batch processing."""
     if not isinstance(prompts, list):
         raise ValidationError("Prompts must be a list")
 
@@ -86,10 +162,10 @@ def validate_prompts_list(prompts: list[str]) -> None:
         raise ValidationError("Prompts list cannot be empty")
 
     for i, prompt in enumerate(prompts):
-        if not isinstance(prompt, str):
-            raise ValidationError(f"Prompt at index {i} must be a string")
+        if not isinstance(prompt, str | dict):
+            raise ValidationError(f"Prompt at index {i} must be a string or an object")
         try:
-            validate_prompt(prompt)
+            validate_batch_item(prompt)
         except ValidationError as e:
             raise ValidationError(f"Invalid prompt at index {i}: {e}") from e
 
@@ -10,11 +10,18 @@ Unified MCP server supporting:
 
 import logging
 import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from fastmcp import FastMCP
 
 from .config import ALL_MODELS, get_settings
-from .tools import register_batch_generate_tool, register_generate_image_tool
+from .services import close_client_pool, close_job_manager, get_client_pool, get_job_manager
+from .tools import (
+    register_batch_generate_tool,
+    register_generate_image_tool,
+    register_job_tools,
+)
 
 # Set up logging
 logging.basicConfig(
@@ -26,6 +33,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Stop background jobs and release pooled API clients when the server shuts down."""
+    try:
+        yield
+    finally:
+        logger.info("Stopping background jobs...")
+        await close_job_manager()
+        logger.info("Shutting down client pool...")
+        await close_client_pool()
+
+
 def create_app() -> FastMCP:
     """
     Create and configure the Ultimate Gemini MCP application.
@@ -42,15 +61,23 @@ def create_app() -> FastMCP:
         logger.info(f"Prompt enhancement: {settings.api.enable_prompt_enhancement}")
         logger.info(f"Available models: {', '.join(ALL_MODELS.keys())}")
 
+        # Create the shared client pool (one connection-reusing client per API key)
+        client_pool = get_client_pool()
+
+        # Open the job table (marks jobs cut short by a previous run as interrupted)
+        job_manager = get_job_manager()
+
         # Create FastMCP server
         mcp = FastMCP(
             "Ultimate Gemini MCP",
             version="1.5.0",
+            lifespan=lifespan,
         )
 
         # Register tools
         register_generate_image_tool(mcp)
         register_batch_generate_tool(mcp)
+        register_job_tools(mcp)
 
         # Add resources
         @mcp.resource("models://list")
@@ -129,13 +156,31 @@ def create_app() -> FastMCP:
                 "default_model": settings.api.default_model,
                 "default_image_size": settings.api.default_image_size,
                 "max_batch_size": settings.api.max_batch_size,
+                "max_batch_concurrency": client_pool.max_concurrency,
                 "request_timeout": settings.api.request_timeout,
+                "api_keys": client_pool.size,
+                "api_transport": settings.api.api_transport,
+                "max_concurrent_requests": settings.api.max_concurrent_requests,
                 "default_aspect_ratio": settings.api.default_aspect_ratio,
                 "default_output_format": settings.api.default_output_format,
             }
 
             return json.dumps(config, indent=2)
 
+        @mcp.resource("stats://pool")
+        async def get_pool_stats() -> str:
+            """Get client pool statistics, including current adaptive concurrency limits."""
+            import json
+
+            return json.dumps(await get_client_pool().stats(), indent=2)
+
+        @mcp.resource("stats://jobs")
+        def get_job_stats() -> str:
+            """Get background job counts by status."""
+            import json
+
+            return json.dumps(job_manager.stats(), indent=2)
+
         logger.info("Ultimate Gemini MCP Server initialized successfully")
         return mcp
 
@@ -1,13 +1,61 @@
 """Services module for Ultimate Gemini MCP."""
 
+from .batch_journal import BatchJournal
+from .client_pool import ClientPool, close_client_pool, get_client_pool
+from .concurrency import AdaptiveLimiter
 from .gemini_client import GeminiClient
+from .hedging import HedgePolicy
+from .image_processing import ImageEncoder
 from .image_service import ImageResult, ImageService
+from .image_writer import ImageWriter
+from .job_manager import JobManager, close_job_manager, get_job_manager
+from .prompt_cache import PromptCache
 from .prompt_enhancer import PromptEnhancer, create_prompt_enhancer
+from .rate_limiter import RateLimiter, TokenBucket
+from .reference_cache import ReferenceImageCache, ReferencePart
+from .result_cache import ResultCache
+from .retry import RetryPolicy, is_retryable
+from .single_flight import SingleFlight
+from .storage import ImageStore, StorageLayout
+from .storage_backends import (
+    LocalBackend,
+    MemoryBackend,
+    S3Backend,
+    StorageBackend,
+    create_storage_backend,
+)
 
 __all__ = [
+    "AdaptiveLimiter",
+    "BatchJournal",
+    "ClientPool",
+    "get_client_pool",
+    "close_client_pool",
     "GeminiClient",
+    "HedgePolicy",
     "ImageService",
+    "ImageEncoder",
+    "ImageStore",
+    "ImageWriter",
     "ImageResult",
+    "JobManager",
+    "get_job_manager",
+    "close_job_manager",
+    "LocalBackend",
+    "MemoryBackend",
+    "PromptCache",
     "PromptEnhancer",
+    "RateLimiter",
+    "ResultCache",
+    "RetryPolicy",
+    "is_retryable",
+    "S3Backend",
+    "SingleFlight",
+    "StorageBackend",
+    "StorageLayout",
+    "TokenBucket",
+    "ReferenceImageCache",
+    "ReferencePart",
     "create_prompt_enhancer",
+    "create_storage_backend",
 ]
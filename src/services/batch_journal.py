@@ -0,0 +1,117 @@
+"""
+Per-item checkpoints for batch generation.
+
+Every successfully generated batch item is recorded under its batch ID
+together with a hash of the parameters that produced it. Running the same
+batch ID again skips items whose checkpoint is still valid, so a batch
+interrupted by a crash or restart only renders what is left.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..config.constants import DEFAULT_JOB_RETENTION
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJournal:
+    """SQLite journal of completed batch items keyed by batch ID."""
+
+    def __init__(self, path: str | Path, *, retention: float = DEFAULT_JOB_RETENTION):
+        """
+        Initialize batch journal.
+
+        Args:
+            path: SQLite database file
+            retention: Seconds checkpoints are kept (0 = forever)
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            "batch_id TEXT NOT NULL, item_index INTEGER NOT NULL, params_hash TEXT NOT NULL, "
+            "result TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (batch_id, item_index))"
+        )
+        if retention:
+            self._db.execute(
+                "DELETE FROM batch_items WHERE created < ?", (time.time() - retention,)
+            )
+        self._db.commit()
+
+        self.checkpoints = 0
+        self.resumed = 0
+
+    def checkpoint(self, batch_id: str, index: int) -> tuple[str, dict[str, Any]] | None:
+        """
+        Look up one item's checkpoint (blocking; call from a worker thread).
+
+        Items are looked up one at a time so batches of any size resume in
+        bounded memory.
+
+        Returns:
+            Tuple of (params hash, recorded item result), or None
+        """
+        try:
+            with self._lock:
+                if self._db is None:
+                    return None
+                row = self._db.execute(
+                    "SELECT params_hash, result FROM batch_items "
+                    "WHERE batch_id = ? AND item_index = ?",
+                    (batch_id, index),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read checkpoint {index} of batch {batch_id}: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    async def record(
+        self, batch_id: str, index: int, params_hash: str, result: dict[str, Any]
+    ) -> None:
+        """Checkpoint a completed item."""
+        row = (batch_id, index, params_hash, json.dumps(result, default=str), time.time())
+        try:
+            await asyncio.to_thread(self._insert, row)
+            self.checkpoints += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Could not checkpoint item {index} of batch {batch_id}: {e}")
+
+    def _insert(self, row: tuple[Any, ...]) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO batch_items "
+                "(batch_id, item_index, params_hash, result, created) VALUES (?, ?, ?, ?, ?)",
+                row,
+            )
+            self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Get checkpoint statistics."""
+        return {
+            "path": str(self.path),
+            "checkpoints": self.checkpoints,
+            "resumed": self.resumed,
+        }
+
+    def close(self) -> None:
+        """Close the journal database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
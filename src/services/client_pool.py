@@ -0,0 +1,348 @@
+"""
+Process-wide pool of Gemini clients.
+
+Building a GeminiClient creates a new genai.Client and, with it, a new HTTP
+connection pool. The pool keeps one long-lived ImageService per API key so
+connections are reused across tool calls, and rotates between keys when more
+than one is configured.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from ..config import get_settings
+from ..config.constants import (
+    DEFAULT_BATCH_JOURNAL_PATH,
+    DEFAULT_ENHANCEMENT_MODEL,
+    DEFAULT_HEDGE_BUDGET,
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_INITIAL_CONCURRENCY,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MIN_CONCURRENCY,
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_DELAY,
+)
+from ..core.exceptions import ConfigurationError
+from .batch_journal import BatchJournal
+from .concurrency import AdaptiveLimiter
+from .gemini_client import TRANSPORT_ASYNC
+from .hedging import HedgePolicy
+from .image_processing import ImageEncoder
+from .image_service import ImageService
+from .prompt_cache import PromptCache
+from .rate_limiter import RateLimiter
+from .reference_cache import ReferenceImageCache
+from .result_cache import ResultCache
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
+from .storage import ImageStore, StorageLayout
+from .storage_backends import create_storage_backend
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    """Lifecycle-aware pool of ImageService instances, one per API key."""
+
+    def __init__(
+        self,
+        api_keys: list[str],
+        *,
+        enable_enhancement: bool = True,
+        timeout: int = 60,
+        transport: str = TRANSPORT_ASYNC,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        adaptive_concurrency: bool = True,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+        min_concurrency: int = DEFAULT_MIN_CONCURRENCY,
+        model_quotas: dict[str, dict[str, int]] | None = None,
+        max_retries: int = 3,
+        retry_base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        retry_max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        retry_deadline: float = DEFAULT_RETRY_DEADLINE,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        hedge_budget: float = DEFAULT_HEDGE_BUDGET,
+        hedge_min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        enhancement_model: str = DEFAULT_ENHANCEMENT_MODEL,
+        encoder: ImageEncoder | None = None,
+        reference_cache: ReferenceImageCache | None = None,
+        prompt_cache: PromptCache | None = None,
+        result_cache: ResultCache | None = None,
+        coalesce_requests: bool = True,
+        store: ImageStore | None = None,
+        journal: BatchJournal | None = None,
+    ):
+        """
+        Initialize client pool.
+
+        Args:
+            api_keys: Gemini API keys to distribute requests across
+            enable_enhancement: Enable automatic prompt enhancement
+            timeout: Request timeout in seconds
+            transport: Gemini client transport (async or executor)
+            max_in_flight: Maximum concurrent API requests per key
+            adaptive_concurrency: Adapt each key's image concurrency (AIMD); when
+                disabled the limit stays fixed at max_in_flight
+            initial_concurrency: Starting adaptive limit per key
+            min_concurrency: Lowest adaptive limit per key
+            model_quotas: Per-model rpm/tpm/ipm quotas enforced for each key;
+                None disables client-side rate limiting
+            max_retries: Maximum retries for transient API failures
+            retry_base_delay: Minimum retry backoff delay in seconds
+            retry_max_delay: Maximum retry backoff delay in seconds
+            retry_deadline: Total retry time budget per request in seconds
+            hedge_percentile: Latency percentile after which hedged requests duplicate
+            hedge_budget: Maximum hedges as a fraction of all requests per key
+            hedge_min_samples: Latency samples required before hedging starts
+            enhancement_model: Text model used for prompt enhancement
+            encoder: Image encoder shared by all pooled services
+            reference_cache: Reference image cache shared by all callers
+            prompt_cache: Prompt enhancement cache shared by all pooled services
+                (None disables caching)
+            result_cache: Generated image cache shared by all pooled services
+                (None disables it)
+            coalesce_requests: Share one API call between identical concurrent
+                requests, across all keys
+            store: Image store used to persist generated images
+                (default: date-sharded under the default output directory)
+            journal: Checkpoint journal letting interrupted batches resume
+        """
+        # Preserve order while dropping duplicates and blanks
+        keys = list(dict.fromkeys(key for key in api_keys if key))
+        if not keys:
+            raise ConfigurationError("At least one Gemini API key is required")
+
+        self.enable_enhancement = enable_enhancement
+        self.timeout = timeout
+        self.encoder = encoder or ImageEncoder()
+        self.reference_cache = reference_cache or ReferenceImageCache(encoder=self.encoder)
+        self.prompt_cache = prompt_cache
+        self.result_cache = result_cache
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.store = store or ImageStore(DEFAULT_OUTPUT_DIR)
+        self.journal = journal or BatchJournal(DEFAULT_BATCH_JOURNAL_PATH)
+        self._services = [
+            ImageService(
+                key,
+                enable_enhancement=enable_enhancement,
+                timeout=timeout,
+                transport=transport,
+                max_in_flight=max_in_flight,
+                encoder=self.encoder,
+                limiter=AdaptiveLimiter(
+                    initial_limit=initial_concurrency if adaptive_concurrency else max_in_flight,
+                    min_limit=min_concurrency if adaptive_concurrency else max_in_flight,
+                    max_limit=max_in_flight,
+                ),
+                rate_limiter=RateLimiter(model_quotas) if model_quotas is not None else None,
+                retry_policy=RetryPolicy(
+                    max_retries=max_retries,
+                    base_delay=retry_base_delay,
+                    max_delay=retry_max_delay,
+                    deadline=retry_deadline,
+                ),
+                hedge_policy=HedgePolicy(
+                    percentile=hedge_percentile,
+                    budget=hedge_budget,
+                    min_samples=hedge_min_samples,
+                ),
+                enhancement_model=enhancement_model,
+                prompt_cache=prompt_cache,
+                result_cache=result_cache,
+                single_flight=self.single_flight,
+            )
+            for key in keys
+        ]
+        self._in_use = [0] * len(self._services)
+        self._rotation = itertools.cycle(range(len(self._services)))
+        self._closed = False
+
+        logger.info(f"Client pool initialized with {len(self._services)} API key(s)")
+
+    @property
+    def size(self) -> int:
+        """Number of pooled services (one per API key)."""
+        return len(self._services)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the pool has been closed."""
+        return self._closed
+
+    def _select(self) -> int:
+        """Pick the least busy service, rotating between ties."""
+        least = min(self._in_use)
+        for _ in range(len(self._services)):
+            index = next(self._rotation)
+            if self._in_use[index] == least:
+                return index
+        return next(self._rotation)
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[ImageService]:
+        """
+        Borrow a pooled ImageService for the duration of a request.
+
+        The service stays owned by the pool and must not be closed by the caller.
+        """
+        if self._closed:
+            raise ConfigurationError("Client pool is closed")
+
+        index = self._select()
+        self._in_use[index] += 1
+        try:
+            yield self._services[index]
+        finally:
+            self._in_use[index] -= 1
+
+    @property
+    def max_concurrency(self) -> int:
+        """Most image requests the pool can ever run at once, across all keys."""
+        return sum(service.gemini_client.limiter.max_limit for service in self._services)
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current total adaptive concurrency limit across all keys."""
+        return sum(service.gemini_client.limiter.limit for service in self._services)
+
+    async def stats(self) -> dict[str, Any]:
+        """Get pool usage statistics."""
+        return {
+            "api_keys": len(self._services),
+            "in_use": list(self._in_use),
+            "in_flight": [service.gemini_client.in_flight for service in self._services],
+            "concurrency": [service.gemini_client.limiter.stats() for service in self._services],
+            "rate_limits": [
+                service.gemini_client.rate_limiter.stats()
+                for service in self._services
+                if service.gemini_client.rate_limiter is not None
+            ],
+            "retries": [service.gemini_client.retry_policy.stats() for service in self._services],
+            "hedging": [service.gemini_client.hedge_policy.stats() for service in self._services],
+            "reference_cache": self.reference_cache.stats(),
+            "prompt_cache": self.prompt_cache.stats() if self.prompt_cache is not None else None,
+            # SQLite lookups run off the event loop
+            "result_cache": (
+                await asyncio.to_thread(self.result_cache.stats)
+                if self.result_cache is not None
+                else None
+            ),
+            "coalescing": self.single_flight.stats() if self.single_flight is not None else None,
+            "storage": await self.store.stats(),
+            "batch_journal": self.journal.stats(),
+        }
+
+    async def close(self) -> None:
+        """Close all pooled services."""
+        if self._closed:
+            return
+        self._closed = True
+
+        results = await asyncio.gather(
+            *(service.close() for service in self._services), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error closing pooled client: {result}")
+        self.encoder.close()
+        self.store.close()
+        self.journal.close()
+        self.reference_cache.clear()
+        if self.prompt_cache is not None:
+            self.prompt_cache.close()
+        if self.result_cache is not None:
+            self.result_cache.close()
+
+        logger.info("Client pool closed")
+
+
+# Global pool instance (created by the server, lazily otherwise)
+_client_pool: ClientPool | None = None
+
+
+def get_client_pool() -> ClientPool:
+    """Get or create the global client pool from settings."""
+    global _client_pool
+    if _client_pool is None or _client_pool.closed:
+        settings = get_settings()
+        encoder = ImageEncoder(
+            max_workers=settings.api.encode_workers,
+            jpeg_quality=settings.api.jpeg_quality,
+            webp_quality=settings.api.webp_quality,
+            png_compress_level=settings.api.png_compress_level,
+            optimize=settings.api.optimize_images,
+        )
+        _client_pool = ClientPool(
+            settings.api.api_keys,
+            enable_enhancement=settings.api.enable_prompt_enhancement,
+            timeout=settings.api.request_timeout,
+            transport=settings.api.api_transport,
+            max_in_flight=settings.api.max_concurrent_requests,
+            adaptive_concurrency=settings.api.adaptive_concurrency,
+            initial_concurrency=settings.api.initial_concurrency,
+            min_concurrency=settings.api.min_concurrency,
+            model_quotas=(
+                settings.api.model_quotas
+                if settings.api.enable_rate_limiting and settings.api.model_quotas
+                else None
+            ),
+            max_retries=settings.api.max_retries,
+            retry_base_delay=settings.api.retry_base_delay,
+            retry_max_delay=settings.api.retry_max_delay,
+            retry_deadline=settings.api.retry_deadline,
+            hedge_percentile=settings.api.hedge_percentile,
+            hedge_budget=settings.api.hedge_budget,
+            hedge_min_samples=settings.api.hedge_min_samples,
+            enhancement_model=settings.api.enhancement_model,
+            encoder=encoder,
+            reference_cache=ReferenceImageCache(
+                max_bytes=settings.api.reference_cache_mb * 1024 * 1024,
+                encoder=encoder,
+                max_edge=settings.api.reference_max_edge,
+                max_image_bytes=int(settings.api.reference_max_mb * 1024 * 1024),
+            ),
+            prompt_cache=(
+                PromptCache(
+                    settings.api.prompt_cache_size,
+                    ttl=settings.api.prompt_cache_ttl,
+                    path=settings.api.prompt_cache_path or None,
+                )
+                if settings.api.enable_prompt_cache
+                else None
+            ),
+            coalesce_requests=settings.api.coalesce_requests,
+            store=ImageStore(
+                settings.output_dir,
+                layout=StorageLayout(settings.server.storage_layout),
+                backend=create_storage_backend(settings.server),
+                index=settings.server.storage_index,
+            ),
+            journal=BatchJournal(
+                settings.api.batch_journal_path, retention=settings.api.job_retention
+            ),
+            result_cache=(
+                ResultCache(
+                    settings.api.result_cache_dir,
+                    max_bytes=settings.api.result_cache_mb * 1024 * 1024,
+                    max_age=settings.api.result_cache_max_age,
+                )
+                if settings.api.enable_result_cache
+                else None
+            ),
+        )
+    return _client_pool
+
+
+async def close_client_pool() -> None:
+    """Close the global client pool if it exists."""
+    global _client_pool
+    if _client_pool is not None:
+        await _client_pool.close()
+        _client_pool = None
@@ -0,0 +1,156 @@
+"""
+Adaptive concurrency control for Gemini API requests.
+
+The usable concurrency against a shared quota changes over time, so instead
+of a fixed limit the client uses AIMD (additive increase, multiplicative
+decrease): the limit creeps up while latency stays flat and is cut sharply
+when the API reports rate limiting. A burst of 429s cuts the limit once:
+requests that were already in flight when the limit was last cut say nothing
+about the new limit, so their rate limit errors are not counted again.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from ..config.constants import (
+    DEFAULT_INITIAL_CONCURRENCY,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MIN_CONCURRENCY,
+)
+from ..core.exceptions import RateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter driven by observed latency and rate limit errors."""
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = DEFAULT_INITIAL_CONCURRENCY,
+        min_limit: int = DEFAULT_MIN_CONCURRENCY,
+        max_limit: int = DEFAULT_MAX_IN_FLIGHT,
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 1.5,
+        smoothing: float = 0.1,
+    ):
+        """
+        Initialize adaptive limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest the limit may drop to
+            max_limit: Highest the limit may grow to
+            backoff_factor: Multiplier applied to the limit on rate limiting
+            latency_tolerance: Latency may rise to this multiple of the baseline
+                before growth stops
+            smoothing: Weight of each new sample in the latency baseline
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"Invalid limits: min={min_limit}, max={max_limit}")
+        if not 0 < backoff_factor < 1:
+            raise ValueError(f"backoff_factor must be between 0 and 1, got {backoff_factor}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._baseline_latency: float | None = None
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+        self.successes = 0
+        self.rate_limited = 0
+        self.ignored_rate_limited = 0
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the duration of one request.
+
+        The request's latency and outcome feed back into the limit.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        except RateLimitError:
+            self._on_rate_limited(start)
+            raise
+        else:
+            self._on_success(time.perf_counter() - start)
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        """Grow the limit by roughly one slot per limit's worth of flat-latency successes."""
+        self.successes += 1
+
+        if self._baseline_latency is None:
+            self._baseline_latency = latency
+            return
+
+        latency_flat = latency <= self._baseline_latency * self.latency_tolerance
+        self._baseline_latency += self.smoothing * (latency - self._baseline_latency)
+
+        if latency_flat and self._limit < self.max_limit:
+            previous = self.limit
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            if self.limit > previous:
+                self.increases += 1
+                logger.info(f"Concurrency limit increased to {self.limit}")
+
+    def _on_rate_limited(self, started: float) -> None:
+        """Cut the limit multiplicatively, at most once per window of in-flight requests."""
+        self.rate_limited += 1
+        if started < self._last_decrease:
+            # Sent before the last cut; that cut already accounts for it
+            self.ignored_rate_limited += 1
+            return
+
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_factor)
+        self._last_decrease = time.perf_counter()
+        self.decreases += 1
+        logger.warning(f"Rate limited; concurrency limit reduced to {self.limit}")
+
+    def stats(self) -> dict[str, Any]:
+        """Get limiter statistics."""
+        baseline = self._baseline_latency
+        return {
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "baseline_latency_seconds": round(baseline, 3) if baseline is not None else None,
+            "successes": self.successes,
+            "rate_limited": self.rate_limited,
+            "ignored_rate_limited": self.ignored_rate_limited,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
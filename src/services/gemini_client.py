@@ -4,52 +4,122 @@ Uses the official Google GenAI SDK.
 """
 
 import asyncio
-import base64
-import io
+import hashlib
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from functools import partial
 from typing import Any
 
 from google import genai
 from google.genai import types
-from PIL import Image
 
-from ..config.constants import GEMINI_MODELS
+from ..config.constants import (
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_TIMEOUT,
+    GEMINI_MODELS,
+    MAX_REFERENCE_IMAGES,
+)
 from ..core.exceptions import (
     APIError,
     AuthenticationError,
     ContentPolicyError,
     RateLimitError,
 )
+from .concurrency import AdaptiveLimiter
+from .hedging import HEDGE_NONE, HedgePolicy
+from .image_processing import sniff_image
+from .rate_limiter import RateLimiter, estimate_tokens
+from .reference_cache import ReferencePart
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Transport modes for calling the genai SDK
+TRANSPORT_ASYNC = "async"  # SDK's native async surface (client.aio)
+TRANSPORT_EXECUTOR = "executor"  # Sync SDK calls on the default thread pool
+TRANSPORTS = (TRANSPORT_ASYNC, TRANSPORT_EXECUTOR)
+
+
+def part_digest(part: types.Part) -> str:
+    """
+    SHA-256 of an inline image part's bytes (identifies reference images by content).
+
+    Parts from ReferenceImageCache carry their digest; other parts are hashed here.
+    """
+    if isinstance(part, ReferencePart) and part.digest:
+        return part.digest
+    if part.inline_data is None or part.inline_data.data is None:
+        return ""
+    return hashlib.sha256(part.inline_data.data).hexdigest()
+
 
 class GeminiClient:
     """Client for Gemini 3 Pro Image API using official Google GenAI SDK."""
 
-    def __init__(self, api_key: str, timeout: int = 60):
+    def __init__(
+        self,
+        api_key: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        *,
+        transport: str = TRANSPORT_ASYNC,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        limiter: AdaptiveLimiter | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        single_flight: SingleFlight | None = None,
+    ):
         """
         Initialize Gemini client.
 
         Args:
             api_key: Gemini API key
-            timeout: Request timeout in seconds
+            timeout: Timeout in seconds for each HTTP request to the API
+            transport: "async" for the SDK's native async client, or "executor"
+                to run the synchronous client in the default thread pool
+            max_in_flight: Maximum number of concurrent API requests
+            limiter: Adaptive concurrency limiter for image requests
+                (default: AIMD limiter capped at max_in_flight)
+            rate_limiter: Client-side quota limiter (default: no local pacing)
+            retry_policy: Retry policy for transient failures (default: 3 retries)
+            hedge_policy: Hedging policy for opt-in hedged image requests
+            single_flight: Coalesces identical concurrent image requests that
+                set a seed (None disables coalescing)
         """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Invalid transport '{transport}'. Available: {', '.join(TRANSPORTS)}")
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
         self.api_key = api_key
         self.timeout = timeout
-        self.client = genai.Client(api_key=api_key)
+        self.transport = transport
+        self.max_in_flight = max_in_flight
+        self.client = genai.Client(
+            api_key=api_key, http_options=types.HttpOptions(timeout=timeout * 1000)
+        )
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._active_requests = 0
+        self.limiter = limiter or AdaptiveLimiter(max_limit=max_in_flight)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_policy = hedge_policy or HedgePolicy()
+        self.single_flight = single_flight
 
     async def generate_image(
         self,
         prompt: str,
         *,
         model: str = "gemini-3-pro-image-preview",
-        reference_images: list[str] | None = None,
+        reference_images: list[types.Part] | None = None,
         aspect_ratio: str | None = None,
         image_size: str = "2K",
         response_modalities: list[str] | None = None,
         enable_google_search: bool = False,
+        seed: int | None = None,
+        hedge: bool = False,
         **kwargs: Any,
     ) -> dict[str, Any]:
         """
@@ -58,41 +128,89 @@ class GeminiClient:
         Args:
             prompt: Text prompt for image generation or editing instruction
             model: Model to use (default: gemini-3-pro-image-preview)
-            reference_images: List of base64-encoded reference images (up to 14)
+            reference_images: Prepared reference image parts (up to 14)
             aspect_ratio: Desired aspect ratio (optional)
             image_size: Image resolution (1K, 2K, 4K - default: 2K)
             response_modalities: Response types (TEXT, IMAGE - default: ["TEXT", "IMAGE"])
             enable_google_search: Enable Google Search grounding for real-time data
+            seed: Sampling seed; the same seed and inputs give more repeatable images
+            hedge: Issue a duplicate request if this one runs past the hedge
+                latency percentile (budget-limited), keeping the first to finish
             **kwargs: Additional parameters
 
         Returns:
-            Dict with 'images' key containing list of base64-encoded image data,
+            Dict with 'images' key containing list of image dicts (raw 'data' bytes,
+            'mime_type', 'width', 'height') exactly as returned by the API,
             'thoughts' key for thinking process, and 'text' key for text responses
 
         Raises:
             APIError: If the API request fails
         """
         model_id = GEMINI_MODELS.get(model, model)
+        if response_modalities is None:
+            response_modalities = ["TEXT", "IMAGE"]
+
+        async def generate() -> dict[str, Any]:
+            return await self._generate_image(
+                prompt,
+                model=model,
+                reference_images=reference_images,
+                aspect_ratio=aspect_ratio,
+                image_size=image_size,
+                response_modalities=response_modalities,
+                enable_google_search=enable_google_search,
+                seed=seed,
+                hedge=hedge,
+            )
+
+        # Without a seed each request samples a new image, so identical prompts
+        # (e.g. a batch asking for variations) must each make their own call
+        if self.single_flight is None or seed is None:
+            return {**await generate(), "coalesced": False}
+
+        key = (
+            "image",
+            model_id,
+            prompt,
+            aspect_ratio,
+            image_size,
+            tuple(response_modalities),
+            enable_google_search,
+            seed,
+            tuple(part_digest(part) for part in (reference_images or [])[:MAX_REFERENCE_IMAGES]),
+        )
+        result, shared = await self.single_flight.do(key, generate)
+        # Each caller gets its own copy of the (shared) result dict
+        return {**result, "coalesced": shared}
+
+    async def _generate_image(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        reference_images: list[types.Part] | None,
+        aspect_ratio: str | None,
+        image_size: str,
+        response_modalities: list[str],
+        enable_google_search: bool,
+        seed: int | None,
+        hedge: bool,
+    ) -> dict[str, Any]:
+        """Make one image generation request (see generate_image)."""
+        model_id = GEMINI_MODELS.get(model, model)
 
         try:
             # Build contents list with reference images and prompt
             contents: list[Any] = []
 
-            # Add reference images if provided (up to 14)
+            # Add reference images if provided (up to 14), sent as their original bytes
             if reference_images:
-                for ref_image_b64 in reference_images[:14]:  # Limit to max 14
-                    # Decode base64 to bytes for PIL Image
-                    image_bytes = base64.b64decode(ref_image_b64)
-                    image = Image.open(io.BytesIO(image_bytes))
-                    contents.append(image)
+                contents.extend(reference_images[:MAX_REFERENCE_IMAGES])
 
             # Add text prompt
             contents.append(prompt)
 
             # Build configuration
-            if response_modalities is None:
-                response_modalities = ["TEXT", "IMAGE"]
-
             # Build image config (SDK 1.52+ supports both aspect_ratio and image_size)
             image_config = types.ImageConfig(
                 aspect_ratio=aspect_ratio if aspect_ratio else None,
@@ -109,6 +227,9 @@ class GeminiClient:
             if enable_google_search:
                 config_args["tools"] = [{"google_search": {}}]
 
+            if seed is not None:
+                config_args["seed"] = seed
+
             config = types.GenerateContentConfig(**config_args)
 
             logger.info(f"Generating image with model: {model_id}")
@@ -116,16 +237,38 @@ class GeminiClient:
             logger.info(f"Config: {config}")
             logger.info(f"Aspect ratio: {aspect_ratio}, Image size: {image_size}")
 
-            # Generate content using official SDK (run in executor since it's synchronous)
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.models.generate_content,
-                    model=model_id,
-                    contents=contents,
-                    config=config,
-                ),
+            queue_wait = 0.0
+            tokens = estimate_tokens(prompt, len(contents) - 1)
+            images_requested = 1 if "IMAGE" in response_modalities else 0
+
+            hedge_outcome = HEDGE_NONE
+
+            @asynccontextmanager
+            async def admit() -> AsyncIterator[None]:
+                nonlocal queue_wait
+                # Every call, hedges included, queues for local quota before taking a slot
+                queue_wait += await self._wait_for_quota(
+                    model_id, tokens=tokens, images=images_requested
+                )
+                # The adaptive limiter paces image requests and learns from their outcome
+                async with self.limiter.acquire():
+                    yield
+
+            async def attempt() -> Any:
+                nonlocal hedge_outcome
+                # Only the API call is timed and hedged, not local queueing or retry backoff
+                response, hedge_outcome = await self.hedge_policy.run(
+                    partial(
+                        self._generate_content, model=model_id, contents=contents, config=config
+                    ),
+                    key=(model_id, image_size),
+                    hedge=hedge,
+                    admit=admit,
+                )
+                return response
+
+            response = await self.retry_policy.run(
+                attempt, description=f"Image generation ({model_id})"
             )
 
             # Extract images, thoughts, and text from response
@@ -151,6 +294,8 @@ class GeminiClient:
                 "text": text_parts,
                 "thoughts": thoughts,
                 "model": model,
+                "queue_wait_seconds": round(queue_wait, 3),
+                "hedge": hedge_outcome,
             }
 
             # Include grounding metadata if Google Search was used
@@ -159,6 +304,8 @@ class GeminiClient:
 
             return result
 
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Gemini API request failed: {e}")
             self._handle_exception(e)
@@ -170,6 +317,7 @@ class GeminiClient:
         *,
         model: str = "gemini-flash-latest",
         system_instruction: str | None = None,
+        response_mime_type: str | None = None,
     ) -> str:
         """
         Generate text using Gemini (for prompt enhancement).
@@ -178,6 +326,7 @@ class GeminiClient:
             prompt: Text prompt
             model: Model to use
             system_instruction: Optional system instruction
+            response_mime_type: Optional response format (e.g. application/json)
 
         Returns:
             Generated text response
@@ -187,30 +336,85 @@ class GeminiClient:
         try:
             # Build config with proper types instead of using **kwargs
             config = (
-                types.GenerateContentConfig(system_instruction=system_instruction)
-                if system_instruction
+                types.GenerateContentConfig(
+                    system_instruction=system_instruction,
+                    response_mime_type=response_mime_type,
+                )
+                if system_instruction or response_mime_type
                 else None
             )
 
-            # Run in executor since genai SDK is synchronous
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.models.generate_content,
-                    model=model_id,
-                    contents=prompt,
-                    config=config,
-                ),
+            tokens = estimate_tokens(prompt + (system_instruction or ""))
+
+            async def attempt() -> Any:
+                await self._wait_for_quota(model_id, tokens=tokens)
+                return await self._generate_content(model=model_id, contents=prompt, config=config)
+
+            response = await self.retry_policy.run(
+                attempt, description=f"Text generation ({model_id})"
             )
 
             # Extract text from response
             return response.text or ""
 
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Gemini text generation failed: {e}")
             raise APIError(f"Gemini text generation failed: {e}") from e
 
+    async def _wait_for_quota(self, model: str, *, tokens: int = 0, images: int = 0) -> float:
+        """Wait for local rate limit quota; returns seconds spent queued."""
+        if self.rate_limiter is None:
+            return 0.0
+        return await self.rate_limiter.acquire(model, tokens=tokens, images=images)
+
+    async def _generate_content(
+        self, *, model: str, contents: Any, config: types.GenerateContentConfig | None
+    ) -> Any:
+        """
+        Call generate_content through the configured transport.
+
+        At most max_in_flight requests run concurrently; extra callers wait
+        on the semaphore instead of occupying a worker thread. SDK errors are
+        translated into typed APIErrors carrying the status code and any
+        server retry hint.
+        """
+        async with self._in_flight:
+            self._active_requests += 1
+            try:
+                if self.transport == TRANSPORT_ASYNC:
+                    return await self.client.aio.models.generate_content(
+                        model=model, contents=contents, config=config
+                    )
+
+                # Fallback: synchronous SDK call on the default executor
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    None,
+                    partial(
+                        self.client.models.generate_content,
+                        model=model,
+                        contents=contents,
+                        config=config,
+                    ),
+                )
+            except Exception as e:
+                self._handle_exception(e)
+                status_code = getattr(e, "code", None)
+                raise APIError(
+                    f"Gemini API request failed: {e}",
+                    status_code=status_code if isinstance(status_code, int) else None,
+                    retry_after=self._retry_after(e),
+                ) from e
+            finally:
+                self._active_requests -= 1
+
+    @property
+    def in_flight(self) -> int:
+        """Number of API requests currently in flight."""
+        return self._active_requests
+
     def _extract_content_from_response(self, response: Any) -> dict[str, Any]:
         """
         Extract images, text, and thoughts from Gemini SDK response.
@@ -218,12 +422,15 @@ class GeminiClient:
         The genai SDK automatically handles thought signatures, so we just
         need to extract the content.
 
+        Image bytes are passed through exactly as the server returned them;
+        only the header is inspected to validate the image.
+
         Returns dict with keys:
-        - images: List of base64-encoded image data
+        - images: List of image dicts ('data' raw bytes, 'mime_type', 'width', 'height')
         - text: List of text strings
         - thoughts: List of thought objects with images and text
         """
-        images: list[str] = []
+        images: list[dict[str, Any]] = []
         text_parts: list[str] = []
         thoughts: list[dict[str, Any]] = []
 
@@ -241,27 +448,14 @@ class GeminiClient:
                 if hasattr(part, "inline_data") and part.inline_data:
                     try:
                         logger.info(f"Part {idx} has inline_data, extracting...")
-                        # Get the raw image data (bytes) from inline_data.data
-                        inline_data = part.inline_data
-                        image_bytes = inline_data.data
-
-                        # Convert to PIL Image to ensure it's valid
-                        pil_image = Image.open(io.BytesIO(image_bytes))
-                        logger.info(f"Successfully loaded PIL image: {pil_image.size}")
-
-                        # Convert PIL Image to base64
-                        buffer = io.BytesIO()
-                        pil_image.save(buffer, format="PNG")
-                        image_b64 = base64.b64encode(buffer.getvalue()).decode()
+                        image = self._passthrough_image(part.inline_data)
 
                         if is_thought:
                             logger.info(f"Adding to thoughts (is_thought={is_thought})")
-                            thoughts.append(
-                                {"type": "image", "data": image_b64, "index": len(thoughts)}
-                            )
+                            thoughts.append({"type": "image", **image, "index": len(thoughts)})
                         else:
                             logger.info(f"Adding to images (is_thought={is_thought})")
-                            images.append(image_b64)
+                            images.append(image)
                     except Exception as e:
                         logger.error(f"Could not extract image from part {idx}: {e}", exc_info=True)
 
@@ -284,23 +478,86 @@ class GeminiClient:
             "thoughts": thoughts,
         }
 
+    def _passthrough_image(self, inline_data: Any) -> dict[str, Any]:
+        """
+        Wrap inline image data from the API without transcoding it.
+
+        The header is sniffed for format and dimensions; the pixel data is
+        never decoded.
+        """
+        image_bytes = inline_data.data
+        info = sniff_image(image_bytes)
+        mime_type = getattr(inline_data, "mime_type", None) or info["mime_type"]
+        logger.info(f"Passing through {mime_type} image: {info['width']}x{info['height']}")
+
+        return {
+            "data": image_bytes,
+            "mime_type": mime_type,
+            "width": info["width"],
+            "height": info["height"],
+        }
+
     def _handle_exception(self, error: Exception) -> None:
         """Handle exceptions from genai SDK."""
         error_msg = str(error)
+        status_code = getattr(error, "code", None)
 
         logger.error(f"API request failed: {error_msg}")
 
-        # Try to determine error type from message
+        # Try to determine error type from status code and message
         if "authentication" in error_msg.lower() or "api key" in error_msg.lower():
             raise AuthenticationError("Authentication failed. Please check your Gemini API key.")
-        elif "rate limit" in error_msg.lower() or "quota" in error_msg.lower():
-            raise RateLimitError("Rate limit exceeded. Please try again later.")
+        elif (
+            status_code == 429
+            or "rate limit" in error_msg.lower()
+            or "quota" in error_msg.lower()
+            or "resource_exhausted" in error_msg.lower()
+        ):
+            raise RateLimitError(
+                "Rate limit exceeded. Please try again later.",
+                status_code=429,
+                retry_after=self._retry_after(error),
+            )
         elif "safety" in error_msg.lower() or "blocked" in error_msg.lower():
             raise ContentPolicyError(
                 "Content was blocked by safety filters. Please modify your prompt."
             )
 
+    def _retry_after(self, error: Exception) -> float | None:
+        """Extract a server retry hint (Retry-After header or RetryInfo) in seconds."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers:
+            try:
+                value = headers.get("retry-after")
+                if value is not None:
+                    return float(value)
+            except (TypeError, ValueError):
+                pass
+
+        # google.rpc.RetryInfo, e.g. {"retryDelay": "23s"}, nested in error details
+        pending: list[Any] = [getattr(error, "details", None)]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                delay = item.get("retryDelay")
+                if isinstance(delay, str) and delay.endswith("s"):
+                    try:
+                        return float(delay[:-1])
+                    except ValueError:
+                        pass
+                pending.extend(item.values())
+            elif isinstance(item, list):
+                pending.extend(item)
+        return None
+
     async def close(self) -> None:
-        """Close the Gemini client (genai SDK handles cleanup automatically)."""
-        # genai SDK doesn't require explicit cleanup
-        pass
+        """Close the underlying genai client and release its connections."""
+        try:
+            await self.client.aio.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing async genai client: {e}")
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Error closing genai client: {e}")
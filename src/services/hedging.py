@@ -0,0 +1,193 @@
+"""
+Hedged requests for tail-latency reduction.
+
+If a request is still running after a high percentile of recent latency, a
+duplicate is issued and whichever finishes first wins; the other is
+cancelled. Hedges are capped at a fraction of total requests so the extra
+cost stays bounded, and each one is admitted like a normal request (local
+quota and concurrency slot) before it is sent.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import AbstractAsyncContextManager
+from typing import Any, TypeVar
+
+from ..config.constants import (
+    DEFAULT_HEDGE_BUDGET,
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
+)
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Outcomes reported by HedgePolicy.run
+HEDGE_NONE = "none"  # No hedge was issued
+HEDGE_PRIMARY_WON = "primary"  # A hedge was issued but the original finished first
+HEDGE_WON = "hedge"  # The hedge finished first
+
+
+class HedgePolicy:
+    """Issues budget-limited duplicate requests when a request runs past its latency percentile."""
+
+    def __init__(
+        self,
+        *,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        budget: float = DEFAULT_HEDGE_BUDGET,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        window: int = 200,
+    ):
+        """
+        Initialize hedge policy.
+
+        Args:
+            percentile: Latency percentile (0-100) after which a hedge is issued
+            budget: Maximum hedges as a fraction of all requests (0.05 = 5%)
+            min_samples: Latency samples needed before hedging starts
+            window: Number of recent latency samples kept per request class
+        """
+        if not 0 < percentile < 100:
+            raise ValueError(f"percentile must be between 0 and 100, got {percentile}")
+        if not 0 <= budget <= 1:
+            raise ValueError(f"budget must be between 0 and 1, got {budget}")
+
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: dict[Hashable, deque[float]] = {}
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+
+    def hedge_delay(self, key: Hashable) -> float | None:
+        """Latency percentile for a request class, or None until enough samples exist."""
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def _record(self, key: Hashable, latency: float) -> None:
+        samples = self._latencies.setdefault(key, deque(maxlen=self.window))
+        samples.append(latency)
+
+    def _take_budget(self) -> bool:
+        """Reserve one hedge if it keeps hedges within budget of total requests."""
+        if self.hedges + 1 > self.budget * self.requests:
+            self.budget_denied += 1
+            return False
+        self.hedges += 1
+        return True
+
+    async def run(
+        self,
+        operation: Callable[[], Awaitable[_T]],
+        *,
+        key: Hashable = None,
+        hedge: bool = False,
+        admit: Callable[[], AbstractAsyncContextManager[Any]] | None = None,
+    ) -> tuple[_T, str]:
+        """
+        Run operation, optionally hedging it.
+
+        Latency of every successful request is recorded, hedged or not, so the
+        percentile reflects normal traffic. The operation should be the API
+        call alone, without retries; local queueing goes in admit, which every
+        call (the original and its hedge) enters before it is sent. Both the
+        recorded latency and the hedge timer start when the original is sent.
+
+        Args:
+            operation: Zero-argument coroutine function issuing one request
+            key: Request class (e.g. model and image size) for latency tracking
+            hedge: Allow a duplicate request for this call
+            admit: Factory for an async context manager held around each call,
+                e.g. waiting for rate limit quota and a concurrency slot
+
+        Returns:
+            Tuple of (result, outcome) where outcome is "none", "primary" or "hedge"
+        """
+        self.requests += 1
+        admission = admit or contextlib.nullcontext
+        delay = self.hedge_delay(key) if hedge else None
+        sent = asyncio.Event()
+        start = 0.0
+
+        async def call(primary: bool) -> _T:
+            nonlocal start
+            async with admission():
+                if primary:
+                    start = time.perf_counter()
+                    sent.set()
+                return await operation()
+
+        if delay is None:
+            result = await call(primary=True)
+            self._record(key, time.perf_counter() - start)
+            return result, HEDGE_NONE
+
+        primary = asyncio.ensure_future(call(primary=True))
+        try:
+            # The hedge timer runs from when the original is sent, not while it is queued
+            sent_wait = asyncio.ensure_future(sent.wait())
+            try:
+                await asyncio.wait({primary, sent_wait}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                sent_wait.cancel()
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._take_budget():
+                result = await primary
+                self._record(key, time.perf_counter() - start)
+                return result, HEDGE_NONE
+
+            logger.info(f"Request exceeded p{self.percentile:g} ({delay:.2f}s); issuing hedge")
+            secondary = asyncio.ensure_future(call(primary=False))
+            result, winner = await self._first_success(primary, secondary)
+        finally:
+            primary.cancel()
+
+        self._record(key, time.perf_counter() - start)
+        if winner is secondary:
+            self.hedge_wins += 1
+            return result, HEDGE_WON
+        return result, HEDGE_PRIMARY_WON
+
+    async def _first_success(
+        self, primary: "asyncio.Future[_T]", secondary: "asyncio.Future[_T]"
+    ) -> tuple[_T, "asyncio.Future[_T]"]:
+        """Wait for the first of two requests to succeed and cancel the other."""
+        pending = {primary, secondary}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result(), future
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Both failed: re-raise the original request's error
+        return primary.result(), primary
+
+    def stats(self) -> dict[str, Any]:
+        """Get hedging statistics."""
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else 0.0,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "budget_denied": self.budget_denied,
+        }
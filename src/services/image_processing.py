@@ -0,0 +1,323 @@
+"""
+Image byte handling helpers.
+
+Images returned by the API are passed through untouched whenever possible.
+These helpers inspect only the image header, and transcode in worker
+processes when the caller asks for a different format or encoding.
+"""
+
+import asyncio
+import io
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, TypeVar
+
+from PIL import Image, ImageOps
+
+from ..config.constants import (
+    DEFAULT_ENCODE_WORKERS,
+    DEFAULT_JPEG_QUALITY,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    DEFAULT_WEBP_QUALITY,
+    IMAGE_FORMATS,
+)
+from ..core.exceptions import ImageProcessingError
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# PIL format names for each supported mime type
+PIL_FORMATS = {
+    "image/png": "PNG",
+    "image/jpeg": "JPEG",
+    "image/webp": "WEBP",
+}
+
+# Quality steps tried, in order, when recompressing reference images
+REFERENCE_QUALITY_STEPS = (90, 80, 70, 60, 50)
+# Smallest edge a reference image is shrunk to while chasing the byte budget
+REFERENCE_MIN_EDGE = 512
+
+
+def sniff_image(data: bytes) -> dict[str, Any]:
+    """
+    Identify an image from its header without decoding the pixel data.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Dict with 'format', 'mime_type', 'width' and 'height'
+
+    Raises:
+        ImageProcessingError: If the bytes are not a recognizable image
+    """
+    try:
+        # Image.open only parses the header; pixels are decoded lazily on load()
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format or ""
+            width, height = image.size
+            mime_type = image.get_format_mimetype() or ""
+    except Exception as e:
+        raise ImageProcessingError(f"Unrecognized image data: {e}") from e
+
+    return {
+        "format": image_format,
+        "mime_type": mime_type,
+        "width": width,
+        "height": height,
+    }
+
+
+def format_to_mime_type(output_format: str) -> str:
+    """Map an output format name (png, jpeg, jpg, webp) to its mime type."""
+    try:
+        return IMAGE_FORMATS[output_format.lower()]
+    except KeyError as e:
+        available = ", ".join(IMAGE_FORMATS.keys())
+        raise ImageProcessingError(
+            f"Unsupported output format '{output_format}'. Available: {available}"
+        ) from e
+
+
+def needs_transcode(mime_type: str, output_format: str) -> bool:
+    """Check whether image bytes of mime_type must be transcoded for output_format."""
+    return format_to_mime_type(output_format) != mime_type
+
+
+def transcode_image(
+    data: bytes,
+    output_format: str,
+    *,
+    quality: int | None = None,
+    compress_level: int | None = None,
+    optimize: bool = False,
+) -> bytes:
+    """
+    Re-encode image bytes into another format.
+
+    This is a plain module-level function so it can run in worker processes.
+
+    Args:
+        data: Encoded image bytes
+        output_format: Target format (png, jpeg, jpg, webp)
+        quality: JPEG/WebP quality (1-100)
+        compress_level: PNG zlib compression level (0-9)
+        optimize: Spend extra CPU for a smaller file (PNG/JPEG)
+
+    Returns:
+        Encoded image bytes in the target format
+    """
+    pil_format = PIL_FORMATS[format_to_mime_type(output_format)]
+
+    save_args: dict[str, Any] = {"format": pil_format}
+    if pil_format == "PNG":
+        if compress_level is not None:
+            save_args["compress_level"] = compress_level
+        save_args["optimize"] = optimize
+    else:
+        if quality is not None:
+            save_args["quality"] = quality
+        if pil_format == "JPEG":
+            save_args["optimize"] = optimize
+        elif optimize:
+            # WebP's equivalent of optimize: slowest, smallest encoding method
+            save_args["method"] = 6
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            image: Image.Image = source
+            # JPEG has no alpha channel or palette support
+            if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = source.convert("RGB")
+
+            buffer = io.BytesIO()
+            image.save(buffer, **save_args)
+            return buffer.getvalue()
+    except Exception as e:
+        raise ImageProcessingError(f"Failed to transcode image to {output_format}: {e}") from e
+
+
+def prepare_reference_image(data: bytes, max_edge: int, max_bytes: int) -> tuple[bytes, str]:
+    """
+    Shrink a reference image to fit max_edge and max_bytes before upload.
+
+    Images already within both limits are returned untouched. Larger ones are
+    rotated upright per their EXIF orientation, resized (keeping aspect ratio)
+    and recompressed, stepping quality down and then dimensions until the
+    byte budget is met. This is a plain
+    module-level function so it can run in worker processes.
+
+    Args:
+        data: Encoded source image bytes
+        max_edge: Maximum width/height in pixels
+        max_bytes: Target maximum encoded size
+
+    Returns:
+        Tuple of (image bytes, mime type)
+    """
+    info = sniff_image(data)
+    if (
+        max(info["width"], info["height"]) <= max_edge
+        and len(data) <= max_bytes
+        and info["mime_type"] in PIL_FORMATS
+    ):
+        return data, info["mime_type"]
+
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            image = source.copy()
+        # Re-encoding drops EXIF, so apply the camera's Orientation tag to the pixels
+        ImageOps.exif_transpose(image, in_place=True)
+    except Exception as e:
+        raise ImageProcessingError(f"Failed to decode reference image: {e}") from e
+
+    # Keep transparency with WebP; everything else becomes JPEG
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    pil_format, mime_type = ("WEBP", "image/webp") if has_alpha else ("JPEG", "image/jpeg")
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    edge = max_edge
+    encoded = data
+    while True:
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        for quality in REFERENCE_QUALITY_STEPS:
+            buffer = io.BytesIO()
+            image.save(buffer, format=pil_format, quality=quality)
+            encoded = buffer.getvalue()
+            if len(encoded) <= max_bytes:
+                return encoded, mime_type
+
+        # Still over budget at the lowest quality: shrink and try again
+        if edge <= REFERENCE_MIN_EDGE:
+            logger.warning(
+                f"Reference image still {len(encoded)} bytes at {edge}px (budget {max_bytes})"
+            )
+            return encoded, mime_type
+        edge = max(REFERENCE_MIN_EDGE, int(edge * 0.75))
+
+
+class ImageEncoder:
+    """
+    Encodes images in a process pool so encoding never blocks the event loop.
+
+    The pool is created on first use and shared by every caller holding the
+    encoder.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = DEFAULT_ENCODE_WORKERS,
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        webp_quality: int = DEFAULT_WEBP_QUALITY,
+        png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+        optimize: bool = False,
+    ):
+        """
+        Initialize image encoder.
+
+        Args:
+            max_workers: Number of encoder worker processes
+            jpeg_quality: Default JPEG quality (1-100)
+            webp_quality: Default WebP quality (1-100)
+            png_compress_level: Default PNG compression level (0-9)
+            optimize: Default optimize flag
+        """
+        self.max_workers = max_workers
+        self.jpeg_quality = jpeg_quality
+        self.webp_quality = webp_quality
+        self.png_compress_level = png_compress_level
+        self.optimize = optimize
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, job: Callable[[], _T]) -> _T:
+        """Run a job in the worker pool."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), job)
+        except BrokenProcessPool as e:
+            # Drop the broken pool so the next call starts a fresh one
+            self._executor = None
+            raise ImageProcessingError(f"Image encoder worker failed: {e}") from e
+
+    def _default_quality(self, output_format: str) -> int | None:
+        """Get the configured default quality for a lossy format."""
+        mime_type = format_to_mime_type(output_format)
+        if mime_type == "image/jpeg":
+            return self.jpeg_quality
+        if mime_type == "image/webp":
+            return self.webp_quality
+        return None
+
+    async def encode(
+        self,
+        data: bytes,
+        output_format: str,
+        *,
+        quality: int | None = None,
+        optimize: bool | None = None,
+    ) -> tuple[bytes, float]:
+        """
+        Encode image bytes into output_format in a worker process.
+
+        Args:
+            data: Encoded source image bytes
+            output_format: Target format (png, jpeg, jpg, webp)
+            quality: JPEG/WebP quality override
+            optimize: Optimize flag override
+
+        Returns:
+            Tuple of (encoded bytes, encode time in milliseconds)
+        """
+        job = partial(
+            transcode_image,
+            data,
+            output_format,
+            quality=quality if quality is not None else self._default_quality(output_format),
+            compress_level=self.png_compress_level,
+            optimize=self.optimize if optimize is None else optimize,
+        )
+
+        start = time.perf_counter()
+        encoded = await self._run(job)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        logger.info(
+            f"Encoded {output_format}: {len(data)} -> {len(encoded)} bytes in {elapsed_ms:.1f}ms"
+        )
+        return encoded, elapsed_ms
+
+    async def prepare_reference(
+        self, data: bytes, *, max_edge: int, max_bytes: int
+    ) -> tuple[bytes, str]:
+        """
+        Downscale and recompress a reference image in a worker process.
+
+        Args:
+            data: Encoded source image bytes
+            max_edge: Maximum width/height in pixels
+            max_bytes: Target maximum encoded size
+
+        Returns:
+            Tuple of (image bytes, mime type)
+        """
+        job = partial(prepare_reference_image, data, max_edge, max_bytes)
+        return await self._run(job)
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -4,56 +4,115 @@ Provides interface for image generation using Gemini 3 Pro Image.
 """
 
 import base64
+import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from ..config.constants import GEMINI_MODELS
+from ..config.constants import (
+    DEFAULT_ENHANCEMENT_MODEL,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_TIMEOUT,
+    GEMINI_MODELS,
+    IMAGE_EXTENSIONS,
+)
 from ..core import sanitize_filename
 from ..core.exceptions import ImageProcessingError
-from .gemini_client import GeminiClient
+from .concurrency import AdaptiveLimiter
+from .gemini_client import TRANSPORT_ASYNC, GeminiClient, part_digest
+from .hedging import HedgePolicy
+from .image_processing import ImageEncoder, format_to_mime_type, needs_transcode
+from .prompt_cache import PromptCache
 from .prompt_enhancer import PromptEnhancer
+from .rate_limiter import RateLimiter
+from .result_cache import ResultCache, make_result_key
+from .retry import RetryPolicy
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class ImageResult:
-    """Container for generated image data and metadata."""
+    """
+    Container for generated image data and metadata.
+
+    Image bytes are held as a read-only memoryview over the raw encoded image;
+    the base64 form is only produced (and cached) when a caller asks for it.
+    """
+
+    __slots__ = (
+        "_data",
+        "_size",
+        "_b64",
+        "_digest",
+        "mime_type",
+        "prompt",
+        "model",
+        "index",
+        "metadata",
+        "timestamp",
+    )
 
     def __init__(
         self,
-        image_data: str,
+        image_data: bytes | bytearray | memoryview,
         prompt: str,
         model: str,
         index: int = 0,
         metadata: dict[str, Any] | None = None,
+        mime_type: str = "image/png",
     ):
-        self.image_data = image_data  # Base64-encoded
+        self._data = memoryview(image_data).toreadonly()  # Raw encoded image bytes
+        self._size = self._data.nbytes
+        self._b64: str | None = None
+        self._digest: str | None = None
+        self.mime_type = mime_type
         self.prompt = prompt
         self.model = model
         self.index = index
         self.metadata = metadata or {}
         self.timestamp = datetime.now()
 
+    @property
+    def image_bytes(self) -> memoryview:
+        """Raw encoded image bytes (zero-copy view)."""
+        return self._data
+
+    @property
+    def image_b64(self) -> str:
+        """Base64-encoded image data, computed on first access."""
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self._data).decode()
+        return self._b64
+
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the image bytes, computed on first access."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self._data).hexdigest()
+        return self._digest
+
     def save(self, output_dir: Path, filename: str | None = None) -> Path:
         """Save image to disk."""
         if filename is None:
-            filename = self._generate_filename()
+            filename = self.generate_filename(self.content_hash())
 
         output_path = output_dir / filename
 
         try:
-            # Decode base64 and save
-            image_bytes = base64.b64decode(self.image_data)
-            output_path.write_bytes(image_bytes)
+            output_path.write_bytes(self._data)
             logger.info(f"Saved image to {output_path}")
             return output_path
         except Exception as e:
             raise ImageProcessingError(f"Failed to save image: {e}") from e
 
-    def _generate_filename(self) -> str:
-        """Generate clean, short filename."""
+    def generate_filename(self, digest: str | None = None) -> str:
+        """
+        Generate clean, short filename.
+
+        A content digest, when given, is appended so images with similar
+        prompts generated in the same second never share a name.
+        """
         timestamp = self.timestamp.strftime("%Y%m%d_%H%M%S")
         # Shorten model name
         model_short = self.model.replace("gemini-3-pro-image-preview", "gemini3").replace(
@@ -62,39 +121,100 @@ class ImageResult:
         # Sanitize and shorten prompt (max 30 chars)
         prompt_snippet = sanitize_filename(self.prompt[:30])
         index_str = f"_{self.index + 1}" if self.index > 0 else ""
-        return f"{model_short}_{timestamp}_{prompt_snippet}{index_str}.png"
+        digest_str = f"_{digest[:12]}" if digest else ""
+        extension = IMAGE_EXTENSIONS.get(self.mime_type, "png")
+        return f"{model_short}_{timestamp}_{prompt_snippet}{index_str}{digest_str}.{extension}"
 
     def get_size(self) -> int:
         """Get image size in bytes."""
-        return len(base64.b64decode(self.image_data))
+        return self._size
 
 
 class ImageService:
     """Service for image generation using Gemini 3 Pro Image."""
 
-    def __init__(self, api_key: str, *, enable_enhancement: bool = True, timeout: int = 60):
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        enable_enhancement: bool = True,
+        timeout: int = DEFAULT_TIMEOUT,
+        transport: str = TRANSPORT_ASYNC,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        encoder: ImageEncoder | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        enhancement_model: str = DEFAULT_ENHANCEMENT_MODEL,
+        prompt_cache: PromptCache | None = None,
+        result_cache: ResultCache | None = None,
+        single_flight: SingleFlight | None = None,
+    ):
         """
         Initialize image service.
 
         Args:
             api_key: API key for Gemini API
             enable_enhancement: Enable automatic prompt enhancement
-            timeout: Request timeout in seconds
+            timeout: Timeout in seconds for each HTTP request to the API
+            transport: Gemini client transport (async or executor)
+            max_in_flight: Maximum concurrent API requests
+            encoder: Shared image encoder (a private one is created if omitted)
+            limiter: Adaptive concurrency limiter for image requests
+            rate_limiter: Client-side quota limiter for this API key
+            retry_policy: Retry policy for transient API failures
+            hedge_policy: Hedging policy for opt-in hedged image requests
+            enhancement_model: Text model used for prompt enhancement
+            prompt_cache: Shared cache of prompt enhancement results
+            result_cache: Shared cache of generated images (None disables it)
+            single_flight: Shared coalescer for identical concurrent requests
+                (None disables coalescing)
         """
         self.api_key = api_key
         self.enable_enhancement = enable_enhancement
         self.timeout = timeout
+        self.result_cache = result_cache
 
         # Initialize Gemini client
-        self.gemini_client = GeminiClient(api_key, timeout)
+        self.gemini_client = GeminiClient(
+            api_key,
+            timeout,
+            transport=transport,
+            max_in_flight=max_in_flight,
+            limiter=limiter,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            hedge_policy=hedge_policy,
+            single_flight=single_flight,
+        )
         self.prompt_enhancer: PromptEnhancer | None = None
 
+        # Shared encoders are owned (and closed) by whoever created them
+        self._owns_encoder = encoder is None
+        self.encoder = encoder or ImageEncoder()
+
         if enable_enhancement:
             # Prompt enhancer uses the same Gemini client
-            self.prompt_enhancer = PromptEnhancer(self.gemini_client)
+            self.prompt_enhancer = PromptEnhancer(
+                self.gemini_client,
+                model=enhancement_model,
+                cache=prompt_cache,
+                single_flight=single_flight,
+            )
 
     async def generate(
-        self, prompt: str, *, model: str | None = None, enhance_prompt: bool = True, **kwargs: Any
+        self,
+        prompt: str,
+        *,
+        model: str | None = None,
+        enhance_prompt: bool = True,
+        output_format: str | None = None,
+        quality: int | None = None,
+        optimize: bool | None = None,
+        use_cache: bool = True,
+        enhanced_prompt: str | None = None,
+        **kwargs: Any,
     ) -> list[ImageResult]:
         """
         Generate images using Gemini 3 Pro Image API.
@@ -103,6 +223,13 @@ class ImageService:
             prompt: Text prompt for image generation
             model: Model to use (default: gemini-3-pro-image-preview)
             enhance_prompt: Whether to enhance the prompt
+            output_format: Desired image format; images in another format are
+                transcoded, otherwise the API bytes are kept as-is
+            quality: JPEG/WebP quality; forces a re-encode when set
+            optimize: Optimize encoding; forces a re-encode when set
+            use_cache: Use cached results (False bypasses the caches)
+            enhanced_prompt: Prompt already enhanced by the caller (e.g. by a
+                batched enhancement); used as-is instead of enhancing again
             **kwargs: Additional parameters (aspect_ratio, reference_images, etc.)
 
         Returns:
@@ -115,14 +242,54 @@ class ImageService:
         if model not in GEMINI_MODELS:
             raise ValueError(f"Unknown model: {model}. Only Gemini 3 Pro Image is supported.")
 
+        # Serve identical requests from the result cache
+        cache_key = None
+        if self.result_cache is not None and use_cache:
+            enhanced = enhanced_prompt is not None or (
+                enhance_prompt and self.enable_enhancement and self.prompt_enhancer is not None
+            )
+            cache_key = self._result_cache_key(
+                prompt,
+                model,
+                kwargs,
+                enhance=enhanced,
+                output_format=output_format,
+                quality=quality,
+                optimize=optimize,
+            )
+            cached = await self.result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Serving {len(cached)} image(s) from result cache")
+                return [
+                    ImageResult(
+                        image_data=image["data"],
+                        prompt=prompt,
+                        model=model,
+                        index=i,
+                        metadata={
+                            **image["metadata"],
+                            # No API call or encoding happened for this request
+                            "queue_wait_seconds": 0.0,
+                            "encode_time_ms": 0.0,
+                            "hedge_outcome": "none",
+                            "coalesced": False,
+                            "cached": True,
+                        },
+                        mime_type=image["mime_type"],
+                    )
+                    for i, image in enumerate(cached)
+                ]
+
         # Enhance prompt if enabled
         original_prompt = prompt
         enhancement_context = self._build_enhancement_context(kwargs)
 
-        if enhance_prompt and self.enable_enhancement and self.prompt_enhancer:
+        if enhanced_prompt is not None:
+            prompt = enhanced_prompt
+        elif enhance_prompt and self.enable_enhancement and self.prompt_enhancer:
             try:
                 result = await self.prompt_enhancer.enhance_prompt(
-                    prompt, context=enhancement_context
+                    prompt, context=enhancement_context, use_cache=use_cache
                 )
                 prompt = result["enhanced_prompt"]
                 logger.info(f"Prompt enhanced: {len(original_prompt)} -> {len(prompt)} chars")
@@ -130,10 +297,72 @@ class ImageService:
                 logger.warning(f"Prompt enhancement failed: {e}")
 
         # Generate images using Gemini API
-        return await self._generate_with_gemini(prompt, model, original_prompt, kwargs)
+        results = await self._generate_with_gemini(
+            prompt,
+            model,
+            original_prompt,
+            kwargs,
+            output_format=output_format,
+            quality=quality,
+            optimize=optimize,
+        )
+
+        if self.result_cache is not None and cache_key is not None and results:
+            await self.result_cache.put(
+                cache_key,
+                [
+                    {
+                        "data": result.image_bytes,
+                        "mime_type": result.mime_type,
+                        "metadata": {
+                            key: value
+                            for key, value in result.metadata.items()
+                            if key not in ("reference_images", "cached", "coalesced")
+                        },
+                    }
+                    for result in results
+                ],
+            )
+
+        return results
+
+    @staticmethod
+    def _result_cache_key(
+        prompt: str,
+        model: str,
+        params: dict[str, Any],
+        *,
+        enhance: bool,
+        output_format: str | None,
+        quality: int | None,
+        optimize: bool | None,
+    ) -> str:
+        """Hash everything that determines the generated images."""
+        key_params = {key: value for key, value in params.items() if key != "hedge"}
+        references = key_params.pop("reference_images", None) or []
+        key_params["reference_images"] = [part_digest(part) for part in references]
+        return make_result_key(
+            {
+                "prompt": prompt,
+                "model": model,
+                "enhance": enhance,
+                "output_format": output_format,
+                "quality": quality,
+                "optimize": optimize,
+                "params": key_params,
+            }
+        )
 
     async def _generate_with_gemini(
-        self, prompt: str, model: str, original_prompt: str, params: dict[str, Any]
+        self,
+        prompt: str,
+        model: str,
+        original_prompt: str,
+        params: dict[str, Any],
+        *,
+        output_format: str | None = None,
+        quality: int | None = None,
+        optimize: bool | None = None,
     ) -> list[ImageResult]:
         """Generate images using Gemini API."""
         response = await self.gemini_client.generate_image(prompt=prompt, model=model, **params)
@@ -141,18 +370,75 @@ class ImageService:
         images = response["images"]
         results = []
 
-        for i, image_data in enumerate(images):
+        for i, image in enumerate(images):
+            image_data = image["data"]
+            mime_type = image["mime_type"]
+            transcoded = False
+            encode_time_ms = 0.0
+
+            # Re-encode only for a different format or explicit encoding options;
+            # otherwise the API bytes are kept as-is
+            target_format = output_format or IMAGE_EXTENSIONS.get(mime_type, "png")
+            reencode = quality is not None or optimize is not None
+            if reencode or needs_transcode(mime_type, target_format):
+                logger.info(f"Encoding image {i} from {mime_type} to {target_format}")
+                image_data, encode_time_ms = await self.encoder.encode(
+                    image_data,
+                    target_format,
+                    quality=quality,
+                    optimize=optimize,
+                )
+                mime_type = format_to_mime_type(target_format)
+                transcoded = True
+
             result = ImageResult(
                 image_data=image_data,
                 prompt=original_prompt,
                 model=model,
                 index=i,
-                metadata={"enhanced_prompt": prompt, "api": "gemini", **params},
+                metadata={
+                    "enhanced_prompt": prompt,
+                    "api": "gemini",
+                    "width": image["width"],
+                    "height": image["height"],
+                    "transcoded": transcoded,
+                    "encode_time_ms": round(encode_time_ms, 2),
+                    "queue_wait_seconds": response.get("queue_wait_seconds", 0.0),
+                    "hedge_outcome": response.get("hedge", "none"),
+                    "coalesced": response.get("coalesced", False),
+                    "cached": False,
+                    **params,
+                },
+                mime_type=mime_type,
             )
             results.append(result)
 
         return results
 
+    async def enhance_prompts(
+        self, prompts: list[str], *, use_cache: bool = True, **kwargs: Any
+    ) -> list[str]:
+        """
+        Enhance many prompts that share generation parameters in batched requests.
+
+        Args:
+            prompts: Prompts to enhance
+            use_cache: Use cached enhancements
+            **kwargs: Generation parameters shared by all prompts (aspect_ratio,
+                reference_images, etc.), used as enhancement context
+
+        Returns:
+            Enhanced prompts in input order (originals when enhancement is
+            disabled or fails)
+        """
+        if not (self.enable_enhancement and self.prompt_enhancer):
+            return list(prompts)
+
+        results = await self.prompt_enhancer.enhance_prompts(
+            prompts, context=self._build_enhancement_context(kwargs), use_cache=use_cache
+        )
+        return [result["enhanced_prompt"] for result in results]
+
     def _build_enhancement_context(self, params: dict[str, Any]) -> dict[str, Any]:
         """Build context for prompt enhancement."""
         context: dict[str, Any] = {}
@@ -170,5 +456,7 @@ class ImageService:
         return context
 
     async def close(self) -> None:
-        """Close Gemini client."""
+        """Close Gemini client and any privately owned encoder."""
         await self.gemini_client.close()
+        if self._owns_encoder:
+            self.encoder.close()
@@ -0,0 +1,121 @@
+"""
+Non-blocking image persistence.
+
+Generated images can be tens of megabytes, so writing them on the event loop
+stalls every other in-flight request. Writes run on a dedicated I/O thread
+pool, go through a temporary file and an atomic rename (readers never see a
+partial image), and are optionally fsynced. A file that already holds the
+same bytes is left alone, so content-addressed names are written once.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ..config.constants import DEFAULT_WRITE_WORKERS
+from ..core.exceptions import FileOperationError
+
+logger = logging.getLogger(__name__)
+
+# fsync policies: none (leave it to the OS), file (fsync the image), dir (also
+# fsync the directory so the rename itself survives a crash)
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_DIR = "dir"
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_FILE, FSYNC_DIR)
+
+
+class ImageWriter:
+    """Writes image files atomically on a dedicated thread pool."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WRITE_WORKERS,
+        *,
+        fsync: str = FSYNC_NONE,
+    ):
+        """
+        Initialize image writer.
+
+        Args:
+            max_workers: I/O threads used for writes
+            fsync: fsync policy: none, file or dir
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f"Invalid fsync policy '{fsync}'. Available: {', '.join(FSYNC_POLICIES)}"
+            )
+
+        self.max_workers = max_workers
+        self.fsync = fsync
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="image-writer"
+            )
+        return self._executor
+
+    async def write(self, path: Path, data: bytes | memoryview) -> None:
+        """
+        Write data to path without blocking the event loop.
+
+        Raises:
+            FileOperationError: If the file cannot be written
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._get_executor(), self._write_sync, path, data)
+        except OSError as e:
+            raise FileOperationError(f"Failed to save image to {path}: {e}") from e
+
+    def _write_sync(self, path: Path, data: bytes | memoryview) -> None:
+        """Write to a temporary file in the same directory, then rename over path."""
+        if _has_content(path, data):
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per write: concurrent writes of one path must not share it
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, "xb") as f:
+                f.write(data)
+                if self.fsync != FSYNC_NONE:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            # Another write may have put the same image there first
+            if _has_content(path, data):
+                return
+            raise
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        if self.fsync == FSYNC_DIR:
+            dir_fd = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def close(self) -> None:
+        """Wait for pending writes and shut down the I/O threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _has_content(path: Path, data: bytes | memoryview) -> bool:
+    """Check whether path is an existing file holding exactly data."""
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        return path.read_bytes() == data
+    except OSError:
+        return False
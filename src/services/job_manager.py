@@ -0,0 +1,344 @@
+"""
+Background batch jobs.
+
+A submitted job runs in the server process independently of the tool call
+that submitted it, so clients can disconnect, use other tools and poll for
+progress. Job state and every finished item are written to SQLite as they
+happen; polling reads those rows and never touches the running batch.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from ..config import get_settings
+from ..config.constants import (
+    DEFAULT_JOB_RESULTS_PAGE,
+    DEFAULT_JOB_RETENTION,
+    DEFAULT_MAX_CONCURRENT_JOBS,
+)
+from ..core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_INTERRUPTED = "interrupted"  # The server stopped while the job was queued or running
+
+# on_progress(item, finished, total); items carry 'prompt_index' and 'success'
+ProgressCallback = Callable[[dict[str, Any], int, int], Awaitable[None]]
+JobRunner = Callable[[ProgressCallback], Awaitable[dict[str, Any]]]
+
+_JOB_COLUMNS = (
+    "kind",
+    "status",
+    "params",
+    "total",
+    "completed",
+    "failed",
+    "summary",
+    "error",
+    "created",
+    "started",
+    "finished",
+)
+
+
+def _isoformat(timestamp: float | None) -> str | None:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+class JobManager:
+    """Runs batch jobs in the background and tracks them in an SQLite table."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_JOBS,
+        retention: float = DEFAULT_JOB_RETENTION,
+    ):
+        """
+        Initialize job manager.
+
+        Jobs left queued or running by a previous process are marked
+        interrupted, and finished jobs older than the retention are removed.
+
+        Args:
+            path: SQLite database file
+            max_concurrent: Jobs running at once; later submissions wait queued
+            retention: Seconds finished jobs are kept (0 = forever)
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_concurrent = max_concurrent
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "params TEXT NOT NULL, total INTEGER NOT NULL, "
+            "completed INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, "
+            "summary TEXT, error TEXT, created REAL NOT NULL, started REAL, finished REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            "job_id TEXT NOT NULL, item_index INTEGER NOT NULL, success INTEGER NOT NULL, "
+            "result TEXT NOT NULL, PRIMARY KEY (job_id, item_index))"
+        )
+
+        now = time.time()
+        interrupted = self._db.execute(
+            "UPDATE jobs SET status = ?, finished = ? WHERE status IN (?, ?)",
+            (JOB_INTERRUPTED, now, JOB_QUEUED, JOB_RUNNING),
+        ).rowcount
+        if interrupted:
+            logger.warning(f"Marked {interrupted} job(s) from a previous run as interrupted")
+        if retention:
+            self._db.execute(
+                "DELETE FROM job_items WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE finished IS NOT NULL AND finished < ?)",
+                (now - retention,),
+            )
+            self._db.execute(
+                "DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (now - retention,)
+            )
+        self._db.commit()
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._closing = False
+
+    def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> list[Any]:
+        with self._lock:
+            if self._db is None:
+                return []
+            rows = self._db.execute(sql, params).fetchall()
+            self._db.commit()
+            return rows
+
+    async def submit(self, kind: str, params: dict[str, Any], total: int, runner: JobRunner) -> str:
+        """
+        Submit a job.
+
+        Args:
+            kind: Job type (e.g. 'batch')
+            params: JSON-serializable job parameters, kept for status reports
+            total: Number of items the job will produce
+            runner: Coroutine function running the job; it receives a progress
+                callback to call as each item finishes and returns a summary dict
+
+        Returns:
+            Job ID
+        """
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO jobs (id, kind, status, params, total, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, JOB_QUEUED, json.dumps(params, default=str), total, time.time()),
+        )
+        task = asyncio.create_task(self._run(job_id, runner))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        logger.info(f"Submitted {kind} job {job_id} with {total} item(s)")
+        return job_id
+
+    async def _run(self, job_id: str, runner: JobRunner) -> None:
+        async def on_progress(item: dict[str, Any], finished: int, total: int) -> None:
+            success = bool(item.get("success", True))
+            await asyncio.to_thread(self._record_item, job_id, item, success)
+
+        try:
+            async with self._semaphore:
+                await asyncio.to_thread(
+                    self._execute,
+                    "UPDATE jobs SET status = ?, started = ? WHERE id = ?",
+                    (JOB_RUNNING, time.time(), job_id),
+                )
+                summary = await runner(on_progress)
+        except asyncio.CancelledError:
+            # Recorded synchronously: the task is being torn down
+            self._finish(job_id, JOB_INTERRUPTED if self._closing else JOB_CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self._finish(job_id, JOB_FAILED, error=str(e))
+        else:
+            self._finish(job_id, JOB_COMPLETED, summary=summary)
+            logger.info(f"Job {job_id} completed")
+
+    def _record_item(self, job_id: str, item: dict[str, Any], success: bool) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO job_items (job_id, item_index, success, result) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, item["prompt_index"], int(success), json.dumps(item, default=str)),
+            )
+            self._db.execute(
+                "UPDATE jobs SET completed = completed + ?, failed = failed + ? WHERE id = ?",
+                (int(success), int(not success), job_id),
+            )
+            self._db.commit()
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        *,
+        summary: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, summary = ?, error = ?, finished = ? WHERE id = ?",
+            (
+                status,
+                json.dumps(summary, default=str) if summary is not None else None,
+                error,
+                time.time(),
+                job_id,
+            ),
+        )
+
+    def _get_job(self, job_id: str) -> dict[str, Any]:
+        rows = self._execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            raise ValidationError(f"Unknown job: {job_id}")
+        row = dict(zip(_JOB_COLUMNS, rows[0], strict=True))
+        started, finished = row["started"], row["finished"]
+        done = row["completed"] + row["failed"]
+        return {
+            "job_id": job_id,
+            "kind": row["kind"],
+            "status": row["status"],
+            "total": row["total"],
+            "completed": row["completed"],
+            "failed": row["failed"],
+            "progress": round(done / row["total"], 3) if row["total"] else 1.0,
+            "params": json.loads(row["params"]),
+            "summary": json.loads(row["summary"]) if row["summary"] else None,
+            "error": row["error"],
+            "created": _isoformat(row["created"]),
+            "started": _isoformat(started),
+            "finished": _isoformat(finished),
+            "elapsed_seconds": round((finished or time.time()) - started, 3) if started else 0.0,
+        }
+
+    async def status(self, job_id: str) -> dict[str, Any]:
+        """
+        Get a job's status and progress counters.
+
+        Raises:
+            ValidationError: If the job does not exist
+        """
+        job = await asyncio.to_thread(self._get_job, job_id)
+        del job["summary"]
+        return job
+
+    async def results(
+        self, job_id: str, *, offset: int = 0, limit: int = DEFAULT_JOB_RESULTS_PAGE
+    ) -> dict[str, Any]:
+        """
+        Get a page of a job's finished items, ordered by item index.
+
+        Items are available as soon as they finish, while the job is still
+        running; the summary is set once the job completes.
+
+        Returns:
+            Job status with 'items' and 'next_offset' (None on the last page)
+
+        Raises:
+            ValidationError: If the job does not exist
+        """
+        job = await asyncio.to_thread(self._get_job, job_id)
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT result FROM job_items WHERE job_id = ? ORDER BY item_index LIMIT ? OFFSET ?",
+            (job_id, limit, offset),
+        )
+        job["items"] = [json.loads(row[0]) for row in rows]
+        finished_items = job["completed"] + job["failed"]
+        job["next_offset"] = offset + len(rows) if offset + len(rows) < finished_items else None
+        return job
+
+    async def cancel(self, job_id: str) -> dict[str, Any]:
+        """
+        Cancel a queued or running job. Items that already finished are kept.
+
+        Returns:
+            Job status after cancellation
+
+        Raises:
+            ValidationError: If the job does not exist
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait([task])
+            logger.info(f"Cancelled job {job_id}")
+        return await self.status(job_id)
+
+    def stats(self) -> dict[str, Any]:
+        """Get job counts by status."""
+        rows = self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {
+            "path": str(self.path),
+            "max_concurrent": self.max_concurrent,
+            "active": len(self._tasks),
+            "jobs": dict(rows),
+        }
+
+    async def close(self) -> None:
+        """Stop running jobs (marking them interrupted) and close the database."""
+        self._closing = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Interrupted {len(tasks)} running job(s)")
+
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Global job manager (created by the server, lazily otherwise)
+_job_manager: JobManager | None = None
+
+
+def get_job_manager() -> JobManager:
+    """Get or create the global job manager from settings."""
+    global _job_manager
+    if _job_manager is None:
+        settings = get_settings()
+        _job_manager = JobManager(
+            settings.api.job_db_path,
+            max_concurrent=settings.api.max_concurrent_jobs,
+            retention=settings.api.job_retention,
+        )
+    return _job_manager
+
+
+async def close_job_manager() -> None:
+    """Close the global job manager if it exists."""
+    global _job_manager
+    if _job_manager is not None:
+        await _job_manager.close()
+        _job_manager = None
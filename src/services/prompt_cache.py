@@ -0,0 +1,179 @@
+"""
+Cache of prompt enhancement results.
+
+Enhancing a prompt costs a text-model round-trip, yet the same prompts recur
+across batches and retries. Results are kept in an in-memory LRU with an
+optional SQLite tier on disk so they survive restarts. Entries expire after
+a TTL.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from ..config.constants import DEFAULT_PROMPT_CACHE_SIZE, DEFAULT_PROMPT_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    prompt: str,
+    context: dict[str, Any] | None,
+    system_instruction: str,
+    model: str,
+) -> str:
+    """
+    Build a cache key for an enhancement request.
+
+    Whitespace in the prompt is normalized so trivially different spellings of
+    the same prompt share an entry.
+    """
+    payload = json.dumps(
+        {
+            "prompt": " ".join(prompt.split()),
+            "context": context or {},
+            "system_instruction": hashlib.sha256(system_instruction.encode()).hexdigest(),
+            "model": model,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PromptCache:
+    """LRU cache of enhanced prompts with TTL and an optional SQLite tier."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_PROMPT_CACHE_SIZE,
+        *,
+        ttl: float = DEFAULT_PROMPT_CACHE_TTL,
+        path: str | Path | None = None,
+    ):
+        """
+        Initialize prompt cache.
+
+        Args:
+            max_entries: Maximum entries kept in memory
+            ttl: Seconds an entry stays valid (0 = never expires)
+            path: SQLite database file for the persistent tier (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = Path(path).expanduser() if path else None
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _is_fresh(self, created: float) -> bool:
+        return not self.ttl or time.time() - created < self.ttl
+
+    async def get(self, key: str) -> str | None:
+        """Get a cached enhanced prompt, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, created = entry
+            if self._is_fresh(created):
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._entries[key]
+            self.expired += 1
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._db_get, key)
+            if row is not None:
+                value, created = row
+                if self._is_fresh(created):
+                    self._remember(key, value, created)
+                    self.disk_hits += 1
+                    return value
+                self.expired += 1
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, value: str) -> None:
+        """Store an enhanced prompt."""
+        created = time.time()
+        self._remember(key, value, created)
+        if self._db is not None:
+            try:
+                await asyncio.to_thread(self._db_put, key, value, created)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist prompt cache entry: {e}")
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _db_get(self, key: str) -> tuple[str, float] | None:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created FROM prompt_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _db_put(self, key: str, value: str, created: float) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, value, created) VALUES (?, ?, ?)",
+                (key, value, created),
+            )
+            if self.ttl:
+                self._db.execute(
+                    "DELETE FROM prompt_cache WHERE created < ?", (created - self.ttl,)
+                )
+            self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persistent": self._db is not None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
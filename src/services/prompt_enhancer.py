@@ -3,10 +3,15 @@ Prompt enhancement service using Gemini Flash.
 Automatically optimizes prompts for better image generation results.
 """
 
+import asyncio
+import json
 import logging
 from typing import Any
 
+from ..config.constants import DEFAULT_ENHANCEMENT_MODEL, ENHANCEMENT_BATCH_SIZE
 from .gemini_client import GeminiClient
+from .prompt_cache import PromptCache, make_cache_key
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -29,24 +34,41 @@ Follow these guidelines:
 8. NEVER use hex color values (like #FF0000). Always describe colors using natural language (e.g., "dark red", "neon blue", "warm amber", "deep crimson")
 9. Output ONLY the enhanced prompt, no explanations"""
 
+BATCH_ENHANCEMENT_INSTRUCTION = """Enhance each image generation prompt in the JSON array below independently.
+Respond with ONLY a JSON array of strings: exactly one enhanced prompt per input prompt, in the same order."""
+
 
 class PromptEnhancer:
     """Service for enhancing image generation prompts."""
 
-    def __init__(self, gemini_client: GeminiClient):
+    def __init__(
+        self,
+        gemini_client: GeminiClient,
+        *,
+        model: str = DEFAULT_ENHANCEMENT_MODEL,
+        cache: PromptCache | None = None,
+        single_flight: SingleFlight | None = None,
+    ):
         """
         Initialize prompt enhancer.
 
         Args:
             gemini_client: Gemini client for text generation
+            model: Text model used for enhancement
+            cache: Cache of enhancement results (None disables caching)
+            single_flight: Coalesces identical concurrent enhancement requests
         """
         self.gemini_client = gemini_client
+        self.model = model
+        self.cache = cache
+        self.single_flight = single_flight
 
     async def enhance_prompt(
         self,
         original_prompt: str,
         *,
         context: dict[str, Any] | None = None,
+        use_cache: bool = True,
     ) -> dict[str, str]:
         """
         Enhance a prompt for better image generation.
@@ -54,25 +76,50 @@ class PromptEnhancer:
         Args:
             original_prompt: Original user prompt
             context: Optional context (features, image type, etc.)
+            use_cache: Look up and store the result in the enhancement cache
 
         Returns:
             Dict with 'enhanced_prompt' and 'original_prompt'
         """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(original_prompt, context)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Prompt enhancement served from cache")
+                return {
+                    "original_prompt": original_prompt,
+                    "enhanced_prompt": cached,
+                }
+
         # Build enhancement instruction
         instruction = self._build_enhancement_instruction(original_prompt, context)
 
-        try:
-            enhanced = await self.gemini_client.generate_text(
+        async def enhance() -> str:
+            return await self.gemini_client.generate_text(
                 prompt=instruction,
                 system_instruction=PROMPT_ENHANCEMENT_SYSTEM_INSTRUCTION,
-                model="gemini-flash-latest",
+                model=self.model,
             )
 
+        try:
+            if self.single_flight is not None:
+                # Identical concurrent enhancements share one request
+                enhanced, _ = await self.single_flight.do(
+                    ("enhance", self._cache_key(original_prompt, context)), enhance
+                )
+            else:
+                enhanced = await enhance()
+
             # Clean up the enhanced prompt
             enhanced = enhanced.strip()
 
             logger.info(f"Enhanced prompt: {len(original_prompt)} -> {len(enhanced)} chars")
 
+            # Failed enhancements fall back to the original below and are not cached
+            if self.cache is not None and cache_key is not None and enhanced:
+                await self.cache.put(cache_key, enhanced)
+
             return {
                 "original_prompt": original_prompt,
                 "enhanced_prompt": enhanced,
@@ -85,9 +132,111 @@ class PromptEnhancer:
                 "enhanced_prompt": original_prompt,
             }
 
+    async def enhance_prompts(
+        self,
+        original_prompts: list[str],
+        *,
+        context: dict[str, Any] | None = None,
+        use_cache: bool = True,
+        chunk_size: int = ENHANCEMENT_BATCH_SIZE,
+    ) -> list[dict[str, str]]:
+        """
+        Enhance many prompts sharing one context with as few requests as possible.
+
+        Cached and duplicate prompts are skipped; the rest are packed into
+        structured requests of up to chunk_size prompts each. A chunk whose
+        response cannot be parsed falls back to one request per prompt.
+
+        Args:
+            original_prompts: Original user prompts
+            context: Optional context shared by all prompts
+            use_cache: Look up and store results in the enhancement cache
+            chunk_size: Maximum prompts per request
+
+        Returns:
+            Dicts with 'enhanced_prompt' and 'original_prompt', in input order
+        """
+        enhanced: dict[str, str] = {}
+        pending: list[str] = []
+        for prompt in dict.fromkeys(original_prompts):
+            cached = None
+            if self.cache is not None and use_cache:
+                cached = await self.cache.get(self._cache_key(prompt, context))
+            if cached is not None:
+                enhanced[prompt] = cached
+            else:
+                pending.append(prompt)
+
+        chunks = [pending[i : i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        if chunks:
+            logger.info(
+                f"Enhancing {len(pending)} prompts in {len(chunks)} request(s) "
+                f"({len(original_prompts) - len(pending)} cached or duplicate)"
+            )
+        for chunk_results in await asyncio.gather(
+            *(self._enhance_chunk(chunk, context, use_cache) for chunk in chunks)
+        ):
+            enhanced.update(chunk_results)
+
+        return [
+            {"original_prompt": prompt, "enhanced_prompt": enhanced.get(prompt, prompt)}
+            for prompt in original_prompts
+        ]
+
+    async def _enhance_chunk(
+        self, prompts: list[str], context: dict[str, Any] | None, use_cache: bool
+    ) -> dict[str, str]:
+        """Enhance one chunk in a single request, falling back to per-prompt requests."""
+        instruction_parts = [BATCH_ENHANCEMENT_INSTRUCTION, json.dumps(prompts, indent=2)]
+        instruction_parts.extend(self._build_context_hints(context))
+
+        try:
+            response = await self.gemini_client.generate_text(
+                prompt="\n\n".join(instruction_parts),
+                system_instruction=PROMPT_ENHANCEMENT_SYSTEM_INSTRUCTION,
+                model=self.model,
+                response_mime_type="application/json",
+            )
+            enhanced = self._parse_batch_response(response, len(prompts))
+        except Exception as e:
+            logger.warning(
+                f"Batch enhancement of {len(prompts)} prompts failed, enhancing individually: {e}"
+            )
+            results = await asyncio.gather(
+                *(
+                    self.enhance_prompt(prompt, context=context, use_cache=use_cache)
+                    for prompt in prompts
+                )
+            )
+            return {result["original_prompt"]: result["enhanced_prompt"] for result in results}
+
+        if self.cache is not None and use_cache:
+            for prompt, value in zip(prompts, enhanced, strict=True):
+                await self.cache.put(self._cache_key(prompt, context), value)
+        return dict(zip(prompts, enhanced, strict=True))
+
+    @staticmethod
+    def _parse_batch_response(response: str, expected: int) -> list[str]:
+        """Parse a JSON array of enhanced prompts, validating its shape."""
+        parsed = json.loads(response)
+        if not isinstance(parsed, list) or len(parsed) != expected:
+            raise ValueError(f"expected a JSON array of {expected} prompts")
+        if not all(isinstance(item, str) and item.strip() for item in parsed):
+            raise ValueError("batch response contains empty or non-string prompts")
+        return [item.strip() for item in parsed]
+
+    def _cache_key(self, prompt: str, context: dict[str, Any] | None) -> str:
+        return make_cache_key(prompt, context, PROMPT_ENHANCEMENT_SYSTEM_INSTRUCTION, self.model)
+
     def _build_enhancement_instruction(self, prompt: str, context: dict[str, Any] | None) -> str:
         """Build the instruction for prompt enhancement."""
         instruction_parts = [f"Enhance this image generation prompt:\n\n{prompt}"]
+        instruction_parts.extend(self._build_context_hints(context))
+        return "\n".join(instruction_parts)
+
+    def _build_context_hints(self, context: dict[str, Any] | None) -> list[str]:
+        """Build context hint lines for an enhancement instruction."""
+        instruction_parts: list[str] = []
 
         if context:
             # Add context hints
@@ -119,7 +268,7 @@ class PromptEnhancer:
                 elif ratio in ["9:16", "2:3", "3:4"]:
                     instruction_parts.append("\nFormat: Vertical/portrait composition")
 
-        return "\n".join(instruction_parts)
+        return instruction_parts
 
 
 async def create_prompt_enhancer(api_key: str, timeout: int = 30) -> PromptEnhancer:
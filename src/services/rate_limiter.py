@@ -0,0 +1,137 @@
+"""
+Client-side rate limiting with token buckets.
+
+Requests are paced locally against per-model quotas (requests, tokens and
+images per minute) so bursts queue up and wait for capacity instead of being
+rejected by the API. Each API key gets its own RateLimiter.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from ..config.constants import REFERENCE_IMAGE_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Quota names: requests, tokens and images per minute
+QUOTA_KINDS = ("rpm", "tpm", "ipm")
+
+
+def estimate_tokens(text: str, num_images: int = 0) -> int:
+    """Roughly estimate input tokens for a request (about 4 characters per token)."""
+    return max(1, len(text) // 4) + num_images * REFERENCE_IMAGE_TOKENS
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate; waiters are served FIFO."""
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            per_minute: Tokens added per minute
+            capacity: Maximum burst size (default: one minute's worth)
+        """
+        if per_minute <= 0:
+            raise ValueError(f"per_minute must be positive, got {per_minute}")
+
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take amount tokens, waiting until they are available.
+
+        Requests larger than the bucket wait for a full bucket and leave it in
+        debt, which later callers pay off.
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        async with self._lock:
+            needed = min(amount, self.capacity)
+            self._refill()
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+        return time.monotonic() - start
+
+
+class RateLimiter:
+    """Per-model request, token and image quotas for one API key."""
+
+    def __init__(self, quotas: dict[str, dict[str, int]] | None = None):
+        """
+        Initialize rate limiter.
+
+        Args:
+            quotas: Mapping of model name to {'rpm', 'tpm', 'ipm'} limits per
+                minute; models, limits and zero limits left out are unenforced
+        """
+        self.quotas = quotas or {}
+        self._buckets: dict[str, dict[str, TokenBucket]] = {}
+        for model, limits in self.quotas.items():
+            self._buckets[model] = {
+                kind: TokenBucket(limits[kind]) for kind in QUOTA_KINDS if limits.get(kind)
+            }
+
+        self.requests = 0
+        self.queued = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self, model: str, *, tokens: int = 0, images: int = 0) -> float:
+        """
+        Wait until model has quota for one request.
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens the request consumes
+            images: Images the request will produce
+
+        Returns:
+            Seconds spent queued
+        """
+        buckets = self._buckets.get(model, {})
+        wait = 0.0
+
+        if "rpm" in buckets:
+            wait += await buckets["rpm"].acquire(1)
+        if "tpm" in buckets and tokens:
+            wait += await buckets["tpm"].acquire(tokens)
+        if "ipm" in buckets and images:
+            wait += await buckets["ipm"].acquire(images)
+
+        self.requests += 1
+        self.total_wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        if wait > 0.001:
+            self.queued += 1
+            logger.info(f"Rate limiter queued {model} request for {wait:.2f}s")
+
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        """Get queue wait statistics."""
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "mean_wait_seconds": (
+                round(self.total_wait_seconds / self.requests, 3) if self.requests else 0.0
+            ),
+        }
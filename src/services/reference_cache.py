@@ -0,0 +1,182 @@
+"""
+Cache of prepared reference images.
+
+Reference images are read from disk once, downscaled/recompressed to the
+upload budget in worker processes, and kept as ready-to-send SDK parts
+(raw bytes + mime type) along with the SHA-256 of those bytes. Workflows
+that reuse the same references across many prompts skip the file read,
+preprocessing and hashing on every call.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from google.genai import types
+from pydantic import PrivateAttr
+
+from ..config.constants import (
+    DEFAULT_REFERENCE_CACHE_BYTES,
+    DEFAULT_REFERENCE_MAX_BYTES,
+    DEFAULT_REFERENCE_MAX_EDGE,
+    MAX_IMAGE_SIZE_BYTES,
+)
+from .image_processing import PIL_FORMATS, ImageEncoder, sniff_image
+
+logger = logging.getLogger(__name__)
+
+# Cache key: resolved path, modification time (ns) and file size
+CacheKey = tuple[str, int, int]
+
+
+class ReferencePart(types.Part):
+    """SDK part for a reference image that carries the digest of its bytes."""
+
+    _digest: str = PrivateAttr(default="")
+
+    @classmethod
+    def from_image(cls, data: bytes, mime_type: str, digest: str) -> "ReferencePart":
+        """Build an inline image part with a precomputed SHA-256 hex digest."""
+        part = cls(inline_data=types.Blob(data=data, mime_type=mime_type))
+        part._digest = digest
+        return part
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the image bytes, computed once when the part was prepared."""
+        return self._digest
+
+
+class ReferenceImageCache:
+    """LRU cache of reference image parts bounded by total byte size."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_REFERENCE_CACHE_BYTES,
+        *,
+        encoder: ImageEncoder | None = None,
+        max_edge: int = DEFAULT_REFERENCE_MAX_EDGE,
+        max_image_bytes: int = DEFAULT_REFERENCE_MAX_BYTES,
+    ):
+        """
+        Initialize reference image cache.
+
+        Args:
+            max_bytes: Maximum total size of cached image bytes
+            encoder: Encoder whose worker processes prepare oversized images
+            max_edge: Maximum width/height of an uploaded reference image
+            max_image_bytes: Target maximum size of an uploaded reference image
+        """
+        self.max_bytes = max_bytes
+        self.encoder = encoder or ImageEncoder()
+        self.max_edge = max_edge
+        self.max_image_bytes = min(max_image_bytes, MAX_IMAGE_SIZE_BYTES)
+        self._entries: OrderedDict[CacheKey, ReferencePart] = OrderedDict()
+        self._sizes: dict[CacheKey, int] = {}
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of cached image bytes."""
+        return self._total_bytes
+
+    async def load(self, paths: list[str]) -> list[types.Part]:
+        """
+        Load reference images as SDK parts, reading uncached files in parallel.
+
+        Missing or unreadable files are logged and skipped.
+
+        Args:
+            paths: Reference image file paths
+
+        Returns:
+            Prepared parts in the same order as paths (minus skipped files)
+        """
+        parts = await asyncio.gather(*(self._load_one(path) for path in paths))
+        return [part for part in parts if part is not None]
+
+    async def _load_one(self, path: str) -> ReferencePart | None:
+        """Load a single reference image, using the cache when the file is unchanged."""
+        image_path = Path(path)
+        try:
+            stat = await asyncio.to_thread(image_path.stat)
+        except OSError:
+            logger.warning(f"Reference image not found: {path}")
+            return None
+
+        key: CacheKey = (str(image_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        try:
+            data = await asyncio.to_thread(image_path.read_bytes)
+            info = sniff_image(data)
+            if self._needs_preparation(data, info):
+                original_size = len(data)
+                data, mime_type = await self.encoder.prepare_reference(
+                    data, max_edge=self.max_edge, max_bytes=self.max_image_bytes
+                )
+                logger.info(
+                    f"Prepared reference image {path}: {original_size} -> {len(data)} bytes"
+                )
+            else:
+                mime_type = info["mime_type"]
+            # Hashed once here, off the event loop; request keys reuse the digest
+            digest = await asyncio.to_thread(lambda: hashlib.sha256(data).hexdigest())
+        except Exception as e:
+            logger.warning(f"Could not load reference image {path}: {e}")
+            return None
+
+        part = ReferencePart.from_image(data, mime_type, digest)
+        self._put(key, part, len(data))
+        return part
+
+    def _needs_preparation(self, data: bytes, info: dict[str, Any]) -> bool:
+        """Check whether an image exceeds the upload limits."""
+        return (
+            max(info["width"], info["height"]) > self.max_edge
+            or len(data) > self.max_image_bytes
+            or info["mime_type"] not in PIL_FORMATS
+        )
+
+    def _put(self, key: CacheKey, part: ReferencePart, size: int) -> None:
+        """Insert an entry and evict least recently used entries over budget."""
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._total_bytes -= self._sizes[key]
+        self._entries[key] = part
+        self._sizes[key] = size
+        self._total_bytes += size
+
+        while self._total_bytes > self.max_bytes:
+            evicted, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(evicted)
+
+    def stats(self) -> dict[str, int]:
+        """Get cache statistics."""
+        return {
+            "max_edge": self.max_edge,
+            "max_image_bytes": self.max_image_bytes,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+        self._sizes.clear()
+        self._total_bytes = 0
@@ -0,0 +1,235 @@
+"""
+Content-addressed cache of generated images.
+
+Identical generation requests (same prompt, model, parameters and reference
+image contents) are served from disk instead of paying for another render.
+Image bytes are stored as files under the cache directory with a SQLite
+index; entries are evicted by age and by total size, least recently used
+first.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from ..config.constants import (
+    DEFAULT_RESULT_CACHE_BYTES,
+    DEFAULT_RESULT_CACHE_MAX_AGE,
+    IMAGE_EXTENSIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_result_key(params: dict[str, Any]) -> str:
+    """Build a canonical hash of generation parameters."""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Disk cache of generated images keyed by a hash of the request."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+        max_age: float = DEFAULT_RESULT_CACHE_MAX_AGE,
+    ):
+        """
+        Initialize result cache.
+
+        Args:
+            directory: Directory holding cached images and the index database
+            max_bytes: Maximum total size of cached images
+            max_age: Seconds an entry stays valid (0 = no age limit)
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = sqlite3.connect(
+            self.directory / "index.db", check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, images TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> list[dict[str, Any]] | None:
+        """
+        Get cached images for a request.
+
+        Returns:
+            List of dicts with 'data', 'mime_type' and 'metadata', or None on a miss
+        """
+        try:
+            images = await asyncio.to_thread(self._get, key)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            images = None
+
+        if images is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return images
+
+    async def put(self, key: str, images: list[dict[str, Any]]) -> None:
+        """
+        Store images produced by a request.
+
+        Args:
+            key: Request key from make_result_key
+            images: Dicts with 'data', 'mime_type' and JSON-serializable 'metadata'
+        """
+        try:
+            await asyncio.to_thread(self._put, key, images)
+            self.stores += 1
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not store result in cache: {e}")
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name[:2] / name
+
+    def _get(self, key: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT images, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.max_age and time.time() - row[1] > self.max_age:
+                self._delete(key, json.loads(row[0]))
+                self._db.commit()
+                return None
+
+            entries = json.loads(row[0])
+            images = []
+            for entry in entries:
+                try:
+                    data = self._path(entry["file"]).read_bytes()
+                except FileNotFoundError:
+                    # Files removed behind our back; drop the stale entry
+                    self._delete(key, entries)
+                    self._db.commit()
+                    return None
+                images.append(
+                    {"data": data, "mime_type": entry["mime_type"], "metadata": entry["metadata"]}
+                )
+
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return images
+
+    def _put(self, key: str, images: list[dict[str, Any]]) -> None:
+        entries = []
+        size = 0
+        for i, image in enumerate(images):
+            name = f"{key}-{i}.{IMAGE_EXTENSIONS.get(image['mime_type'], 'png')}"
+            path = self._path(name)
+            path.parent.mkdir(exist_ok=True)
+            # A temp file per write: concurrent stores of one key must not share it
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(image["data"])
+                os.replace(temp_name, path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+            size += len(image["data"])
+            entries.append(
+                {"file": name, "mime_type": image["mime_type"], "metadata": image["metadata"]}
+            )
+
+        now = time.time()
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, images, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(entries, default=str), size, now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under budget."""
+        if self._db is None:
+            return
+        if self.max_age:
+            expired = self._db.execute(
+                "SELECT key, images FROM results WHERE created < ?", (now - self.max_age,)
+            ).fetchall()
+            for key, images in expired:
+                self._delete(key, json.loads(images))
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, images, size in self._db.execute(
+            "SELECT key, images, size FROM results ORDER BY accessed"
+        ).fetchall():
+            self._delete(key, json.loads(images))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _delete(self, key: str, entries: list[dict[str, Any]]) -> None:
+        if self._db is None:
+            return
+        for entry in entries:
+            self._path(entry["file"]).unlink(missing_ok=True)
+        self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+        self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        entries, size = 0, 0
+        with self._lock:
+            if self._db is not None:
+                entries, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+                ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "directory": str(self.directory),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
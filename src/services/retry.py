@@ -0,0 +1,172 @@
+"""
+Retry engine for Gemini API requests.
+
+Transient failures (rate limiting, 5xx, timeouts, dropped connections) are
+retried with decorrelated-jitter backoff, honoring any retry delay the server
+asks for, within a total time budget per request. The budget also bounds
+each attempt, so a hung request cannot outlive it.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import httpx
+
+from ..config.constants import (
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_DEADLINE,
+    DEFAULT_RETRY_MAX_DELAY,
+    RETRYABLE_STATUS_CODES,
+)
+from ..core.exceptions import (
+    APIError,
+    AuthenticationError,
+    ContentPolicyError,
+    RateLimitError,
+    ValidationError,
+)
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Network-level failures: timeouts, refused or reset connections, broken
+# responses. httpx.TransportError covers httpx's timeouts and connection errors.
+_TRANSPORT_ERRORS: tuple[type[BaseException], ...] = (httpx.TransportError, TimeoutError, OSError)
+try:
+    # The genai SDK uses aiohttp for async requests when it is installed
+    import aiohttp
+
+    _TRANSPORT_ERRORS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+except ImportError:
+    pass
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify an error as transient (worth retrying) or permanent.
+
+    An APIError without a status code is classified by the transport error
+    that caused it.
+    """
+    if isinstance(error, AuthenticationError | ContentPolicyError | ValidationError):
+        return False
+    if isinstance(error, RateLimitError):
+        return True
+    if isinstance(error, APIError):
+        if error.status_code is not None:
+            return error.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error.__cause__, _TRANSPORT_ERRORS)
+    return isinstance(error, _TRANSPORT_ERRORS)
+
+
+class RetryPolicy:
+    """Retries an async operation with decorrelated-jitter exponential backoff."""
+
+    def __init__(
+        self,
+        *,
+        max_retries: int = 3,
+        base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: float = DEFAULT_RETRY_MAX_DELAY,
+        deadline: float = DEFAULT_RETRY_DEADLINE,
+    ):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_retries: Maximum retries after the first attempt
+            base_delay: Minimum backoff delay in seconds
+            max_delay: Maximum backoff delay in seconds
+            deadline: Total time budget in seconds for all attempts of one
+                request; an attempt still running when it runs out is cancelled
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+        self.attempts = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+
+    def next_delay(self, previous: float) -> float:
+        """Decorrelated jitter: random between base and 3x the previous delay, capped."""
+        return min(
+            self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3))
+        )
+
+    async def run(
+        self, operation: Callable[[], Awaitable[_T]], *, description: str = "request"
+    ) -> _T:
+        """
+        Run operation, retrying transient failures.
+
+        Args:
+            operation: Zero-argument coroutine function performing one attempt
+            description: Name used in log messages
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            The last error when it is permanent, retries are exhausted, or the
+            deadline budget would be exceeded (TimeoutError if the budget runs
+            out during an attempt)
+        """
+        start = time.monotonic()
+        delay = self.base_delay
+        attempt = 0
+
+        while True:
+            attempt += 1
+            self.attempts += 1
+            try:
+                async with asyncio.timeout(self.deadline - (time.monotonic() - start)):
+                    result = await operation()
+            except Exception as e:
+                if not is_retryable(e) or attempt > self.max_retries:
+                    self.failures += 1
+                    raise
+
+                delay = self.next_delay(delay)
+                retry_after = getattr(e, "retry_after", None)
+                if retry_after is not None:
+                    # The server's hint wins over our own backoff when it is longer
+                    delay = max(delay, retry_after)
+
+                elapsed = time.monotonic() - start
+                if elapsed + delay > self.deadline:
+                    self.failures += 1
+                    self.deadline_exceeded += 1
+                    logger.warning(
+                        f"{description} failed after {attempt} attempts; "
+                        f"retry deadline of {self.deadline}s would be exceeded"
+                    )
+                    raise
+
+                self.retries += 1
+                logger.warning(
+                    f"{description} attempt {attempt} failed ({type(e).__name__}: {e}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.successes += 1
+                return result
+
+    def stats(self) -> dict[str, Any]:
+        """Get retry counters."""
+        return {
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "successes": self.successes,
+            "failures": self.failures,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
@@ -0,0 +1,88 @@
+"""
+In-flight request coalescing.
+
+When several callers ask for the same thing at the same time, only the
+first one makes the underlying call; the others wait for it and share its
+result (or its error). Nothing is kept once the call completes.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class _Call:
+    """A shared in-flight call and the number of callers waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one underlying call."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, operation: Callable[[], Awaitable[_T]]) -> tuple[_T, bool]:
+        """
+        Run operation, or join an identical call that is already running.
+
+        The call runs in its own task, so a cancelled caller does not cancel
+        it for the others; it is only cancelled when every caller has gone.
+
+        Args:
+            key: Identity of the request; equal keys share one call
+            operation: Zero-argument coroutine function making the call
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            joined a call started by another caller
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(operation()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+            logger.info("Joining identical in-flight request")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, int]:
+        """Get coalescing statistics."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+        }
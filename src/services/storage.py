@@ -0,0 +1,194 @@
+"""
+Storage layout for generated images.
+
+Filenames carry a content hash, so concurrent images with similar prompts
+never overwrite each other. Large collections can be sharded into
+subdirectories (by date or by hash) so no single directory grows unbounded.
+Bytes go to a pluggable backend (local directory, memory or S3); an optional
+SQLite index in the output directory records every image written.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from ..config.constants import DEFAULT_STORAGE_INDEX, DEFAULT_STORAGE_LAYOUT
+from .image_service import ImageResult
+from .storage_backends import LocalBackend, StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Directory layouts: everything in one directory, YYYY/MM/DD, or two levels of
+# content hash prefixes (256 x 256 directories)
+LAYOUT_FLAT = "flat"
+LAYOUT_DATE = "date"
+LAYOUT_HASH = "hash"
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_DATE, LAYOUT_HASH)
+
+INDEX_FILENAME = "index.db"
+
+
+class StorageLayout:
+    """Maps images to collision-free relative paths."""
+
+    def __init__(self, layout: str = DEFAULT_STORAGE_LAYOUT):
+        """
+        Initialize storage layout.
+
+        Args:
+            layout: Directory layout: flat, date or hash
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"Invalid storage layout '{layout}'. Available: {', '.join(LAYOUTS)}")
+        self.layout = layout
+
+    def key_for(self, result: ImageResult, digest: str) -> str:
+        """
+        Relative path (POSIX style) for an image.
+
+        Args:
+            result: Generated image
+            digest: SHA-256 hex digest of the image bytes
+        """
+        filename = result.generate_filename(digest)
+        if self.layout == LAYOUT_DATE:
+            return str(PurePosixPath(result.timestamp.strftime("%Y/%m/%d"), filename))
+        if self.layout == LAYOUT_HASH:
+            return str(PurePosixPath(digest[:2], digest[2:4], filename))
+        return filename
+
+
+class ImageIndex:
+    """SQLite index of stored images."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize image index.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "key TEXT PRIMARY KEY, digest TEXT NOT NULL, prompt TEXT, model TEXT, "
+            "mime_type TEXT, size INTEGER, created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS images_digest ON images (digest)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS images_created ON images (created)")
+        self._db.commit()
+
+    async def record(self, key: str, digest: str, result: ImageResult) -> None:
+        """Record a stored image."""
+        row = (key, digest, result.prompt, result.model, result.mime_type, result.get_size())
+        try:
+            await asyncio.to_thread(self._insert, row)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index image {key}: {e}")
+
+    def _insert(self, row: tuple[Any, ...]) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO images "
+                "(key, digest, prompt, model, mime_type, size, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*row, time.time()),
+            )
+            self._db.commit()
+
+    async def count(self) -> int:
+        """Number of indexed images."""
+        return await asyncio.to_thread(self._count)
+
+    def _count(self) -> int:
+        with self._lock:
+            if self._db is None:
+                return 0
+            return int(self._db.execute("SELECT COUNT(*) FROM images").fetchone()[0])
+
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class ImageStore:
+    """Saves generated images to a storage backend under a layout and indexes them."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        layout: StorageLayout | None = None,
+        backend: StorageBackend | None = None,
+        index: bool = DEFAULT_STORAGE_INDEX,
+    ):
+        """
+        Initialize image store.
+
+        Args:
+            root: Output directory (holds the index; also the default backend root)
+            layout: Storage layout (default: flat)
+            backend: Where image bytes are written (default: local files under root)
+            index: Record stored images in an SQLite index under root
+        """
+        self.root = Path(root).expanduser()
+        self.layout = layout or StorageLayout()
+        self.backend = backend or LocalBackend(self.root)
+        self.index = ImageIndex(self.root / INDEX_FILENAME) if index else None
+
+    async def save(self, result: ImageResult) -> dict[str, Any]:
+        """
+        Save an image.
+
+        Returns:
+            Dict with 'filename', 'key' (path relative to the backend root),
+            'uri', 'write_time_ms', and 'path' for the local backend
+
+        Raises:
+            FileOperationError: If the backend write fails
+        """
+        digest = await asyncio.to_thread(result.content_hash)
+        key = self.layout.key_for(result, digest)
+        stored = await self.backend.put(key, result.image_bytes, content_type=result.mime_type)
+        logger.info(f"Saved image to {stored['uri']} in {stored['write_time_ms']:.1f}ms")
+
+        if self.index is not None:
+            await self.index.record(key, digest, result)
+
+        info = {
+            "filename": PurePosixPath(key).name,
+            "key": key,
+            "uri": stored["uri"],
+            "write_time_ms": round(stored["write_time_ms"], 2),
+        }
+        if "path" in stored:
+            info["path"] = stored["path"]
+        return info
+
+    async def stats(self) -> dict[str, Any]:
+        """Get storage statistics."""
+        return {
+            "root": str(self.root),
+            "layout": self.layout.layout,
+            "indexed_images": await self.index.count() if self.index is not None else None,
+            "backend": self.backend.stats(),
+        }
+
+    def close(self) -> None:
+        """Flush pending writes, release backend connections and close the index."""
+        self.backend.close()
+        if self.index is not None:
+            self.index.close()
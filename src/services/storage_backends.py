@@ -0,0 +1,344 @@
+"""
+Storage backends for generated images.
+
+Images are written straight to their final destination: the local output
+directory, process memory, or an S3-compatible object store (AWS S3, MinIO,
+R2, ...). The S3 backend needs the optional boto3 dependency
+(pip install 'ultimate-gemini-mcp[s3]').
+"""
+
+import asyncio
+import io
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from ..config import ServerConfig
+from ..config.constants import (
+    DEFAULT_MEMORY_STORAGE_BYTES,
+    DEFAULT_S3_MAX_CONNECTIONS,
+    DEFAULT_S3_MULTIPART_CHUNK_BYTES,
+    DEFAULT_S3_MULTIPART_THRESHOLD_BYTES,
+)
+from ..core.exceptions import ConfigurationError, FileOperationError
+from .image_writer import ImageWriter
+
+logger = logging.getLogger(__name__)
+
+BACKEND_LOCAL = "local"
+BACKEND_MEMORY = "memory"
+BACKEND_S3 = "s3"
+BACKENDS = (BACKEND_LOCAL, BACKEND_MEMORY, BACKEND_S3)
+
+
+class StorageBackend(ABC):
+    """Destination that generated images are written to, addressed by relative keys."""
+
+    name = ""
+    # Whether stored images outlive the process (batch checkpoints rely on it)
+    durable = True
+
+    def __init__(self, window: int = 1000):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.writes = 0
+        self.failures = 0
+        self.bytes_written = 0
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes | memoryview, *, content_type: str) -> dict[str, Any]:
+        """
+        Store data under key.
+
+        Returns:
+            Dict with at least 'uri'; local backends also return 'path'
+
+        Raises:
+            FileOperationError: If the write fails
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """
+        Read back the data stored under key.
+
+        Raises:
+            FileOperationError: If the key does not exist or cannot be read
+        """
+
+    def _record(self, start: float, size: int) -> float:
+        """Record one successful write; returns its latency in milliseconds."""
+        latency_ms = (time.perf_counter() - start) * 1000
+        self._latencies.append(latency_ms)
+        self.writes += 1
+        self.bytes_written += size
+        return latency_ms
+
+    def stats(self) -> dict[str, Any]:
+        """Get write statistics."""
+        ordered = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+        return {
+            "backend": self.name,
+            "writes": self.writes,
+            "failures": self.failures,
+            "bytes_written": self.bytes_written,
+            "mean_latency_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p50_latency_ms": percentile(50),
+            "p95_latency_ms": percentile(95),
+            "max_latency_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush pending writes and release connections."""
+
+
+class LocalBackend(StorageBackend):
+    """Writes images under a local directory (atomic, on the writer's I/O threads)."""
+
+    name = BACKEND_LOCAL
+
+    def __init__(self, root: str | Path, *, writer: ImageWriter | None = None):
+        """
+        Initialize local backend.
+
+        Args:
+            root: Output directory
+            writer: Writer performing the file writes
+        """
+        super().__init__()
+        self.root = Path(root).expanduser()
+        self.writer = writer or ImageWriter()
+
+    async def put(self, key: str, data: bytes | memoryview, *, content_type: str) -> dict[str, Any]:
+        path = self.root / key
+        start = time.perf_counter()
+        try:
+            await self.writer.write(path, data)
+        except FileOperationError:
+            self.failures += 1
+            raise
+        write_time_ms = self._record(start, len(data))
+        return {"uri": path.as_uri(), "path": str(path), "write_time_ms": write_time_ms}
+
+    async def get(self, key: str) -> bytes:
+        path = self.root / key
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except OSError as e:
+            raise FileOperationError(f"Failed to read image {path}: {e}") from e
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "root": str(self.root),
+            "workers": self.writer.max_workers,
+            "fsync": self.writer.fsync,
+        }
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps images in process memory, evicting the oldest beyond a byte budget."""
+
+    name = BACKEND_MEMORY
+    durable = False
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_STORAGE_BYTES):
+        """
+        Initialize memory backend.
+
+        Args:
+            max_bytes: Maximum total size of stored images
+        """
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._objects: OrderedDict[str, bytes] = OrderedDict()
+        self._total_bytes = 0
+
+    async def put(self, key: str, data: bytes | memoryview, *, content_type: str) -> dict[str, Any]:
+        start = time.perf_counter()
+        if key in self._objects:
+            self._total_bytes -= len(self._objects.pop(key))
+        self._objects[key] = bytes(data)
+        self._total_bytes += len(data)
+        while self._total_bytes > self.max_bytes and len(self._objects) > 1:
+            _, evicted = self._objects.popitem(last=False)
+            self._total_bytes -= len(evicted)
+        write_time_ms = self._record(start, len(data))
+        return {"uri": f"memory://{key}", "write_time_ms": write_time_ms}
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return self._objects[key]
+        except KeyError:
+            raise FileOperationError(f"Image not found in memory storage: {key}") from None
+
+    def stats(self) -> dict[str, Any]:
+        return {**super().stats(), "objects": len(self._objects), "bytes": self._total_bytes}
+
+    def close(self) -> None:
+        self._objects.clear()
+        self._total_bytes = 0
+
+
+class S3Backend(StorageBackend):
+    """
+    Uploads images to an S3-compatible object store.
+
+    One boto3 client with a bounded connection pool is shared by all uploads;
+    uploads above the multipart threshold are streamed in parts.
+    """
+
+    name = BACKEND_S3
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        max_connections: int = DEFAULT_S3_MAX_CONNECTIONS,
+        multipart_threshold: int = DEFAULT_S3_MULTIPART_THRESHOLD_BYTES,
+        multipart_chunk_size: int = DEFAULT_S3_MULTIPART_CHUNK_BYTES,
+    ):
+        """
+        Initialize S3 backend.
+
+        Credentials come from the standard AWS sources (environment variables,
+        shared config files, instance roles).
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix for all images
+            endpoint_url: Custom endpoint for S3-compatible stores (e.g. MinIO)
+            region: Bucket region
+            max_connections: Size of the HTTP connection pool, and concurrent
+                uploads (one thread each)
+            multipart_threshold: Uploads larger than this many bytes use multipart
+            multipart_chunk_size: Part size in bytes for multipart uploads
+        """
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+        except ImportError as e:
+            raise ConfigurationError(
+                "The s3 storage backend requires boto3: pip install 'ultimate-gemini-mcp[s3]'"
+            ) from e
+
+        if not bucket:
+            raise ConfigurationError("S3_BUCKET is required for the s3 storage backend")
+
+        super().__init__()
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        self.max_connections = max_connections
+        self._client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            config=Config(max_pool_connections=max_connections),
+        )
+        # Each upload sends its parts on the calling executor thread: with
+        # transfer threads as well, max_connections uploads could each start
+        # max_connections more threads competing for the same connection pool
+        self._transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunk_size,
+            use_threads=False,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="s3-upload"
+        )
+
+    def _object_key(self, key: str) -> str:
+        return str(PurePosixPath(self.prefix, key)) if self.prefix else key
+
+    async def put(self, key: str, data: bytes | memoryview, *, content_type: str) -> dict[str, Any]:
+        object_key = self._object_key(key)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(self._executor, self._upload, object_key, data, content_type)
+        except Exception as e:
+            self.failures += 1
+            raise FileOperationError(
+                f"Failed to upload image to s3://{self.bucket}/{object_key}: {e}"
+            ) from e
+        write_time_ms = self._record(start, len(data))
+        return {"uri": f"s3://{self.bucket}/{object_key}", "write_time_ms": write_time_ms}
+
+    def _upload(self, object_key: str, data: bytes | memoryview, content_type: str) -> None:
+        self._client.upload_fileobj(
+            io.BytesIO(data),
+            self.bucket,
+            object_key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self._transfer_config,
+        )
+
+    async def get(self, key: str) -> bytes:
+        object_key = self._object_key(key)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, self._download, object_key)
+        except Exception as e:
+            raise FileOperationError(
+                f"Failed to read image s3://{self.bucket}/{object_key}: {e}"
+            ) from e
+
+    def _download(self, object_key: str) -> bytes:
+        response = self._client.get_object(Bucket=self.bucket, Key=object_key)
+        data: bytes = response["Body"].read()
+        return data
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **super().stats(),
+            "bucket": self.bucket,
+            "prefix": self.prefix,
+            "endpoint_url": self.endpoint_url,
+            "max_connections": self.max_connections,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._client.close()
+
+
+def create_storage_backend(settings: ServerConfig) -> StorageBackend:
+    """Create the storage backend selected by STORAGE_BACKEND."""
+    if settings.storage_backend == BACKEND_LOCAL:
+        return LocalBackend(
+            settings.output_dir,
+            writer=ImageWriter(settings.write_workers, fsync=settings.fsync_policy),
+        )
+    if settings.storage_backend == BACKEND_MEMORY:
+        return MemoryBackend(settings.memory_storage_mb * 1024 * 1024)
+    if settings.storage_backend == BACKEND_S3:
+        return S3Backend(
+            settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url or None,
+            region=settings.s3_region or None,
+            max_connections=settings.s3_max_connections,
+            multipart_threshold=settings.s3_multipart_threshold_mb * 1024 * 1024,
+            multipart_chunk_size=settings.s3_multipart_chunk_mb * 1024 * 1024,
+        )
+    raise ConfigurationError(
+        f"Invalid storage backend '{settings.storage_backend}'. Available: {', '.join(BACKENDS)}"
+    )
@@ -1,11 +1,21 @@
 """Tools module for Ultimate Gemini MCP."""
 
-from .batch_generate import batch_generate_images, register_batch_generate_tool
+from .batch_generate import (
+    batch_generate_file,
+    batch_generate_images,
+    register_batch_generate_tool,
+    run_batch,
+)
 from .generate_image import generate_image_tool, register_generate_image_tool
+from .jobs import register_job_tools, submit_batch_job
 
 __all__ = [
     "generate_image_tool",
     "register_generate_image_tool",
     "batch_generate_images",
+    "batch_generate_file",
+    "run_batch",
     "register_batch_generate_tool",
+    "submit_batch_job",
+    "register_job_tools",
 ]
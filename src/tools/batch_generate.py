@@ -3,36 +3,550 @@ Batch image generation tool for processing multiple prompts efficiently.
 """
 
 import asyncio
+import itertools
 import json
 import logging
-from typing import Any
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, cast
 
-from ..config import MAX_BATCH_SIZE, get_settings
-from ..core import validate_batch_size, validate_prompts_list
+from fastmcp import Context
+
+from ..config import (
+    DEFAULT_IMAGE_SIZE,
+    MAX_REFERENCE_IMAGES,
+    RESPONSE_MODALITIES,
+    get_settings,
+)
+from ..config.constants import (
+    BATCH_COST_WINDOW,
+    ENHANCEMENT_BATCH_SIZE,
+    GOOGLE_SEARCH_COST,
+    IMAGE_SIZE_COST,
+    REFERENCE_IMAGE_COST,
+    TEXT_ONLY_COST,
+)
+from ..core import (
+    ValidationError,
+    count_prompts,
+    iter_prompts,
+    validate_batch_item,
+    validate_batch_size,
+    validate_prompts_list,
+)
+from ..services import BatchJournal, get_client_pool
+from ..services.result_cache import make_result_key
 from .generate_image import generate_image_tool
 
 logger = logging.getLogger(__name__)
 
 
+class _StageStats:
+    """Busy and waiting time per worker slot of one pipeline stage."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.busy_seconds = [0.0] * workers
+        self.wait_seconds = [0.0] * workers
+        self.items = [0] * workers
+
+    def stats(self, wall: float) -> dict[str, Any]:
+        utilization = [round(busy / wall, 3) if wall else 0.0 for busy in self.busy_seconds]
+        return {
+            "workers": self.workers,
+            "slot_utilization": utilization,
+            "slot_items": list(self.items),
+            "mean_utilization": round(sum(utilization) / len(utilization), 3),
+            "wait_seconds": round(sum(self.wait_seconds), 3),
+        }
+
+
+class BatchPipeline:
+    """
+    Two-stage pipeline: prompt preparation (enhancement) feeds generation.
+
+    Preparation workers process chunks of items and push each prepared item
+    onto a bounded queue. Generation workers start as soon as the first chunk
+    is ready, so enhancement latency overlaps with renders already in flight,
+    and each generation worker pulls the next item as soon as its current one
+    finishes. The bounded queue keeps preparation from running far ahead.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        *,
+        prepare_concurrency: int = 1,
+        queue_size: int | None = None,
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            concurrency: Generation worker slots (requests kept in flight)
+            prepare_concurrency: Preparation workers (chunks prepared concurrently)
+            queue_size: Prepared items buffered for generation (default: 2x concurrency)
+        """
+        self.concurrency = concurrency
+        self.prepare_concurrency = prepare_concurrency
+        self.queue_size = queue_size or 2 * concurrency
+        self._prepare = _StageStats(prepare_concurrency)
+        self._generate = _StageStats(concurrency)
+        self._wall_seconds = 0.0
+        self._first_generation_seconds: float | None = None
+        self._max_queue_depth = 0
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any, Any], Awaitable[Any]],
+        *,
+        prepare: Callable[[list[Any]], Awaitable[list[Any]]] | None = None,
+        chunk_size: int = 1,
+        on_result: Callable[[Any, Any], Awaitable[None]] | None = None,
+        collect: bool = True,
+    ) -> list[Any]:
+        """
+        Run items through preparation and generation.
+
+        Items are pulled from the iterable one chunk at a time (on a worker
+        thread, so it may read from a file), and the bounded queue caps how
+        many are held at once; iterators of any length run in bounded memory
+        when collect is False.
+
+        Args:
+            items: Work items, processed in order of submission
+            handler: Coroutine function called as handler(item, prepared) per item
+            prepare: Coroutine function mapping a chunk of items to one prepared
+                value per item; if omitted or failing, handlers receive None
+            chunk_size: Items per preparation call
+            on_result: Coroutine function called as on_result(item, result) as
+                soon as each item finishes (result may be a raised exception)
+            collect: Keep and return all results
+
+        Returns:
+            Handler results (or raised exceptions) in the same order as items,
+            or an empty list if collect is False
+        """
+        iterator = iter(items)
+        read_lock = asyncio.Lock()
+        results: dict[int, Any] = {}
+        count = 0
+        ready: asyncio.Queue[tuple[int, Any, Any] | None] = asyncio.Queue(maxsize=self.queue_size)
+        preparing = self.prepare_concurrency
+        start = time.perf_counter()
+
+        async def next_chunk() -> tuple[int, list[Any]]:
+            nonlocal count
+            async with read_lock:
+                chunk = await asyncio.to_thread(
+                    lambda: list(itertools.islice(iterator, chunk_size))
+                )
+                offset = count
+                count += len(chunk)
+                return offset, chunk
+
+        async def prepare_worker(slot: int) -> None:
+            nonlocal preparing
+            while True:
+                offset, chunk = await next_chunk()
+                if not chunk:
+                    break
+
+                busy_start = time.perf_counter()
+                prepared: list[Any] = [None] * len(chunk)
+                if prepare is not None:
+                    try:
+                        prepared = await prepare(chunk)
+                    except Exception as e:
+                        logger.warning(
+                            f"Preparing items {offset}-{offset + len(chunk) - 1} failed: {e}"
+                        )
+                self._prepare.busy_seconds[slot] += time.perf_counter() - busy_start
+                self._prepare.items[slot] += len(chunk)
+
+                for position, (item, value) in enumerate(zip(chunk, prepared, strict=True)):
+                    wait_start = time.perf_counter()
+                    await ready.put((offset + position, item, value))
+                    self._prepare.wait_seconds[slot] += time.perf_counter() - wait_start
+                    self._max_queue_depth = max(self._max_queue_depth, ready.qsize())
+
+            preparing -= 1
+            if preparing == 0:
+                # Last preparation worker done: one stop marker per generation worker
+                for _ in range(self.concurrency):
+                    await ready.put(None)
+
+        async def generate_worker(slot: int) -> None:
+            while True:
+                wait_start = time.perf_counter()
+                entry = await ready.get()
+                self._generate.wait_seconds[slot] += time.perf_counter() - wait_start
+                if entry is None:
+                    return
+
+                index, item, value = entry
+                busy_start = time.perf_counter()
+                if self._first_generation_seconds is None:
+                    self._first_generation_seconds = busy_start - start
+                result: Any
+                try:
+                    result = await handler(item, value)
+                except Exception as e:
+                    result = e
+                finally:
+                    self._generate.busy_seconds[slot] += time.perf_counter() - busy_start
+                    self._generate.items[slot] += 1
+                if collect:
+                    results[index] = result
+
+                if on_result is not None:
+                    try:
+                        await on_result(item, result)
+                    except Exception as e:
+                        logger.warning(f"Result callback for item {index} failed: {e}")
+
+        # If a stage fails (e.g. reading the items raises), the task group cancels
+        # the others instead of leaving generation workers waiting on the queue
+        try:
+            async with asyncio.TaskGroup() as group:
+                for slot in range(self.prepare_concurrency):
+                    group.create_task(prepare_worker(slot))
+                for slot in range(self.concurrency):
+                    group.create_task(generate_worker(slot))
+        except ExceptionGroup as e:
+            raise e.exceptions[0] from None
+        self._wall_seconds += time.perf_counter() - start
+
+        return [results[index] for index in range(count)] if collect else []
+
+    def stats(self) -> dict[str, Any]:
+        """Get per-stage occupancy (busy time / wall time) and queue statistics."""
+        wall = self._wall_seconds
+        first = self._first_generation_seconds
+        return {
+            "concurrency": self.concurrency,
+            "wall_time_seconds": round(wall, 3),
+            "first_generation_seconds": round(first, 3) if first is not None else None,
+            "queue_size": self.queue_size,
+            "max_queue_depth": self._max_queue_depth,
+            "stages": {
+                "enhancement": self._prepare.stats(wall),
+                "generation": self._generate.stats(wall),
+            },
+        }
+
+
+def _item_result(prompt_index: int, prompt: str, result: Any) -> dict[str, Any]:
+    """Build the per-prompt entry of a batch result."""
+    if isinstance(result, Exception):
+        logger.error(f"Failed to generate image for prompt {prompt_index}: {result}")
+        return {
+            "prompt_index": prompt_index,
+            "prompt": prompt,
+            "success": False,
+            "error": str(result),
+        }
+    if not isinstance(result, dict):
+        logger.error(f"Unexpected result type: {type(result)}")
+        return {
+            "prompt_index": prompt_index,
+            "prompt": prompt,
+            "success": False,
+            "error": "Unexpected result type",
+        }
+    return {"prompt_index": prompt_index, "prompt": prompt, **result}
+
+
+def _checkpointed_item(
+    journal: BatchJournal, batch_id: str, index: int, params_hash: str
+) -> dict[str, Any] | None:
+    """
+    Checkpointed result of an item if it was produced with the same parameters
+    and its saved files still exist (durable remote backends are trusted).
+    Blocking.
+    """
+    checkpoint = journal.checkpoint(batch_id, index)
+    if checkpoint is None or checkpoint[0] != params_hash:
+        return None
+    item = checkpoint[1]
+    images = item.get("images", [])
+    if not all(Path(image["path"]).exists() for image in images if "path" in image):
+        return None
+    return {**item, "resumed": True}
+
+
+def estimate_cost(params: dict[str, Any]) -> float:
+    """
+    Relative cost of rendering one item with the given generation parameters.
+
+    Only used to order batch items, so it need not be exact: larger images,
+    reference images and grounding take longer; text-only responses are cheap.
+    """
+    modalities = params.get("response_modalities") or RESPONSE_MODALITIES
+    if "IMAGE" in modalities:
+        cost = IMAGE_SIZE_COST.get(params.get("image_size") or DEFAULT_IMAGE_SIZE, 1.0)
+    else:
+        cost = TEXT_ONLY_COST
+    references = params.get("reference_image_paths") or []
+    cost += REFERENCE_IMAGE_COST * min(len(references), MAX_REFERENCE_IMAGES)
+    if params.get("enable_google_search"):
+        cost += GOOGLE_SEARCH_COST
+    return cost
+
+
+class _BatchItem:
+    """One batch prompt with its effective generation parameters."""
+
+    __slots__ = ("index", "prompt", "params", "tags", "params_hash", "checkpoint", "cost")
+
+    def __init__(
+        self,
+        index: int,
+        prompt: str | Exception,
+        params: dict[str, Any],
+        tags: Any,
+        params_hash: str,
+        checkpoint: dict[str, Any] | None,
+    ):
+        self.index = index
+        self.prompt = prompt
+        self.params = params
+        self.tags = tags
+        self.params_hash = params_hash
+        self.checkpoint = checkpoint
+        # Resumed and invalid items finish at once
+        pending = checkpoint is None and isinstance(prompt, str)
+        self.cost = estimate_cost(params) if pending else 0.0
+
+
+def _cost_ordered(items: Iterator[_BatchItem], window: int) -> Iterator[_BatchItem]:
+    """
+    Yield items most expensive first, window items at a time.
+
+    Starting long renders first and leaving short ones for the end keeps
+    every worker slot busy until the batch drains, instead of a few slow
+    items running alone at the tail. Equal-cost items keep prompt order.
+    """
+    while True:
+        chunk = list(itertools.islice(items, window))
+        if not chunk:
+            return
+        chunk.sort(key=lambda item: -item.cost)
+        yield from chunk
+
+
+def resolve_batch_size(batch_size: int | None) -> int:
+    """
+    Number of worker slots for a batch.
+
+    Defaults to the max_batch_size setting if set, else to as many requests
+    as the client pool can ever run at once; the pool's adaptive limiters and
+    rate limiters decide how many are actually in flight.
+    """
+    pool_capacity = get_client_pool().max_concurrency
+    if batch_size is None:
+        batch_size = get_settings().api.max_batch_size or pool_capacity
+    validate_batch_size(batch_size, pool_capacity)
+    return batch_size
+
+
+async def _run_batch(
+    prompts: Iterable[tuple[int, str | dict[str, Any] | Exception]],
+    *,
+    total: int,
+    batch_id: str,
+    on_item: Callable[[dict[str, Any]], Awaitable[None]],
+    cost_window: int,
+    model: str | None,
+    enhance_prompt: bool,
+    aspect_ratio: str,
+    output_format: str,
+    batch_size: int | None,
+    **shared_params: Any,
+) -> dict[str, Any]:
+    """
+    Stream (prompt index, item) pairs through enhancement and generation.
+
+    Items are prompt strings or objects with per-item overrides of the
+    batch-wide parameters (see validate_batch_item); an invalid item fails
+    on its own. Items are scheduled most expensive first, cost_window at a
+    time, so a mix of sizes and ratios runs as one batch with full slots.
+
+    Each finished item (including ones resumed from a checkpoint) is passed
+    to on_item, one at a time; nothing is accumulated here, so memory stays
+    bounded however many prompts the iterable yields.
+
+    Returns:
+        Dict with batch counters and pipeline statistics
+    """
+    settings = get_settings()
+    pool = get_client_pool()
+    batch_size = resolve_batch_size(batch_size)
+    journal = pool.journal
+    # Images in a non-durable backend (memory) are gone after a restart, so its
+    # items are neither checkpointed nor resumed
+    checkpointing = pool.store.backend.durable
+
+    summary: dict[str, Any] = {
+        "batch_id": batch_id,
+        "total_prompts": total,
+        "batch_size": batch_size,
+        "completed": 0,
+        "failed": 0,
+        "resumed": 0,
+    }
+
+    # Each completed item is checkpointed under the batch ID with a hash of the
+    # parameters that produced it; a rerun keeps items whose hash still matches
+    generation_params = {
+        "model": model,
+        "enhance_prompt": enhance_prompt,
+        "aspect_ratio": aspect_ratio,
+        "output_format": output_format,
+        **shared_params,
+    }
+
+    def entries() -> Iterator[_BatchItem]:
+        # Pulled on the pipeline's reader thread, so checkpoint lookups may block
+        for index, raw in prompts:
+            prompt: str | Exception
+            overrides: dict[str, Any] = {}
+            if isinstance(raw, Exception):
+                prompt = raw
+            else:
+                try:
+                    prompt, overrides = validate_batch_item(raw)
+                except ValidationError as e:
+                    prompt = e
+            tags = overrides.pop("tags", None)
+            params = {**generation_params, **overrides}
+            key_params = {"prompt": prompt, **params}
+            if tags is not None:
+                key_params["tags"] = tags
+            params_hash = make_result_key(key_params)
+            checkpoint = None
+            if checkpointing and isinstance(prompt, str):
+                checkpoint = _checkpointed_item(journal, batch_id, index, params_hash)
+            yield _BatchItem(index, prompt, params, tags, params_hash, checkpoint)
+
+    # Enhancement runs as its own pipeline stage: chunks of prompts are enhanced
+    # in batched requests while earlier prompts are already rendering
+    enhance = enhance_prompt and settings.api.enable_prompt_enhancement
+    use_cache = not shared_params.get("bypass_cache", False)
+
+    async def enhance_chunk(chunk: list[_BatchItem]) -> list[str | None]:
+        enhanced: list[str | None] = [None] * len(chunk)
+        # Items sharing an enhancement context (aspect ratio, reference images,
+        # grounding) are enhanced together in one batched request
+        groups: dict[tuple[str, int, bool], list[int]] = {}
+        for position, item in enumerate(chunk):
+            if item.checkpoint is None and isinstance(item.prompt, str):
+                references = item.params.get("reference_image_paths") or []
+                context = (
+                    item.params["aspect_ratio"],
+                    min(len(references), MAX_REFERENCE_IMAGES),
+                    bool(item.params.get("enable_google_search")),
+                )
+                groups.setdefault(context, []).append(position)
+        if groups:
+            async with pool.borrow() as image_service:
+                for (ratio, _, grounded), positions in groups.items():
+                    first = chunk[positions[0]].params
+                    texts = await image_service.enhance_prompts(
+                        [cast(str, chunk[position].prompt) for position in positions],
+                        use_cache=use_cache,
+                        aspect_ratio=ratio,
+                        reference_images=(first.get("reference_image_paths") or [])[
+                            :MAX_REFERENCE_IMAGES
+                        ],
+                        enable_google_search=grounded,
+                    )
+                    for position, text in zip(positions, texts, strict=True):
+                        enhanced[position] = text
+        return enhanced
+
+    async def generate(item: _BatchItem, enhanced_prompt: str | None) -> dict[str, Any]:
+        if item.checkpoint is not None:
+            return item.checkpoint
+        if isinstance(item.prompt, Exception):
+            raise item.prompt
+        return await generate_image_tool(
+            prompt=item.prompt, enhanced_prompt=enhanced_prompt, **item.params
+        )
+
+    # Items are handed on one at a time so callers can stream them in order
+    # of completion and report strictly increasing progress
+    item_lock = asyncio.Lock()
+
+    async def record(item: _BatchItem, result: Any) -> None:
+        if item.checkpoint is not None:
+            entry = item.checkpoint
+            summary["resumed"] += 1
+            journal.resumed += 1
+        else:
+            prompt = item.prompt if isinstance(item.prompt, str) else ""
+            entry = _item_result(item.index, prompt, result)
+            if item.tags is not None:
+                entry["tags"] = item.tags
+            if checkpointing and isinstance(result, dict):
+                await journal.record(batch_id, item.index, item.params_hash, entry)
+        summary["completed" if entry.get("success", True) else "failed"] += 1
+        async with item_lock:
+            await on_item(entry)
+
+    # Keep batch_size requests in flight, refilling each slot as soon as it frees
+    concurrency = min(batch_size, total)
+    logger.info(f"Batch {batch_id}: processing {total} prompts with {concurrency} worker slots")
+    pipeline = BatchPipeline(concurrency, prepare_concurrency=settings.api.enhancement_concurrency)
+    await pipeline.run(
+        _cost_ordered(entries(), cost_window),
+        generate,
+        prepare=enhance_chunk if enhance else None,
+        chunk_size=ENHANCEMENT_BATCH_SIZE,
+        on_result=record,
+        collect=False,
+    )
+    if summary["resumed"]:
+        logger.info(f"Batch {batch_id}: reused {summary['resumed']} checkpointed prompts")
+
+    summary["pipeline"] = pipeline.stats()
+    summary["concurrency_limit"] = pool.concurrency_limit
+    return summary
+
+
 async def batch_generate_images(
-    prompts: list[str],
+    prompts: list[str | dict[str, Any]],
     model: str | None = None,
     enhance_prompt: bool = True,
     aspect_ratio: str = "1:1",
     output_format: str = "png",
     batch_size: int | None = None,
+    on_progress: Callable[[dict[str, Any], int, int], Awaitable[None]] | None = None,
+    batch_id: str | None = None,
     **shared_params: Any,
 ) -> dict[str, Any]:
     """
     Generate multiple images from a list of prompts.
 
+    Items with their own parameters run in the same batch as the rest; the
+    whole list is ordered by estimated cost, most expensive first.
+
     Args:
-        prompts: List of text prompts
+        prompts: List of text prompts, or {"prompt": ..., **overrides} objects
+            overriding the batch-wide parameters (see BATCH_ITEM_OVERRIDES)
         model: Model to use for all images
         enhance_prompt: Enhance all prompts
         aspect_ratio: Aspect ratio for all images
         output_format: Output format for all images
-        batch_size: Number of images to process in parallel (default: from config)
+        batch_size: Worker slots (default: see resolve_batch_size)
+        on_progress: Coroutine function called as on_progress(item, completed, total)
+            as soon as each prompt finishes, with the same per-prompt entry that
+            appears in the final results, in completion order
+        batch_id: Checkpoint key; running a batch ID again skips prompts that
+            already completed with the same parameters (default: a new ID)
         **shared_params: Additional parameters shared across all generations
 
     Returns:
@@ -41,78 +555,127 @@ async def batch_generate_images(
     # Validate inputs
     validate_prompts_list(prompts)
 
-    settings = get_settings()
-    if batch_size is None:
-        batch_size = settings.api.max_batch_size
+    items: list[dict[str, Any] | None] = [None] * len(prompts)
+    finished = 0
+
+    async def on_item(item: dict[str, Any]) -> None:
+        nonlocal finished
+        items[item["prompt_index"]] = item
+        finished += 1
+        if on_progress is not None:
+            await on_progress(item, finished, len(prompts))
+
+    summary = await _run_batch(
+        enumerate(prompts),
+        total=len(prompts),
+        batch_id=batch_id or uuid.uuid4().hex,
+        on_item=on_item,
+        cost_window=len(prompts),
+        model=model,
+        enhance_prompt=enhance_prompt,
+        aspect_ratio=aspect_ratio,
+        output_format=output_format,
+        batch_size=batch_size,
+        **shared_params,
+    )
+    return {"success": True, **summary, "results": items}
+
+
+async def batch_generate_file(
+    prompts_file: str,
+    model: str | None = None,
+    enhance_prompt: bool = True,
+    aspect_ratio: str = "1:1",
+    output_format: str = "png",
+    batch_size: int | None = None,
+    on_progress: Callable[[dict[str, Any], int, int], Awaitable[None]] | None = None,
+    batch_id: str | None = None,
+    results_file: str | None = None,
+    **shared_params: Any,
+) -> dict[str, Any]:
+    """
+    Generate images for every prompt in a JSONL or CSV file (large-batch mode).
+
+    Prompts are streamed from the file and per-prompt results are appended
+    to a JSONL results file as they finish, so memory stays bounded for
+    batches of any size. A malformed line fails only its own item. Items
+    are ordered by estimated cost BATCH_COST_WINDOW at a time.
+
+    Args:
+        prompts_file: JSONL (string or {"prompt": ..., **overrides} per line) or
+            CSV file (a "prompt" column plus optional per-item parameter columns)
+        model: Model to use for all images
+        enhance_prompt: Enhance all prompts
+        aspect_ratio: Aspect ratio for all images
+        output_format: Output format for all images
+        batch_size: Worker slots (default: see resolve_batch_size)
+        on_progress: Coroutine function called as on_progress(item, completed, total)
+            as soon as each prompt finishes
+        batch_id: Checkpoint key; running a batch ID again skips prompts that
+            already completed with the same parameters (default: a new ID)
+        results_file: JSONL file for per-prompt results
+            (default: batches/<batch_id>.jsonl in the output directory)
+        **shared_params: Additional parameters shared across all generations
 
-    validate_batch_size(batch_size, MAX_BATCH_SIZE)
+    Returns:
+        Dict with batch counters and the results file path
+    """
+    total = await asyncio.to_thread(count_prompts, prompts_file)
+    if not total:
+        raise ValidationError(f"No prompts found in {prompts_file}")
+
+    batch_id = batch_id or uuid.uuid4().hex
+    results_path = (
+        Path(results_file).expanduser()
+        if results_file
+        else get_settings().output_dir / "batches" / f"{batch_id}.jsonl"
+    )
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    finished = 0
+
+    # Rewritten on every run (resumed items included), so it is always complete
+    with open(results_path, "w", encoding="utf-8") as results_out:
+
+        async def on_item(item: dict[str, Any]) -> None:
+            nonlocal finished
+            results_out.write(json.dumps(item, default=str) + "\n")
+            finished += 1
+            if on_progress is not None:
+                await on_progress(item, finished, total)
 
-    # Prepare results
-    results: dict[str, Any] = {
+        summary = await _run_batch(
+            iter_prompts(prompts_file),
+            total=total,
+            batch_id=batch_id,
+            on_item=on_item,
+            cost_window=BATCH_COST_WINDOW,
+            model=model,
+            enhance_prompt=enhance_prompt,
+            aspect_ratio=aspect_ratio,
+            output_format=output_format,
+            batch_size=batch_size,
+            **shared_params,
+        )
+
+    return {
         "success": True,
-        "total_prompts": len(prompts),
-        "batch_size": batch_size,
-        "completed": 0,
-        "failed": 0,
-        "results": [],
+        **summary,
+        "prompts_file": str(Path(prompts_file).expanduser()),
+        "results_file": str(results_path),
     }
 
-    # Process prompts in batches
-    for i in range(0, len(prompts), batch_size):
-        batch = prompts[i : i + batch_size]
-        logger.info(f"Processing batch {i // batch_size + 1}: {len(batch)} prompts")
 
-        # Create tasks for parallel processing
-        tasks = [
-            generate_image_tool(
-                prompt=prompt,
-                model=model,
-                enhance_prompt=enhance_prompt,
-                aspect_ratio=aspect_ratio,
-                output_format=output_format,
-                **shared_params,
-            )
-            for prompt in batch
-        ]
-
-        # Execute batch
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Process results
-        for j, result in enumerate(batch_results):
-            prompt_index = i + j
-
-            if isinstance(result, Exception):
-                logger.error(f"Failed to generate image for prompt {prompt_index}: {result}")
-                results["failed"] += 1
-                results["results"].append(
-                    {
-                        "prompt_index": prompt_index,
-                        "prompt": batch[j],
-                        "success": False,
-                        "error": str(result),
-                    }
-                )
-            else:
-                # result is dict[str, Any] here (not an Exception)
-                if not isinstance(result, dict):
-                    logger.error(f"Unexpected result type: {type(result)}")
-                    results["failed"] += 1
-                    results["results"].append(
-                        {
-                            "prompt_index": prompt_index,
-                            "prompt": batch[j],
-                            "success": False,
-                            "error": "Unexpected result type",
-                        }
-                    )
-                else:
-                    results["completed"] += 1
-                    results["results"].append(
-                        {"prompt_index": prompt_index, "prompt": batch[j], **result}
-                    )
-
-    return results
+async def run_batch(
+    prompts: list[str | dict[str, Any]] | None = None,
+    prompts_file: str | None = None,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Run a batch from a prompt list or, in large-batch mode, from a prompt file."""
+    if (prompts is None) == (prompts_file is None):
+        raise ValidationError("Provide either prompts or prompts_file")
+    if prompts_file is not None:
+        return await batch_generate_file(prompts_file, **kwargs)
+    return await batch_generate_images(cast(list[str | dict[str, Any]], prompts), **kwargs)
 
 
 def register_batch_generate_tool(mcp_server: Any) -> None:
@@ -120,28 +683,67 @@ def register_batch_generate_tool(mcp_server: Any) -> None:
 
     @mcp_server.tool()
     async def batch_generate(
-        prompts: list[str],
+        prompts: list[str | dict[str, Any]] | None = None,
+        prompts_file: str | None = None,
         model: str | None = None,
         enhance_prompt: bool = True,
         aspect_ratio: str = "1:1",
+        image_size: str = "2K",
         output_format: str = "png",
+        quality: int | None = None,
         batch_size: int | None = None,
         negative_prompt: str | None = None,
+        batch_id: str | None = None,
+        ctx: Context | None = None,
     ) -> str:
         """
         Generate multiple images from a list of prompts efficiently.
 
-        Processes prompts in parallel batches for optimal performance.
-        All images share the same generation settings.
+        Prompts are enhanced in batched requests while earlier prompts are
+        already rendering. Keeps up to batch_size generations in flight,
+        starting the next prompt as soon as any one finishes.
+
+        Settings apply to all images unless an item overrides them: instead
+        of a string, an item may be an object such as
+        {"prompt": "hero banner", "aspect_ratio": "16:9", "image_size": "4K"}.
+        Items can set model, aspect_ratio, image_size, output_format, quality,
+        reference_image_paths, response_modalities, enable_google_search,
+        seed (for more repeatable images) and tags (any JSON, returned with
+        the item's result). Mixed items run as one batch; the most expensive
+        ones (larger sizes, more reference images) are started first.
+
+        Progress is reported as each image finishes: every MCP progress
+        notification carries that prompt's result entry (JSON, same shape
+        as result["results"][i]) as its message, so images can be used
+        before the whole batch completes.
+
+        Every finished image is checkpointed under the batch_id returned in
+        the result. If a batch is interrupted, call again with the same
+        prompts and batch_id: finished images are reused and only the rest
+        are generated.
+
+        For thousands of prompts, pass prompts_file instead of prompts: a
+        JSONL file (a string or an item object per line) or a CSV file (a
+        "prompt" column, or the first column; columns named after item
+        settings such as aspect_ratio or seed override them per row, lists
+        separated by ";"). Prompts are streamed from the
+        file and per-prompt results are written to result["results_file"]
+        (JSONL) instead of being returned inline. For long runs prefer
+        submit_batch, which also accepts prompts_file.
 
         Args:
-            prompts: List of text descriptions for image generation
+            prompts: List of text descriptions (or item objects) for image generation
+            prompts_file: Path to a JSONL or CSV prompt file (instead of prompts)
             model: Model to use for all images (default: gemini-3-pro-image-preview)
             enhance_prompt: Enhance all prompts automatically (default: True)
             aspect_ratio: Aspect ratio for all images (default: 1:1)
+            image_size: Resolution for all images: 1K, 2K, or 4K (default: 2K)
             output_format: Image format for all images (default: png)
-            batch_size: Parallel batch size (default: from config)
+            quality: JPEG/WebP quality 1-100 for all images (default: from config)
+            batch_size: Worker slots (default: as many as the API keys allow; actual
+                concurrency adapts to rate limits)
             negative_prompt: Negative prompt for Imagen models (optional)
+            batch_id: ID of an earlier, interrupted batch to resume (optional)
 
         Returns:
             JSON string with batch results including individual image paths
@@ -149,6 +751,7 @@ def register_batch_generate_tool(mcp_server: Any) -> None:
         IMPORTANT - AI Assistant Instructions:
         After batch generation completes, you MUST:
         1. Parse the JSON response to extract file paths from result["results"][i]["images"][0]["path"]
+           (with prompts_file, read them from the JSONL file at result["results_file"])
         2. Show the user a summary of all generated images with their file paths
         3. Optionally display one or more images using the Read tool
         4. Let the user know the total count of successful vs failed generations
@@ -161,15 +764,25 @@ def register_batch_generate_tool(mcp_server: Any) -> None:
 
         DO NOT just say "batch generation completed" without listing the file paths!
         """
+
+        async def notify(item: dict[str, Any], completed: int, total: int) -> None:
+            if ctx is not None:
+                await ctx.report_progress(completed, total, json.dumps(item))
+
         try:
-            result = await batch_generate_images(
+            result = await run_batch(
                 prompts=prompts,
+                prompts_file=prompts_file,
                 model=model,
                 enhance_prompt=enhance_prompt,
                 aspect_ratio=aspect_ratio,
+                image_size=image_size,
                 output_format=output_format,
+                quality=quality,
                 batch_size=batch_size,
                 negative_prompt=negative_prompt,
+                on_progress=notify,
+                batch_id=batch_id,
             )
 
             return json.dumps(result, indent=2)
@@ -2,20 +2,20 @@
 Image generation tool supporting both Gemini and Imagen models.
 """
 
-import base64
 import json
 import logging
-from pathlib import Path
 from typing import Any
 
-from ..config import get_settings
+from ..config import MAX_REFERENCE_IMAGES, get_settings
 from ..core import (
     validate_aspect_ratio,
     validate_image_format,
+    validate_image_quality,
+    validate_image_size,
     validate_model,
     validate_prompt,
 )
-from ..services import ImageService
+from ..services import get_client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +27,23 @@ async def generate_image_tool(
     aspect_ratio: str = "1:1",
     image_size: str = "2K",
     output_format: str = "png",
+    # Encoding options
+    quality: int | None = None,
+    optimize: bool | None = None,
     # Reference images (up to 14)
     reference_image_paths: list[str] | None = None,
     # Google Search grounding
     enable_google_search: bool = False,
     # Response modalities
     response_modalities: list[str] | None = None,
+    # Sampling seed for repeatable results
+    seed: int | None = None,
+    # Tail-latency hedging (interactive callers)
+    hedge: bool = False,
+    # Skip cached results (e.g. to get a fresh prompt enhancement)
+    bypass_cache: bool = False,
+    # Prompt already enhanced by the caller (skips enhancement)
+    enhanced_prompt: str | None = None,
     # Output options
     save_to_disk: bool = True,
     **kwargs: Any,
@@ -47,10 +58,18 @@ async def generate_image_tool(
         aspect_ratio: Image aspect ratio (1:1, 16:9, 9:16, etc.)
         image_size: Image resolution: 1K, 2K, or 4K (default: 2K)
         output_format: Image format (png, jpeg, webp)
+        quality: JPEG/WebP quality 1-100 (default: from config)
+        optimize: Optimize encoding for smaller files (default: from config)
         reference_image_paths: Paths to reference images (up to 14)
         enable_google_search: Use Google Search for real-time data grounding
         response_modalities: Response types (TEXT, IMAGE - default: both)
-        save_to_disk: Save images to output directory
+        seed: Sampling seed; the same seed and inputs give more repeatable images
+        hedge: Duplicate the request if it runs unusually long and keep the
+            first result (budget-limited; for latency-sensitive callers)
+        bypass_cache: Ignore cached results and make fresh API calls
+        enhanced_prompt: Pre-enhanced prompt to generate from (used by batch
+            generation, which enhances all prompts up front)
+        save_to_disk: Save images to the storage backend (output directory by default)
 
     Returns:
         Dict with generated images and metadata
@@ -60,7 +79,10 @@ async def generate_image_tool(
     if model:
         validate_model(model)
     validate_aspect_ratio(aspect_ratio)
+    validate_image_size(image_size)
     validate_image_format(output_format)
+    if quality is not None:
+        validate_image_quality(quality)
 
     # Get settings
     settings = get_settings()
@@ -69,87 +91,92 @@ async def generate_image_tool(
     if model is None:
         model = settings.api.default_model
 
-    # Initialize image service
-    image_service = ImageService(
-        api_key=settings.api.gemini_api_key,
-        enable_enhancement=settings.api.enable_prompt_enhancement,
-        timeout=settings.api.request_timeout,
-    )
+    # Prepare parameters for Gemini 3 Pro Image
+    params: dict[str, Any] = {
+        "aspect_ratio": aspect_ratio,
+        "image_size": image_size,
+    }
 
-    try:
-        # Prepare parameters for Gemini 3 Pro Image
-        params: dict[str, Any] = {
-            "aspect_ratio": aspect_ratio,
-            "image_size": image_size,
-        }
+    client_pool = get_client_pool()
+
+    # Add reference images if provided (up to 14), read in parallel through the cache
+    if reference_image_paths:
+        reference_images = await client_pool.reference_cache.load(
+            reference_image_paths[:MAX_REFERENCE_IMAGES]
+        )
+        if reference_images:
+            params["reference_images"] = reference_images
 
-        # Add reference images if provided (up to 14)
-        if reference_image_paths:
-            reference_images = []
-            for img_path in reference_image_paths[:14]:  # Limit to max 14
-                image_path = Path(img_path)
-                if image_path.exists():
-                    image_data = base64.b64encode(image_path.read_bytes()).decode()
-                    reference_images.append(image_data)
-                else:
-                    logger.warning(f"Reference image not found: {img_path}")
+    # Add Google Search grounding if enabled
+    if enable_google_search:
+        params["enable_google_search"] = True
 
-            if reference_images:
-                params["reference_images"] = reference_images
+    # Add response modalities
+    if response_modalities:
+        params["response_modalities"] = response_modalities
 
-        # Add Google Search grounding if enabled
-        if enable_google_search:
-            params["enable_google_search"] = True
+    if seed is not None:
+        params["seed"] = seed
 
-        # Add response modalities
-        if response_modalities:
-            params["response_modalities"] = response_modalities
+    if hedge:
+        params["hedge"] = True
 
+    # Borrow a pooled image service (connections are reused across calls)
+    async with client_pool.borrow() as image_service:
         # Generate images
         results = await image_service.generate(
             prompt=prompt,
             model=model,
             enhance_prompt=enhance_prompt and settings.api.enable_prompt_enhancement,
+            output_format=output_format,
+            quality=quality,
+            optimize=optimize,
+            use_cache=not bypass_cache,
+            enhanced_prompt=enhanced_prompt,
             **params,
         )
 
-        # Prepare response
-        response: dict[str, Any] = {
-            "success": True,
-            "model": model,
-            "prompt": prompt,
-            "images_generated": len(results),
-            "images": [],
-            "metadata": {
-                "enhance_prompt": enhance_prompt,
-                "aspect_ratio": aspect_ratio,
-            },
+    # Prepare response
+    response: dict[str, Any] = {
+        "success": True,
+        "model": model,
+        "prompt": prompt,
+        "images_generated": len(results),
+        "images": [],
+        "metadata": {
+            "enhance_prompt": enhance_prompt,
+            "aspect_ratio": aspect_ratio,
+            "output_format": output_format,
+            "cached": bool(results) and all(r.metadata.get("cached") for r in results),
+        },
+    }
+
+    # Save images and prepare for MCP response
+    for result in results:
+        image_info = {
+            "index": result.index,
+            "size": result.get_size(),
+            "mime_type": result.mime_type,
+            "transcoded": result.metadata.get("transcoded", False),
+            "encode_time_ms": result.metadata.get("encode_time_ms", 0.0),
+            "queue_wait_seconds": result.metadata.get("queue_wait_seconds", 0.0),
+            "hedge": result.metadata.get("hedge_outcome", "none"),
+            "cached": result.metadata.get("cached", False),
+            "coalesced": result.metadata.get("coalesced", False),
+            "timestamp": result.timestamp.isoformat(),
         }
 
-        # Save images and prepare for MCP response
-        for result in results:
-            image_info = {
-                "index": result.index,
-                "size": result.get_size(),
-                "timestamp": result.timestamp.isoformat(),
-            }
-
-            if save_to_disk:
-                # Save to output directory
-                file_path = result.save(settings.output_dir)
-                image_info["path"] = str(file_path)
-                image_info["filename"] = file_path.name
-
-            # Add enhanced prompt info
-            if "enhanced_prompt" in result.metadata:
-                image_info["enhanced_prompt"] = result.metadata["enhanced_prompt"]
+        if save_to_disk:
+            # Write to the configured storage backend without blocking the event loop
+            image_info.update(await client_pool.store.save(result))
 
-            response["images"].append(image_info)
+        # Add enhanced prompt info
+        if "enhanced_prompt" in result.metadata:
+            image_info["enhanced_prompt"] = result.metadata["enhanced_prompt"]
 
-        return response
+        response["images"].append(image_info)
 
-    finally:
-        await image_service.close()
+    return response
 
 
 def register_generate_image_tool(mcp_server: Any) -> None:
@@ -163,9 +190,14 @@ def register_generate_image_tool(mcp_server: Any) -> None:
         aspect_ratio: str = "1:1",
         image_size: str = "2K",
         output_format: str = "png",
+        quality: int | None = None,
+        optimize: bool | None = None,
         reference_image_paths: list[str] | None = None,
         enable_google_search: bool = False,
         response_modalities: list[str] | None = None,
+        seed: int | None = None,
+        hedge: bool = False,
+        bypass_cache: bool = False,
     ) -> str:
         """
         Generate images using Gemini 3 Pro Image - a state-of-the-art image generation model
@@ -185,9 +217,14 @@ def register_generate_image_tool(mcp_server: Any) -> None:
             aspect_ratio: Image aspect ratio like 1:1, 16:9, 9:16, 3:2, 4:5, etc. (default: 1:1)
             image_size: Image resolution: 1K, 2K, or 4K (default: 2K)
             output_format: Image format: png, jpeg, webp (default: png)
+            quality: JPEG/WebP quality 1-100 (default: from server config)
+            optimize: Spend extra CPU for smaller files (default: from server config)
             reference_image_paths: Paths to reference images (up to 14 total, max 6 objects, max 5 humans)
             enable_google_search: Enable Google Search grounding for real-time data
             response_modalities: Response types like ["TEXT", "IMAGE"] (default: both)
+            seed: Sampling seed for more repeatable results (optional)
+            hedge: Reduce worst-case latency by duplicating slow requests (default: False)
+            bypass_cache: Ignore cached results such as enhanced prompts (default: False)
 
         Available models:
         - gemini-3-pro-image-preview (default and only model)
@@ -198,6 +235,7 @@ def register_generate_image_tool(mcp_server: Any) -> None:
         IMPORTANT - AI Assistant Instructions:
         After generating an image, you MUST:
         1. Parse the JSON response to extract the file path from result["images"][0]["path"]
+           (with a memory or s3 storage backend there is no path; report result["images"][0]["uri"])
         2. Inform the user of the EXACT file path where the image was saved
         3. Use the Read tool to load and display the image to the user
         4. If thoughts were generated, show the thinking process to the user
@@ -226,9 +264,14 @@ def register_generate_image_tool(mcp_server: Any) -> None:
                 aspect_ratio=aspect_ratio,
                 image_size=image_size,
                 output_format=output_format,
+                quality=quality,
+                optimize=optimize,
                 reference_image_paths=reference_image_paths,
                 enable_google_search=enable_google_search,
                 response_modalities=response_modalities,
+                seed=seed,
+                hedge=hedge,
+                bypass_cache=bypass_cache,
             )
 
             return json.dumps(result, indent=2)
@@ -0,0 +1,237 @@
+"""
+Background batch job tools: submit a batch, poll it, fetch results, cancel it.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any
+
+from ..config.constants import DEFAULT_JOB_RESULTS_PAGE
+from ..core import ValidationError, count_prompts, validate_prompts_list
+from ..services import get_job_manager
+from ..services.job_manager import ProgressCallback
+from .batch_generate import resolve_batch_size, run_batch
+
+logger = logging.getLogger(__name__)
+
+
+async def submit_batch_job(
+    prompts: list[str | dict[str, Any]] | None = None,
+    prompts_file: str | None = None,
+    model: str | None = None,
+    enhance_prompt: bool = True,
+    aspect_ratio: str = "1:1",
+    output_format: str = "png",
+    batch_size: int | None = None,
+    batch_id: str | None = None,
+    **shared_params: Any,
+) -> dict[str, Any]:
+    """
+    Submit a batch as a background job.
+
+    Inputs are validated up front so bad requests fail immediately instead
+    of producing a failed job.
+
+    Args:
+        prompts: List of text prompts or per-item objects (see batch_generate_images)
+        prompts_file: JSONL or CSV prompt file (instead of prompts)
+        model: Model to use for all images
+        enhance_prompt: Enhance all prompts
+        aspect_ratio: Aspect ratio for all images
+        output_format: Output format for all images
+        batch_size: Worker slots (default: see resolve_batch_size)
+        batch_id: Checkpoint key of an earlier batch to resume (default: a new ID)
+        **shared_params: Additional parameters shared across all generations
+
+    Returns:
+        Dict with the job ID and initial status
+    """
+    if (prompts is None) == (prompts_file is None):
+        raise ValidationError("Provide either prompts or prompts_file")
+    if prompts_file is not None:
+        total = await asyncio.to_thread(count_prompts, prompts_file)
+        if not total:
+            raise ValidationError(f"No prompts found in {prompts_file}")
+    elif prompts is not None:
+        validate_prompts_list(prompts)
+        total = len(prompts)
+    resolve_batch_size(batch_size)
+    # Fixed up front so the job's params show which batch ID to resume with
+    batch_id = batch_id or uuid.uuid4().hex
+
+    async def run(on_progress: ProgressCallback) -> dict[str, Any]:
+        result = await run_batch(
+            prompts=prompts,
+            prompts_file=prompts_file,
+            model=model,
+            enhance_prompt=enhance_prompt,
+            aspect_ratio=aspect_ratio,
+            output_format=output_format,
+            batch_size=batch_size,
+            on_progress=on_progress,
+            batch_id=batch_id,
+            **shared_params,
+        )
+        # Items are stored one by one as they finish; keep only the totals
+        result.pop("results", None)
+        return result
+
+    params = {
+        "prompts_file": prompts_file,
+        "model": model,
+        "enhance_prompt": enhance_prompt,
+        "aspect_ratio": aspect_ratio,
+        "output_format": output_format,
+        "batch_size": batch_size,
+        "batch_id": batch_id,
+        **shared_params,
+    }
+    manager = get_job_manager()
+    job_id = await manager.submit("batch", params, total, run)
+    return await manager.status(job_id)
+
+
+def register_job_tools(mcp_server: Any) -> None:
+    """Register background job tools with MCP server."""
+
+    @mcp_server.tool()
+    async def submit_batch(
+        prompts: list[str | dict[str, Any]] | None = None,
+        prompts_file: str | None = None,
+        model: str | None = None,
+        enhance_prompt: bool = True,
+        aspect_ratio: str = "1:1",
+        image_size: str = "2K",
+        output_format: str = "png",
+        quality: int | None = None,
+        batch_size: int | None = None,
+        negative_prompt: str | None = None,
+        batch_id: str | None = None,
+    ) -> str:
+        """
+        Start a batch generation in the background and return a job ID immediately.
+
+        Takes the same arguments as batch_generate, including per-item
+        objects that override the batch-wide settings. The job keeps running if
+        the client disconnects; poll it with get_job_status, read finished
+        images with get_job_results (available while the job is still
+        running) and stop it with cancel_job. If a job is interrupted or
+        cancelled, submit the same prompts with its batch_id (shown in
+        params) to finish only the remaining images.
+
+        For thousands of prompts pass prompts_file (JSONL or CSV, see
+        batch_generate) instead of prompts; the file is streamed, never
+        loaded whole.
+
+        Args:
+            prompts: List of text descriptions (or item objects) for image generation
+            prompts_file: Path to a JSONL or CSV prompt file (instead of prompts)
+            model: Model to use for all images (default: gemini-3-pro-image-preview)
+            enhance_prompt: Enhance all prompts automatically (default: True)
+            aspect_ratio: Aspect ratio for all images (default: 1:1)
+            image_size: Resolution for all images: 1K, 2K, or 4K (default: 2K)
+            output_format: Image format for all images (default: png)
+            quality: JPEG/WebP quality 1-100 for all images (default: from config)
+            batch_size: Worker slots (default: as many as the API keys allow; actual
+                concurrency adapts to rate limits)
+            negative_prompt: Negative prompt for Imagen models (optional)
+            batch_id: ID of an earlier, interrupted batch to resume (optional)
+
+        Returns:
+            JSON string with job_id and status
+        """
+        try:
+            result = await submit_batch_job(
+                prompts=prompts,
+                prompts_file=prompts_file,
+                model=model,
+                enhance_prompt=enhance_prompt,
+                aspect_ratio=aspect_ratio,
+                image_size=image_size,
+                output_format=output_format,
+                quality=quality,
+                batch_size=batch_size,
+                negative_prompt=negative_prompt,
+                batch_id=batch_id,
+            )
+            return json.dumps(result, indent=2)
+
+        except Exception as e:
+            logger.error(f"Batch submission error: {e}")
+            return json.dumps(
+                {"success": False, "error": str(e), "error_type": type(e).__name__}, indent=2
+            )
+
+    @mcp_server.tool()
+    async def get_job_status(job_id: str) -> str:
+        """
+        Get the status and progress of a background job.
+
+        Args:
+            job_id: ID returned by submit_batch
+
+        Returns:
+            JSON string with status (queued, running, completed, failed,
+            cancelled or interrupted), total, completed and failed counts,
+            and progress (0-1)
+        """
+        try:
+            return json.dumps(await get_job_manager().status(job_id), indent=2)
+        except Exception as e:
+            return json.dumps(
+                {"success": False, "error": str(e), "error_type": type(e).__name__}, indent=2
+            )
+
+    @mcp_server.tool()
+    async def get_job_results(
+        job_id: str, offset: int = 0, limit: int = DEFAULT_JOB_RESULTS_PAGE
+    ) -> str:
+        """
+        Get the finished items of a background job, ordered by prompt index.
+
+        Works while the job is running: each item appears as soon as its
+        image is saved. Page through large jobs with offset and limit.
+
+        Args:
+            job_id: ID returned by submit_batch
+            offset: Number of finished items to skip (default: 0)
+            limit: Maximum items to return (default: 50)
+
+        Returns:
+            JSON string with job status, items (same shape as batch_generate's
+            result["results"][i]) and next_offset (null on the last page)
+
+        IMPORTANT - AI Assistant Instructions:
+        Show the user the file paths from items[i]["images"][0]["path"] and
+        how many images are still pending.
+        """
+        try:
+            result = await get_job_manager().results(job_id, offset=offset, limit=limit)
+            return json.dumps(result, indent=2)
+        except Exception as e:
+            return json.dumps(
+                {"success": False, "error": str(e), "error_type": type(e).__name__}, indent=2
+            )
+
+    @mcp_server.tool()
+    async def cancel_job(job_id: str) -> str:
+        """
+        Cancel a queued or running background job.
+
+        Images that already finished are kept and stay available through
+        get_job_results.
+
+        Args:
+            job_id: ID returned by submit_batch
+
+        Returns:
+            JSON string with the job's final status
+        """
+        try:
+            return json.dumps(await get_job_manager().cancel(job_id), indent=2)
+        except Exception as e:
+            return json.dumps(
+                {"success": False, "error": str(e), "error_type": type(e).__name__}, indent=2
+            )
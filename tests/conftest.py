@@ -0,0 +1,38 @@
+"""
+Shared fixtures: a local Gemini API stub and clients pointed at it.
+"""
+
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+
+from benchmarks.stub_server import GeminiStub
+from src.services.gemini_client import GeminiClient
+from src.services.retry import RetryPolicy
+
+
+@pytest.fixture
+async def stub(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[GeminiStub]:
+    """Running stub; the SDK picks its base URL up from the environment."""
+    async with GeminiStub(retry_delay="0.2s") as server:
+        monkeypatch.setenv("GOOGLE_GEMINI_BASE_URL", server.base_url)
+        yield server
+
+
+@pytest.fixture
+async def make_client(stub: GeminiStub) -> AsyncIterator[Callable[..., GeminiClient]]:
+    """Factory for clients talking to the stub, with fast retries."""
+    clients: list[GeminiClient] = []
+
+    def factory(**kwargs: Any) -> GeminiClient:
+        kwargs.setdefault(
+            "retry_policy", RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.05, deadline=10)
+        )
+        client = GeminiClient("stub", **kwargs)
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        await client.close()
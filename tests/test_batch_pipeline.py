@@ -0,0 +1,52 @@
+"""
+Tests for the batch preparation/generation pipeline.
+"""
+
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from src.tools.batch_generate import BatchPipeline
+
+
+async def _handler(item: int, prepared: Any) -> int:
+    await asyncio.sleep(0.01)
+    return item * 2
+
+
+async def test_runs_items_in_order() -> None:
+    pipeline = BatchPipeline(3, prepare_concurrency=2)
+
+    results = await pipeline.run(range(10), _handler, chunk_size=4)
+
+    assert results == [item * 2 for item in range(10)]
+
+
+async def test_handler_errors_are_results() -> None:
+    async def handler(item: int, prepared: Any) -> int:
+        if item == 1:
+            raise ValueError("bad item")
+        return item
+
+    results = await BatchPipeline(2).run(range(3), handler)
+
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+
+
+async def test_failing_item_source_stops_all_stages() -> None:
+    def items() -> Iterator[int]:
+        yield 0
+        yield 1
+        raise OSError("prompt file vanished")
+
+    pipeline = BatchPipeline(4, prepare_concurrency=2)
+
+    with pytest.raises(OSError, match="prompt file vanished"):
+        await asyncio.wait_for(pipeline.run(items(), _handler), timeout=5)
+
+    # Generation workers must not be left waiting for items that never come
+    await asyncio.sleep(0)
+    assert asyncio.all_tasks() == {asyncio.current_task()}
@@ -0,0 +1,81 @@
+"""
+Resuming interrupted batches from their checkpoints.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.stub_server import GeminiStub
+from src.config import settings
+from src.services import client_pool
+from src.tools.batch_generate import batch_generate_images
+
+PROMPTS: list[str | dict[str, Any]] = [f"a lighthouse, variation {i}" for i in range(4)]
+
+
+@pytest.fixture
+async def configure(
+    stub: GeminiStub, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> AsyncIterator[Any]:
+    """Point the global settings and client pool at the stub and tmp_path."""
+    monkeypatch.setenv("GEMINI_API_KEY", "stub")
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "images"))
+    monkeypatch.setenv("BATCH_JOURNAL_PATH", str(tmp_path / "batches.db"))
+    monkeypatch.setenv("ENABLE_PROMPT_ENHANCEMENT", "false")
+
+    def apply(**env: str) -> None:
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setattr(settings, "_settings", None)
+        monkeypatch.setattr(client_pool, "_client_pool", None)
+
+    yield apply
+    await client_pool.close_client_pool()
+
+
+async def _interrupted_run(batch_id: str, finished: int) -> None:
+    """Run PROMPTS one at a time and kill the batch after `finished` items."""
+    done = asyncio.Event()
+
+    async def on_progress(item: dict[str, Any], completed: int, total: int) -> None:
+        if completed == finished:
+            done.set()
+
+    task = asyncio.ensure_future(
+        batch_generate_images(PROMPTS, batch_size=1, on_progress=on_progress, batch_id=batch_id)
+    )
+    await done.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+async def test_resubmitted_batch_renders_only_remaining_items(
+    stub: GeminiStub, configure: Any
+) -> None:
+    configure()
+    await _interrupted_run("resume-me", finished=2)
+    sent = stub.requests
+
+    result = await batch_generate_images(PROMPTS, batch_size=1, batch_id="resume-me")
+
+    assert result["completed"] == len(PROMPTS)
+    assert result["resumed"] == 2
+    assert stub.requests - sent == 2
+    assert sum(bool(item.get("resumed")) for item in result["results"]) == 2
+    assert all(Path(item["images"][0]["path"]).exists() for item in result["results"])
+
+
+async def test_memory_backend_is_not_resumed(stub: GeminiStub, configure: Any) -> None:
+    configure(STORAGE_BACKEND="memory")
+    await _interrupted_run("in-memory", finished=2)
+    sent = stub.requests
+
+    result = await batch_generate_images(PROMPTS, batch_size=1, batch_id="in-memory")
+
+    assert result["resumed"] == 0
+    assert stub.requests - sent == len(PROMPTS)
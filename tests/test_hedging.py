@@ -0,0 +1,91 @@
+"""
+Tests for hedged requests.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.services.hedging import HEDGE_NONE, HEDGE_WON, HedgePolicy
+
+
+async def _warm(policy: HedgePolicy, latency: float = 0.01) -> None:
+    async def call() -> str:
+        await asyncio.sleep(latency)
+        return "warm"
+
+    for _ in range(policy.min_samples):
+        await policy.run(call)
+
+
+async def test_hedge_is_admitted_like_the_original() -> None:
+    policy = HedgePolicy(percentile=50, budget=1.0, min_samples=5)
+    await _warm(policy)
+    admitted = 0
+    latencies = iter([5.0, 0.01])
+
+    @asynccontextmanager
+    async def admit() -> AsyncIterator[None]:
+        nonlocal admitted
+        admitted += 1
+        yield
+
+    async def call() -> str:
+        await asyncio.sleep(next(latencies))
+        return "image"
+
+    result, outcome = await policy.run(call, hedge=True, admit=admit)
+
+    assert (result, outcome) == ("image", HEDGE_WON)
+    assert admitted == 2
+
+
+async def test_hedge_timer_excludes_admission_wait() -> None:
+    policy = HedgePolicy(percentile=50, budget=1.0, min_samples=5)
+    await _warm(policy)
+
+    @asynccontextmanager
+    async def admit() -> AsyncIterator[None]:
+        # Queued locally far longer than the hedge delay
+        await asyncio.sleep(0.2)
+        yield
+
+    async def call() -> str:
+        await asyncio.sleep(0.01)
+        return "image"
+
+    _, outcome = await policy.run(call, hedge=True, admit=admit)
+
+    assert outcome == HEDGE_NONE
+    assert policy.hedges == 0
+    delay = policy.hedge_delay(None)
+    assert delay is not None and delay < 0.2
+
+
+async def test_hedge_waits_for_a_slot() -> None:
+    policy = HedgePolicy(percentile=50, budget=1.0, min_samples=5)
+    await _warm(policy)
+    slots = asyncio.Semaphore(1)
+    in_flight = max_in_flight = 0
+
+    @asynccontextmanager
+    async def admit() -> AsyncIterator[None]:
+        async with slots:
+            yield
+
+    async def call() -> str:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            in_flight -= 1
+        return "image"
+
+    _, outcome = await policy.run(call, hedge=True, admit=admit)
+
+    # The hedge queued behind the original's slot instead of adding load
+    assert policy.hedges == 1
+    assert outcome != HEDGE_WON
+    assert max_in_flight == 1
@@ -0,0 +1,42 @@
+"""
+Tests for image byte handling helpers.
+"""
+
+import io
+
+from PIL import Image
+
+from src.services.image_processing import prepare_reference_image
+
+EXIF_ORIENTATION = 0x0112
+ROTATE_90_CW = 6  # Stored landscape, displayed portrait
+
+
+def make_rotated_jpeg(width: int, height: int) -> bytes:
+    """JPEG stored as width x height whose EXIF says to display it rotated 90 degrees."""
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = ROTATE_90_CW
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def test_prepare_reference_applies_exif_orientation() -> None:
+    data, mime_type = prepare_reference_image(
+        make_rotated_jpeg(400, 200), max_edge=100, max_bytes=1024 * 1024
+    )
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert mime_type == "image/jpeg"
+        assert image.size == (50, 100)
+        assert image.getexif().get(EXIF_ORIENTATION) is None
+
+
+def test_prepare_reference_keeps_small_images_untouched() -> None:
+    source = make_rotated_jpeg(80, 40)
+
+    data, mime_type = prepare_reference_image(source, max_edge=100, max_bytes=1024 * 1024)
+
+    # Sent as is; the API sees the original Orientation tag
+    assert data is source
+    assert mime_type == "image/jpeg"
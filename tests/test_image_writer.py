@@ -0,0 +1,35 @@
+"""
+Tests for atomic image writes.
+"""
+
+import asyncio
+from pathlib import Path
+
+from src.services.image_writer import ImageWriter
+
+
+async def test_concurrent_writes_of_one_path(tmp_path: Path) -> None:
+    writer = ImageWriter(max_workers=8)
+    path = tmp_path / "ab" / "cd" / "image.png"
+    data = b"\x89PNG" + bytes(512 * 1024)
+
+    # Coalesced callers and content-hash names both write one path at once
+    await asyncio.gather(*(writer.write(path, data) for _ in range(32)))
+
+    assert path.read_bytes() == data
+    assert not list(tmp_path.rglob("*.tmp"))
+    writer.close()
+
+
+async def test_existing_identical_file_is_kept(tmp_path: Path) -> None:
+    writer = ImageWriter()
+    path = tmp_path / "image.png"
+    path.write_bytes(b"image")
+    mtime = path.stat().st_mtime_ns
+
+    await writer.write(path, b"image")
+    assert path.stat().st_mtime_ns == mtime
+
+    await writer.write(path, b"other image")
+    assert path.read_bytes() == b"other image"
+    writer.close()
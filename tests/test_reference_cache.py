@@ -0,0 +1,30 @@
+"""
+Tests for the reference image cache.
+"""
+
+import hashlib
+from pathlib import Path
+
+from benchmarks.stub_server import make_png
+from src.services.gemini_client import part_digest
+from src.services.reference_cache import ReferenceImageCache, ReferencePart
+
+
+async def test_parts_carry_their_digest(tmp_path: Path) -> None:
+    data = make_png()
+    path = tmp_path / "reference.png"
+    path.write_bytes(data)
+    cache = ReferenceImageCache()
+
+    [part] = await cache.load([str(path)])
+    [again] = await cache.load([str(path)])
+
+    assert isinstance(part, ReferencePart)
+    assert part.digest == hashlib.sha256(data).hexdigest()
+    assert part_digest(part) == part.digest
+    assert again is part
+    assert cache.stats()["hits"] == 1
+    # The digest stays local; only the image is sent to the API
+    assert part.model_dump(exclude_none=True) == {
+        "inline_data": {"data": data, "mime_type": "image/png"}
+    }
@@ -0,0 +1,30 @@
+"""
+Tests for the generated image result cache.
+"""
+
+import asyncio
+from pathlib import Path
+
+from src.services.result_cache import ResultCache, make_result_key
+
+
+async def test_concurrent_puts_of_one_key(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    key = make_result_key({"prompt": "a lighthouse"})
+    payloads = [bytes([i]) * 256 * 1024 for i in range(16)]
+
+    for _ in range(4):
+        await asyncio.gather(
+            *(
+                cache.put(key, [{"data": data, "mime_type": "image/png", "metadata": {}}])
+                for data in payloads
+            )
+        )
+
+    images = await cache.get(key)
+    assert images is not None
+    # One complete payload wins; writes are never interleaved
+    assert images[0]["data"] in payloads
+    assert cache.stores == 4 * len(payloads)
+    assert not list(tmp_path.rglob("*.tmp"))
+    cache.close()
@@ -0,0 +1,146 @@
+"""
+Retry behaviour of GeminiClient against the local API stub.
+"""
+
+import socket
+import time
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from benchmarks.stub_server import (
+    FAULT_AUTH,
+    FAULT_HANG,
+    FAULT_RATE_LIMITED,
+    FAULT_RESET,
+    FAULT_UNAVAILABLE,
+    GeminiStub,
+)
+from src.core.exceptions import APIError, AuthenticationError, RateLimitError, ValidationError
+from src.services.gemini_client import GeminiClient
+from src.services.retry import RetryPolicy, is_retryable
+
+
+def _api_error_from(cause: BaseException) -> APIError:
+    try:
+        raise APIError("request failed") from cause
+    except APIError as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (APIError("overloaded", status_code=503), True),
+        (APIError("bad request", status_code=400), False),
+        (RateLimitError("slow down", status_code=429), True),
+        (AuthenticationError("bad key"), False),
+        (ValidationError("bad prompt"), False),
+        (TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (httpx.ConnectError("refused"), True),
+        (httpx.ReadTimeout("timed out"), True),
+        (_api_error_from(httpx.ReadTimeout("timed out")), True),
+        (_api_error_from(ConnectionResetError()), True),
+        (_api_error_from(ValueError("unexpected payload")), False),
+        (ValueError("unexpected payload"), False),
+    ],
+)
+def test_is_retryable(error: BaseException, expected: bool) -> None:
+    assert is_retryable(error) is expected
+
+
+async def test_retries_unavailable(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.extend([FAULT_UNAVAILABLE, FAULT_UNAVAILABLE])
+    client = make_client()
+
+    result = await client.generate_image("a lighthouse")
+
+    assert len(result["images"]) == 1
+    assert stub.requests == 3
+    assert client.retry_policy.retries == 2
+
+
+async def test_rate_limited_honors_retry_info(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.append(FAULT_RATE_LIMITED)
+    client = make_client()
+
+    start = time.monotonic()
+    result = await client.generate_image("a lighthouse")
+
+    assert len(result["images"]) == 1
+    assert stub.requests == 2
+    # The stub asks for 0.2s, longer than the policy's own 0.05s cap
+    assert time.monotonic() - start >= 0.2
+    assert client.limiter.stats()["rate_limited"] == 1
+
+
+async def test_retries_timed_out_attempt(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.append(FAULT_HANG)
+    client = make_client(timeout=1)
+
+    result = await client.generate_image("a lighthouse")
+
+    assert len(result["images"]) == 1
+    assert stub.requests == 2
+
+
+async def test_deadline_bounds_hung_attempt(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.append(FAULT_HANG)
+    client = make_client(retry_policy=RetryPolicy(base_delay=0.01, max_delay=0.05, deadline=0.5))
+
+    start = time.monotonic()
+    with pytest.raises(APIError):
+        await client.generate_image("a lighthouse")
+
+    assert time.monotonic() - start < 2
+    assert client.retry_policy.deadline_exceeded == 1
+
+
+async def test_retries_connection_reset(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.append(FAULT_RESET)
+    client = make_client()
+
+    result = await client.generate_image("a lighthouse")
+
+    assert len(result["images"]) == 1
+    assert stub.requests == 2
+
+
+async def test_retries_connection_refused(
+    monkeypatch: pytest.MonkeyPatch, make_client: Callable[..., GeminiClient]
+) -> None:
+    # Bind a port without listening on it, so connections are refused
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        monkeypatch.setenv("GOOGLE_GEMINI_BASE_URL", f"http://127.0.0.1:{sock.getsockname()[1]}")
+        client = make_client()
+
+        with pytest.raises(APIError):
+            await client.generate_image("a lighthouse")
+
+    assert client.retry_policy.attempts == 4
+
+
+async def test_auth_error_is_not_retried(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.faults.append(FAULT_AUTH)
+    client = make_client()
+
+    with pytest.raises(AuthenticationError):
+        await client.generate_image("a lighthouse")
+
+    assert stub.requests == 1
+    assert client.retry_policy.attempts == 1
@@ -0,0 +1,72 @@
+"""
+Tests for the S3 storage backend against an in-process S3 stand-in (moto).
+"""
+
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from src.services.storage_backends import S3Backend  # noqa: E402
+
+BUCKET = "images"
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        import boto3
+
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield
+
+
+async def test_round_trip(s3: None) -> None:
+    backend = S3Backend(BUCKET, prefix="gemini/", region="us-east-1")
+
+    stored = await backend.put("a/image.png", b"image", content_type="image/png")
+
+    assert stored["uri"] == f"s3://{BUCKET}/gemini/a/image.png"
+    assert await backend.get("a/image.png") == b"image"
+    assert backend.stats()["writes"] == 1
+    backend.close()
+
+
+async def test_multipart_uploads_stay_within_connection_threads(s3: None) -> None:
+    backend = S3Backend(
+        BUCKET,
+        region="us-east-1",
+        max_connections=2,
+        multipart_threshold=5 * MB,
+        multipart_chunk_size=5 * MB,
+    )
+    images = [bytes([i]) * (11 * MB) for i in range(4)]
+    before = set(threading.enumerate())
+    peak = 0
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, len(set(threading.enumerate()) - before))
+            await asyncio.sleep(0.001)
+
+    sampler = asyncio.ensure_future(sample())
+    await asyncio.gather(
+        *(backend.put(f"{i}.png", data, content_type="image/png") for i, data in enumerate(images))
+    )
+    done.set()
+    await sampler
+
+    # Parts go out on the upload threads themselves, no transfer threads on top
+    assert 0 < peak <= 2
+    for i, data in enumerate(images):
+        assert await backend.get(f"{i}.png") == data
+    backend.close()
@@ -0,0 +1,87 @@
+"""
+Tests for in-flight request coalescing.
+"""
+
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from benchmarks.stub_server import GeminiStub
+from src.services.gemini_client import GeminiClient
+from src.services.single_flight import SingleFlight
+
+
+async def test_fans_out_one_call() -> None:
+    flight = SingleFlight()
+    calls = 0
+
+    async def operation() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", operation) for _ in range(5)))
+
+    assert calls == 1
+    assert [result for result, _ in results] == ["result"] * 5
+    assert [shared for _, shared in results] == [False, True, True, True, True]
+    assert flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+
+async def test_shares_errors_and_forgets_the_call() -> None:
+    flight = SingleFlight()
+    calls = 0
+
+    async def operation() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        *(flight.do("key", operation) for _ in range(3)), return_exceptions=True
+    )
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight == 0
+    # A failed call is not remembered; the next caller tries again
+    with pytest.raises(RuntimeError):
+        await flight.do("key", operation)
+    assert calls == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    flight = SingleFlight()
+
+    async def operation() -> str:
+        await asyncio.sleep(0.05)
+        return "result"
+
+    first = asyncio.ensure_future(flight.do("key", operation))
+    second = asyncio.ensure_future(flight.do("key", operation))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == ("result", True)
+    assert first.cancelled()
+
+
+async def test_client_coalesces_only_seeded_requests(
+    stub: GeminiStub, make_client: Callable[..., GeminiClient]
+) -> None:
+    stub.latency = 0.05
+    client = make_client(single_flight=SingleFlight())
+
+    # Unseeded: every request samples its own image
+    unseeded = await asyncio.gather(*(client.generate_image("a lighthouse") for _ in range(3)))
+    assert stub.requests == 3
+    assert not any(result["coalesced"] for result in unseeded)
+
+    seeded = await asyncio.gather(
+        *(client.generate_image("a lighthouse", seed=7) for _ in range(3))
+    )
+    assert stub.requests == 4
+    assert sum(result["coalesced"] for result in seeded) == 2
@@ -0,0 +1,20 @@
+"""
+Tests for the image store and its index.
+"""
+
+from pathlib import Path
+
+from src.services.image_service import ImageResult
+from src.services.storage import ImageStore
+
+
+async def test_stats_count_indexed_images(tmp_path: Path) -> None:
+    store = ImageStore(tmp_path, index=True)
+    result = ImageResult(image_data=b"image", prompt="a lighthouse", model="test")
+
+    await store.save(result)
+    stats = await store.stats()
+
+    assert stats["layout"] == "flat"
+    assert stats["indexed_images"] == 1
+    store.close()
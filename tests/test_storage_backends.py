@@ -0,0 +1,20 @@
+"""
+Tests for image storage backends.
+"""
+
+from pathlib import Path
+
+from src.services.storage_backends import LocalBackend
+
+
+async def test_local_backend_records_each_write_once(tmp_path: Path) -> None:
+    backend = LocalBackend(tmp_path)
+
+    stored = await backend.put("a/image.png", b"image", content_type="image/png")
+
+    assert Path(stored["path"]).read_bytes() == b"image"
+    stats = backend.stats()
+    assert stats["writes"] == 1
+    assert stats["bytes_written"] == len(b"image")
+    assert stats["max_latency_ms"] == round(stored["write_time_ms"], 2)
+    backend.close()